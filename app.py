@@ -1,21 +1,38 @@
 import datetime
+import time
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
-import altair as alt
 
-from payevol.core.dates import add_months, first_day_current_month
+from payevol.core.cache import StreamlitCache, get_cache_backend, set_cache_backend
+from payevol.core.dates import MIN_REF, add_months, first_day_current_month
 from payevol.core.formatting import brl
-from payevol.services.min_wage import fetch_min_wage_changes, min_wage_at
-from payevol.services.ipca import fetch_ipca_number_index
+from payevol.core.metrics import observe, stage, start_metrics_server
+from payevol.services.loader import SOURCE_LABELS, load_sources
+from payevol.services.lookup import monthly_table, step_series
+from payevol.services.matrix import METHOD_LABELS, method_matrix
+from payevol.services.min_wage import min_wage_at
+from payevol.services.refresher import start_refresher
 from payevol.services.series import (
     build_equivalent_salary_series_sm,
     build_ipca_adjusted_series,
 )
-from payevol.services.inpc import fetch_inpc_number_index
 from payevol.services.series import build_inpc_adjusted_series
+from payevol.ui.chart import MAX_POINTS, build_chart_spec, build_plot_frame
+from payevol.ui.heatmap import STEPS, build_heatmap_spec
+from payevol.ui.table import TABLE_HEIGHT, build_monthly_table, monthly_column_config
+
+# no app, as buscas ficam no st.cache_data (compartilhado entre sessões); instalado uma vez
+# por processo, não a cada rerun (as threads de atualização limpam esse mesmo backend)
+if not isinstance(get_cache_backend(), StreamlitCache):
+    set_cache_backend(StreamlitCache())
+# /metrics (Prometheus) só se $PAYEVOL_METRICS_PORT estiver definido; sobe uma vez por processo
+start_metrics_server()
+# fontes atualizadas em segundo plano: nenhuma sessão espera o IBGE quando a cópia vence
+start_refresher()
+_run_t0 = time.perf_counter()
 
 APP_TITLE = "payEvol - Evolução Salarial"
-MIN_REF = datetime.date(1994, 7, 1)
 
 # ---------------- UI ----------------
 
@@ -280,11 +297,22 @@ with c_sc:
         format="%.2f",
     )
 
-# ---- Carrega fontes externas ----
-with st.spinner("Carregando salário mínimo, IPCA e INPC..."):
-    sm_changes = fetch_min_wage_changes()  # Previdenciarista
-    ipca_index = fetch_ipca_number_index()  # IBGE/SIDRA (tabela 1737)
-    inpc_index = fetch_inpc_number_index()  # IBGE/SIDRA (tabela 1738)
+# ---- Carrega fontes externas (em paralelo) ----
+with st.spinner("Carregando salário mínimo, IPCA e INPC..."), stage("app.load_sources"):
+    sources = load_sources()
+
+for name, err in sources.errors.items():
+    st.error(f"{SOURCE_LABELS[name]} indisponível: {err}")
+if sources.sm_changes is None or sources.ipca_index is None:
+    st.stop()
+
+# tabelas por mês (consulta O(1)); materializadas uma vez por versão dos dados, não a cada rerun
+with stage("app.monthly_tables"):
+    sm_changes = step_series(sources.sm_changes, "min_wage")  # Previdenciarista (um trecho por reajuste)
+    ipca_index = monthly_table(sources.ipca_index, "ipca_index")  # IBGE/SIDRA (tabela 1737)
+    inpc_index = (  # IBGE/SIDRA (tabela 1738); None se indisponível
+        monthly_table(sources.inpc_index, "inpc_index") if sources.inpc_index is not None else None
+    )
 
 
 # ---- Métricas de referência ----
@@ -308,130 +336,42 @@ series_sm = build_equivalent_salary_series_sm(
 series_ipca = build_ipca_adjusted_series(
     ref, float(salary_ref), ipca_index
 )  # salário_ref × I(m)/I(prev_ref)
-try:
-    series_inpc = build_inpc_adjusted_series(ref, float(salary_ref), inpc_index)
-    inpc_ok = True
-except Exception as e:
-    inpc_ok = False
-    st.error(f"INPC indisponível para esta referência: {e}")
+inpc_ok = False
+if inpc_index is not None:
+    try:
+        series_inpc = build_inpc_adjusted_series(ref, float(salary_ref), inpc_index)
+        inpc_ok = True
+    except Exception as e:
+        st.error(f"INPC indisponível para esta referência: {e}")
 
 
 # Junta para plot
-plot_df = pd.DataFrame(index=series_sm["ref_date"])
-plot_df["Equivalente (k×SM) R$"] = series_sm["equiv_brl"].values
-plot_df["Atualizado pelo IPCA (R$)"] = (
-    series_ipca.set_index("ref_date")["salary_ipca"].reindex(plot_df.index).values
+plot_df = build_plot_frame(
+    series_sm, series_ipca, series_inpc if inpc_ok else None, float(salary_current)
 )
-if inpc_ok:
-    plot_df["Atualizado pelo INPC (R$)"] = (
-        series_inpc.set_index("ref_date")["salary_inpc"].reindex(plot_df.index).values
-    )
-
 
-if float(salary_current) > 0:
-    plot_df["Salário atual (R$)"] = float(salary_current)
-
-# st.line_chart(plot_df)
-# --- Ajuste automático de eixo Y (min/max entre as séries exibidas) ---
-# (remove colunas totalmente NaN, por exemplo INPC se não disponível)
-plot_df2 = plot_df.copy()
-# --- Ajuste automático de eixo Y (min/max entre as séries exibidas) ---
-plot_df2 = plot_df.copy().dropna(axis=1, how="all")
-
-y_min = float(plot_df2.min(numeric_only=True).min())
-y_max = float(plot_df2.max(numeric_only=True).max())
-
-pad = (y_max - y_min) * 0.03 if y_max > y_min else (y_max * 0.03 if y_max else 1.0)
-y_domain = [y_min - pad, y_max + pad]
-
-# --- calcula domínio X com folga (1 mês a mais) para o último ponto não sumir ---
-x_min = plot_df2.index.min()
-x_max = plot_df2.index.max()
-x_max_plus = pd.Timestamp(add_months(x_max.date(), 1))  # +1 mês à direita
-
-# Altair pede formato "longo"
-long_df = (
-    plot_df2.reset_index()
-    .rename(columns={"index": "ref_date"})
-    .melt(id_vars=["ref_date"], var_name="Série", value_name="Valor")
-    .dropna()
-)
-
-ptBR_time_locale = {
-    "dateTime": "%A, %e de %B de %Y %X",
-    "date": "%d/%m/%Y",
-    "time": "%H:%M:%S",
-    "periods": ["AM", "PM"],
-    "days": ["domingo", "segunda", "terça", "quarta", "quinta", "sexta", "sábado"],
-    "shortDays": ["dom", "seg", "ter", "qua", "qui", "sex", "sáb"],
-    "months": [
-        "janeiro",
-        "fevereiro",
-        "março",
-        "abril",
-        "maio",
-        "junho",
-        "julho",
-        "agosto",
-        "setembro",
-        "outubro",
-        "novembro",
-        "dezembro",
-    ],
-    "shortMonths": [
-        "jan",
-        "fev",
-        "mar",
-        "abr",
-        "mai",
-        "jun",
-        "jul",
-        "ago",
-        "set",
-        "out",
-        "nov",
-        "dez",
-    ],
-}
-
-chart = (
-    alt.Chart(long_df)
-    .mark_line(point=alt.OverlayMarkDef(filled=True, size=55))
-    .encode(
-        x=alt.X(
-            "ref_date:T",
-            title="Mês",
-            scale=alt.Scale(domain=[x_min, x_max_plus]),
-            # FORÇA o texto do label (não depende do locale do browser)
-            axis=alt.Axis(labelExpr="timeFormat(datum.value, '%b/%Y')"),
+# séries longas vão reduzidas (LTTB) ao navegador, e o zoom do gráfico só amplia esses
+# pontos; o período escolhido aqui é recortado (e reduzido de novo) no servidor, então
+# trechos de até MAX_POINTS meses aparecem com todos os meses
+if len(plot_df) > MAX_POINTS:
+    period_labels = [d.strftime("%m/%Y") for d in plot_df.index]
+    first_label, last_label = st.select_slider(
+        "Período do gráfico",
+        options=period_labels,
+        value=(period_labels[0], period_labels[-1]),
+        help=(
+            f"O gráfico mostra até {MAX_POINTS} pontos por série; o zoom (roda do mouse) "
+            "amplia esses pontos, sem buscar mais meses. Para ver todos os meses de um trecho, "
+            f"escolha aqui um período de até {MAX_POINTS} meses."
         ),
-        y=alt.Y("Valor:Q", title="R$", scale=alt.Scale(domain=y_domain)),
-        color=alt.Color("Série:N", title="Séries", legend=alt.Legend(orient="bottom")),
-        tooltip=[
-            alt.Tooltip("ref_date:T", title="Mês", format="%B/%Y"),
-            alt.Tooltip("Série:N"),
-            alt.Tooltip("Valor:Q", format=",.2f", title="Valor (R$)"),
-        ],
     )
-    .properties(height=420, padding={"left": 8, "right": 22, "top": 6, "bottom": 6})
-    .interactive()
-)
+    plot_df = plot_df.iloc[period_labels.index(first_label) : period_labels.index(last_label) + 1]
 
-spec = chart.to_dict()
+with stage("app.chart_spec"):
+    spec = build_chart_spec(plot_df)
 
-# 1) locale no config do Vega-Lite
-spec.setdefault("config", {})
-spec["config"]["timeFormatLocale"] = ptBR_time_locale
-
-# 2) locale também no embedOptions (Streamlit às vezes só respeita aqui)
-spec.setdefault("usermeta", {})
-spec["usermeta"].setdefault("embedOptions", {})
-spec["usermeta"]["embedOptions"]["timeFormatLocale"] = ptBR_time_locale
-
-# (opcional) evita sizing estranho em alguns layouts
-spec.setdefault("autosize", {"type": "fit", "contains": "padding"})
-
-st.vega_lite_chart(spec, use_container_width=True)
+with stage("app.render_chart"):
+    st.vega_lite_chart(spec, use_container_width=True)
 
 # ---- KPIs finais (último mês da série) ----
 last_ref = series_sm["ref_date"].iloc[-1].date()
@@ -466,24 +406,35 @@ if float(salary_current) > 0:
         )
 
 with st.expander("Ver tabela mensal"):
-    tbl_dict = {
-        "Mês/Ano": series_sm["mm_yyyy"],
-        "Salário mínimo (R$)": series_sm["min_wage"].map(brl),
-        "Equivalente (k×SM) (R$)": series_sm["equiv_brl"].map(brl),
-        "Atualizado pelo IPCA (R$)": series_ipca.set_index("ref_date")["salary_ipca"]
-        .reindex(series_sm["ref_date"])
-        .map(brl)
-        .values,
-    }
-    if inpc_ok:
-        tbl_dict["Atualizado pelo INPC (R$)"] = (
-            series_inpc.set_index("ref_date")["salary_inpc"]
-            .reindex(series_sm["ref_date"])
-            .map(brl)
-            .values
+    with stage("app.table"):
+        tbl = build_monthly_table(series_sm, series_ipca, series_inpc if inpc_ok else None)
+    with stage("app.render_table"):
+        st.dataframe(
+            tbl,
+            use_container_width=True,
+            hide_index=True,
+            height=TABLE_HEIGHT,
+            column_config=monthly_column_config(),
         )
-    tbl = pd.DataFrame(tbl_dict)
-    st.dataframe(tbl, use_container_width=True)
+
+# ---- Todas as referências de uma vez (matriz pré-calculada por versão dos dados) ----
+with st.expander("Mapa de calor: todas as referências × meses"):
+    st.caption(
+        "Fator = quanto R$ 1 na referência (linha) vale em cada mês (coluna) pelo método escolhido. "
+        "Em k×SM ÷ IPCA, acima de 1 o salário mínimo ganhou da inflação no intervalo."
+    )
+    tables = {"sm": sm_changes, "ipca": ipca_index}
+    if inpc_index is not None:
+        tables["inpc"] = inpc_index
+    methods = [m for m in METHOD_LABELS if all(part in tables for part in m.split("/"))]
+    h1, h2 = st.columns([2, 1])
+    with h1:
+        method = st.selectbox("Método", methods, format_func=METHOD_LABELS.get)
+    with h2:
+        granularity = st.radio("Granularidade", list(STEPS), horizontal=True)
+    with stage("app.heatmap"):
+        heat_spec = build_heatmap_spec(method_matrix(method, tables), STEPS[granularity])
+    st.vega_lite_chart(heat_spec, use_container_width=True)
 
 
 st.caption(
@@ -491,10 +442,6 @@ st.caption(
 )
 
 # ---- Rodapé ----
-import datetime
-import streamlit as st
-import streamlit.components.v1 as components
-
 ano_atual = datetime.date.today().year
 APP_NAME = "payEvol"
 APP_VERSION = "v0.1.2"  # opcional
@@ -548,3 +495,5 @@ footer_html = f"""
 
 # height: ajuste se você acrescentar mais linhas
 components.html(footer_html, height=110)
+
+observe("payevol_stage_seconds", time.perf_counter() - _run_t0, stage="app.run", ok="true")
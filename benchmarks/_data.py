@@ -0,0 +1,249 @@
+"""
+Dados para rodar os benchmarks offline.
+
+- séries já processadas (salário mínimo, IPCA, INPC) para os builders;
+- respostas das fontes (JSON do SIDRA 1737/1736/7063 e HTML do Previdenciarista).
+
+As respostas vêm de benchmarks/recorded/<nome> quando gravadas com
+`python -m benchmarks.record`; sem gravação, são geradas aqui com o mesmo layout
+(cabeçalho, chaves D?C/D?N, valores como texto) e volume parecido com o real.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from payevol.core.dates import add_months, first_day_current_month
+
+# (mês de vigência, valor) do salário mínimo desde o Plano Real
+MIN_WAGE_CHANGES = [
+    ("1994-07", 64.79), ("1994-09", 70.00), ("1995-05", 100.00), ("1996-05", 112.00),
+    ("1997-05", 120.00), ("1998-05", 130.00), ("1999-05", 136.00), ("2000-04", 151.00),
+    ("2001-04", 180.00), ("2002-04", 200.00), ("2003-04", 240.00), ("2004-05", 260.00),
+    ("2005-05", 300.00), ("2006-04", 350.00), ("2007-04", 380.00), ("2008-03", 415.00),
+    ("2009-02", 465.00), ("2010-01", 510.00), ("2011-01", 540.00), ("2011-03", 545.00),
+    ("2012-01", 622.00), ("2013-01", 678.00), ("2014-01", 724.00), ("2015-01", 788.00),
+    ("2016-01", 880.00), ("2017-01", 937.00), ("2018-01", 954.00), ("2019-01", 998.00),
+    ("2020-01", 1039.00), ("2020-02", 1045.00), ("2021-01", 1100.00), ("2022-01", 1212.00),
+    ("2023-01", 1302.00), ("2023-05", 1320.00), ("2024-01", 1412.00), ("2025-01", 1518.00),
+    ("2026-01", 1621.00),
+]
+
+
+def min_wage_frame() -> pd.DataFrame:
+    rows = [(date(int(m[:4]), int(m[5:]), 1), v) for m, v in MIN_WAGE_CHANGES]
+    return pd.DataFrame(rows, columns=["ref_date", "min_wage"])
+
+
+def index_frame(col: str, monthly_rate: float, seed: int) -> pd.DataFrame:
+    """
+    Número-índice de dez/1993 (=100) até o mês atual - 1, com variação mensal
+    ruidosa em torno de `monthly_rate`.
+    """
+    end = add_months(first_day_current_month(), -1)
+    months = pd.date_range(date(1993, 12, 1), end, freq="MS")
+    rng = np.random.default_rng(seed)
+    growth = 1.0 + rng.normal(monthly_rate, monthly_rate / 2, len(months))
+    growth[0] = 1.0
+    values = 100.0 * np.cumprod(growth)
+    return pd.DataFrame({"ref_date": months.date, col: values.round(2)})
+
+
+def sources() -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    return (
+        min_wage_frame(),
+        index_frame("ipca_index", 0.005, seed=1737),
+        index_frame("inpc_index", 0.005, seed=1736),
+    )
+
+
+def random_pairs(n: int, seed: int = 0) -> tuple[list[date], np.ndarray]:
+    """
+    n pares (mês de referência >= 07/1994, salário).
+    """
+    rng = np.random.default_rng(seed)
+    end = add_months(first_day_current_month(), -1)
+    span = (end.year - 1994) * 12 + end.month - 7
+    offsets = rng.integers(0, span + 1, n)
+    refs = [add_months(date(1994, 7, 1), int(k)) for k in offsets]
+    salaries = rng.uniform(500.0, 30000.0, n).round(2)
+    return refs, salaries
+
+
+RECORDED_DIR = Path(__file__).parent / "recorded"
+
+_MONTH_NAMES = [
+    "janeiro", "fevereiro", "março", "abril", "maio", "junho",
+    "julho", "agosto", "setembro", "outubro", "novembro", "dezembro",
+]
+
+
+def recorded_path(name: str) -> Path:
+    return RECORDED_DIR / f"{name}.gz"
+
+
+def load_recorded(name: str) -> bytes | None:
+    path = recorded_path(name)
+    return gzip.decompress(path.read_bytes()) if path.exists() else None
+
+
+def _months(first: date) -> list[date]:
+    end = add_months(first_day_current_month(), -1)
+    return [d.date() for d in pd.date_range(first, end, freq="MS")]
+
+
+def _sidra(header_dims: list[tuple[str, str]], rows: list[tuple[str, list[tuple[str, str]]]]) -> bytes:
+    """
+    header_dims: [(rótulo do D?C, rótulo do D?N), ...]
+    rows: [(valor, [(código, nome) por dimensão]), ...]
+    """
+    header = {
+        "NC": "Nível Territorial (Código)", "NN": "Nível Territorial",
+        "MC": "Unidade de Medida (Código)", "MN": "Unidade de Medida", "V": "Valor",
+    }
+    for i, (code_label, name_label) in enumerate(header_dims, start=1):
+        header[f"D{i}C"] = code_label
+        header[f"D{i}N"] = name_label
+
+    out = [header]
+    for value, dims in rows:
+        item = {"NC": "1", "NN": "Brasil", "MC": "30", "MN": "Número-índice", "V": value}
+        for i, (code, name) in enumerate(dims, start=1):
+            item[f"D{i}C"] = code
+            item[f"D{i}N"] = name
+        out.append(item)
+    return json.dumps(out, ensure_ascii=False).encode("utf-8")
+
+
+def _period(d: date) -> tuple[str, str]:
+    return f"{d.year}{d.month:02d}", f"{_MONTH_NAMES[d.month - 1]} {d.year}"
+
+
+_DIMS_MONTH_VAR = [
+    ("Brasil (Código)", "Brasil"), ("Mês (Código)", "Mês"), ("Variável (Código)", "Variável"),
+]
+
+
+def sidra_1737() -> bytes:
+    """
+    IPCA número-índice (t/1737, v/2266), dez/1979 em diante.
+    """
+    recorded = load_recorded("sidra-1737.json")
+    if recorded is not None:
+        return recorded
+    months = _months(date(1979, 12, 1))
+    values = 100.0 * np.cumprod(1.0 + np.random.default_rng(1737).normal(0.02, 0.01, len(months)))
+    var = ("2266", "IPCA - Número-índice (base: dezembro de 1993 = 100)")
+    rows = [(f"{v:.13f}", [("1", "Brasil"), _period(d), var]) for d, v in zip(months, values)]
+    return _sidra(_DIMS_MONTH_VAR, rows)
+
+
+_1736_VARIABLES = [
+    ("44", "INPC - Variação mensal"),
+    ("68", "INPC - Variação acumulada no ano"),
+    ("2289", "INPC - Número-índice (base: dezembro 1993 = 100)"),
+    ("2290", "INPC - Variação acumulada em 12 meses"),
+    ("2291", "INPC - Variação acumulada em 3 meses"),
+    ("2292", "INPC - Variação acumulada em 6 meses"),
+]
+
+
+def sidra_1736(variables: tuple[str, ...] | None = None) -> bytes:
+    """
+    INPC (t/1736) com todas as variáveis (v/all) ou só as pedidas, abr/1979 em diante.
+    """
+    name = "sidra-1736.json" if variables is None else f"sidra-1736-v{'-'.join(variables)}.json"
+    recorded = load_recorded(name)
+    if recorded is not None:
+        return recorded
+    months = _months(date(1979, 4, 1))
+    rng = np.random.default_rng(1736)
+    pct = rng.normal(2.0, 1.0, len(months))
+    index = 100.0 * np.cumprod(1.0 + pct / 100.0)
+    rows = []
+    for code, var_name in _1736_VARIABLES:
+        if variables is not None and code not in variables:
+            continue
+        values = index if code == "2289" else pct
+        for d, v in zip(months, values):
+            rows.append((f"{v:.2f}" if code != "2289" else f"{v:.13f}", [("1", "Brasil"), _period(d), (code, var_name)]))
+    return _sidra(_DIMS_MONTH_VAR, rows)
+
+
+_7063_VARIABLES = [
+    ("44", "INPC - Variação mensal"),
+    ("68", "INPC - Variação acumulada no ano"),
+    ("45", "INPC - Peso mensal"),
+    ("2292", "INPC - Variação acumulada em 12 meses"),
+]
+
+
+def sidra_7063(
+    items: int = 465, variables: tuple[str, ...] | None = None, item_codes: tuple[str, ...] | None = None
+) -> bytes:
+    """
+    INPC por item (t/7063, c315), jan/2020 em diante. items=465 ~ índice geral + grupos,
+    subgrupos, itens e subitens; items=1 só o índice geral. variables (v/...) e
+    item_codes (c315/..., ex.: 7169 = índice geral) filtram como o servidor; None = all.
+    """
+    if item_codes is not None:
+        name = f"sidra-7063-c{'-'.join(item_codes)}-v{'-'.join(variables or ('all',))}.json"
+    elif items > 1 and variables is None:
+        name = "sidra-7063.json"
+    else:
+        name = f"sidra-7063-{items}-{'-'.join(variables or ('all',))}.json"
+    recorded = load_recorded(name)
+    if recorded is not None:
+        return recorded
+    months = _months(date(2020, 1, 1))
+    rng = np.random.default_rng(7063)
+    item_dims = [("7169", "Índice geral")] + [(str(7170 + i), f"{i + 1}.Item {i + 1}") for i in range(items - 1)]
+    keep = np.array([item_codes is None or code in item_codes for code, _ in item_dims])
+    kept = [item for item, k in zip(item_dims, keep) if k]
+    dims = _DIMS_MONTH_VAR + [
+        ("Geral, grupo, subgrupo, item e subitem (Código)", "Geral, grupo, subgrupo, item e subitem"),
+    ]
+    rows = []
+    for code, var_name in _7063_VARIABLES:
+        for d in months:
+            period = _period(d)
+            # sorteia sempre todos os itens: o filtro não muda os valores
+            values = rng.normal(0.4, 0.5, len(item_dims))
+            if variables is not None and code not in variables:
+                continue
+            for item, v in zip(kept, values[keep]):
+                rows.append((f"{v:.2f}", [("1", "Brasil"), period, (code, var_name), item]))
+    return _sidra(dims, rows)
+
+
+def min_wage_page() -> bytes:
+    """
+    Página do Previdenciarista: texto, menus e a tabela "Vigência / Valor mensal / Norma legal".
+    """
+    recorded = load_recorded("previdenciarista.html")
+    if recorded is not None:
+        return recorded
+    abbr = [m[:3] for m in _MONTH_NAMES]
+    df = min_wage_frame().iloc[::-1]
+    trs = "\n".join(
+        f"<tr><td>{abbr[d.month - 1]}/{d.year}</td>"
+        f"<td>R$ {f'{v:,.2f}'.replace(',', 'X').replace('.', ',').replace('X', '.')}</td>"
+        f"<td>Lei/Decreto nº {10_000 + i}</td></tr>"
+        for i, (d, v) in enumerate(zip(df["ref_date"], df["min_wage"]))
+    )
+    filler = "<p>" + "Tabela histórica dos salários mínimos no Brasil. " * 60 + "</p>"
+    menu = "<table class='nav'>" + "".join(f"<tr><td><a href='/p{i}'>Página {i}</a></td></tr>" for i in range(80)) + "</table>"
+    html = (
+        "<!DOCTYPE html><html lang='pt-BR'><head><meta charset='utf-8'><title>Tabela histórica</title>"
+        + "<script>" + "var x=1;" * 4000 + "</script></head><body>"
+        + menu + filler * 20
+        + "<table><thead><tr><th>Vigência</th><th>Valor mensal</th><th>Norma legal</th></tr></thead>"
+        + f"<tbody>{trs}</tbody></table>"
+        + filler * 40 + "</body></html>"
+    )
+    return html.encode("utf-8")
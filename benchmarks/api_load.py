@@ -0,0 +1,86 @@
+"""
+Vazão da API (payevol.api) com dados quentes: sobe a API no mesmo processo, contra o
+servidor substituto (benchmarks.standin), e dispara GET /evolution com referências e
+salários aleatórios a partir de C conexões simultâneas.
+
+    python -m benchmarks.api_load [--requests 2000] [--concurrency 16] [--last]
+
+Relata requisições/s e p50/p95/p99 da latência.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+
+async def _run(args: argparse.Namespace) -> tuple[float, np.ndarray, int]:
+    from tornado.httpclient import AsyncHTTPClient, HTTPClientError
+    from tornado.netutil import bind_sockets
+    from tornado.httpserver import HTTPServer
+
+    from payevol.api import make_app
+
+    app = make_app()
+    sockets = bind_sockets(0, "127.0.0.1")
+    port = sockets[0].getsockname()[1]
+    HTTPServer(app).add_sockets(sockets)
+    await app.settings["data"].get()  # aquecimento: carga das séries fora da medição
+
+    rng = random.Random(args.seed)
+    last = "&last=1" if args.last else ""
+    urls = [
+        f"http://127.0.0.1:{port}/evolution?ref={rng.randint(1995, 2024)}-{rng.randint(1, 12):02d}"
+        f"&salary={rng.uniform(1000, 20000):.2f}{last}"
+        for _ in range(args.requests)
+    ]
+    client = AsyncHTTPClient(max_clients=args.concurrency)
+    queue = list(reversed(urls))
+    times, failures = [], 0
+
+    async def worker():
+        nonlocal failures
+        while queue:
+            url = queue.pop()
+            t0 = time.perf_counter()
+            try:
+                await client.fetch(url)
+            except HTTPClientError:
+                failures += 1
+            times.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return time.perf_counter() - t0, np.array(times), failures
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--last", action="store_true", help="só o último mês (resposta curta)")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    from benchmarks.standin import StandinOptions, serve, source_env
+
+    server = serve(0, StandinOptions(latency=0.0, jitter=0.0))
+    os.environ.update(source_env(server))
+    os.environ.setdefault("PAYEVOL_DATA_DIR", tempfile.mkdtemp(prefix="payevol-api-"))
+
+    wall, times, failures = asyncio.run(_run(args))
+    server.shutdown()
+
+    p50, p95, p99 = np.percentile(times, [50, 95, 99]) * 1e3
+    print(f"requisições: {len(times)}  simultâneas: {args.concurrency}  falhas: {failures}")
+    print(f"vazão       : {len(times) / wall:8.0f} req/s")
+    print(f"latência    : p50 {p50:6.1f} ms  p95 {p95:6.1f} ms  p99 {p99:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
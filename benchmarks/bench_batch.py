@@ -0,0 +1,68 @@
+"""
+Custo por linha: evolve_batch x laço sobre as funções de série (uma referência por chamada).
+
+    python -m benchmarks.bench_batch [--rows 50000] [--loop-rows 200]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks import _data
+from payevol.services.batch import evolve_batch
+from payevol.services.series import (
+    build_equivalent_salary_series_sm,
+    build_inpc_adjusted_series,
+    build_ipca_adjusted_series,
+)
+
+
+def _loop(refs, salaries, sm, ipca, inpc) -> np.ndarray:
+    out = []
+    for ref, salary in zip(refs, salaries):
+        s_sm = build_equivalent_salary_series_sm(ref, float(salary), sm)
+        s_ipca = build_ipca_adjusted_series(ref, float(salary), ipca)
+        s_inpc = build_inpc_adjusted_series(ref, float(salary), inpc)
+        out.append(
+            (
+                s_sm["equiv_brl"].iloc[-1],
+                s_ipca["salary_ipca"].iloc[-1],
+                s_inpc["salary_inpc"].iloc[-1],
+            )
+        )
+    return np.array(out)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--rows", type=int, default=50_000)
+    ap.add_argument("--loop-rows", type=int, default=200)
+    args = ap.parse_args()
+
+    sm, ipca, inpc = _data.sources()
+    refs, salaries = _data.random_pairs(args.rows)
+
+    t0 = time.perf_counter()
+    batch = evolve_batch(refs, salaries, sm, ipca, inpc)
+    t_batch = time.perf_counter() - t0
+
+    n_loop = min(args.loop_rows, args.rows)
+    t0 = time.perf_counter()
+    looped = _loop(refs[:n_loop], salaries[:n_loop], sm, ipca, inpc)
+    t_loop = time.perf_counter() - t0
+
+    expected = batch[["equiv_brl", "salary_ipca", "salary_inpc"]].to_numpy()[:n_loop]
+    if not np.allclose(expected, looped, rtol=1e-12):
+        raise SystemExit("evolve_batch diverge do laço sobre as funções de série")
+
+    per_batch = t_batch / args.rows * 1e6
+    per_loop = t_loop / n_loop * 1e6
+    print(f"evolve_batch : {args.rows:>7} linhas em {t_batch:8.3f}s  ({per_batch:10.2f} µs/linha)")
+    print(f"laço séries  : {n_loop:>7} linhas em {t_loop:8.3f}s  ({per_loop:10.2f} µs/linha)")
+    print(f"ganho por linha: {per_loop / per_batch:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
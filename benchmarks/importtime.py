@@ -0,0 +1,129 @@
+"""
+Tempo de importação dos pontos de entrada (app, CLI, API), cada um num processo novo
+com `python -X importtime`: quanto um worker leva para subir antes de atender alguém.
+
+    python -m benchmarks.importtime [--repeat 5] [--json saida.json]
+    python -m benchmarks.importtime --compare base.json [--max-regression 0.2]
+
+Termina com código 1 se um ponto de entrada carregar um módulo que deveria ser
+importado só sob demanda (LAZY) ou, com --compare, se ficar mais lento que a base
+além da tolerância.
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import statistics
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# módulos que cada ponto de entrada não pode carregar ao subir
+LAZY = {
+    "app": ("altair", "requests", "tornado.web", "lxml", "bs4", "html5lib"),
+    "cli": ("streamlit", "altair", "requests", "tornado", "lxml", "bs4", "html5lib"),
+    "api": ("streamlit", "altair", "requests", "lxml", "bs4", "html5lib"),
+}
+
+
+def app_imports() -> str:
+    """
+    Os imports de nível superior do app.py (o script do Streamlit não pode ser importado
+    sem rodar a página inteira).
+    """
+    tree = ast.parse((ROOT / "app.py").read_text(encoding="utf-8"))
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def _entries() -> dict[str, str]:
+    return {
+        "app": app_imports(),
+        "cli": "import payevol.cli",
+        "api": "import payevol.api",
+    }
+
+
+def _importtime(code: str) -> dict[str, int]:
+    """
+    {módulo: tempo próprio em µs} de uma importação num interpretador novo.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    own = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _cumulative, name = line[len("import time:"):].split("|")
+        own[name.strip()] = int(self_us)
+    return own
+
+
+def _measure(code: str, repeat: int) -> dict:
+    runs = [_importtime(code) for _ in range(repeat)]
+    totals = [sum(run.values()) for run in runs]
+    # peso de cada pacote (primeiro nome do módulo) na execução mediana
+    median_run = runs[totals.index(sorted(totals)[len(totals) // 2])]
+    packages = Counter()
+    for name, us in median_run.items():
+        packages[name.split(".")[0]] += us
+    return {
+        "min_s": min(totals) / 1e6,
+        "median_s": statistics.median(totals) / 1e6,
+        "modules": sorted(median_run),
+        "top": {name: us / 1e6 for name, us in packages.most_common(5)},
+    }
+
+
+def _eager(entry: str, modules: list[str]) -> list[str]:
+    loaded = set(modules)
+    return [m for m in LAZY.get(entry, ()) if m in loaded]
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--only", default="", help="pontos de entrada, separados por vírgula")
+    ap.add_argument("--json", dest="json_out", help="grava os resultados neste arquivo")
+    ap.add_argument("--compare", help="resultados anteriores (--json) para comparar")
+    ap.add_argument("--max-regression", type=float, default=0.2)
+    args = ap.parse_args(argv)
+
+    only = {name for name in args.only.split(",") if name}
+    results, failures = {}, []
+    for entry, code in _entries().items():
+        if only and entry not in only:
+            continue
+        r = results[entry] = _measure(code, args.repeat)
+        top = "  ".join(f"{name} {s * 1e3:.0f}" for name, s in r["top"].items())
+        print(f"{entry:<6} min {r['min_s'] * 1e3:8.1f} ms  mediana {r['median_s'] * 1e3:8.1f} ms  ({top})")
+        for module in _eager(entry, r["modules"]):
+            failures.append(f"{entry}: importa {module} ao subir")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            base = json.load(f)
+        for entry, cur in results.items():
+            old = base.get(entry)
+            if old and old["median_s"] > 0 and cur["median_s"] > old["median_s"] * (1.0 + args.max_regression):
+                failures.append(f"{entry}: median_s {old['median_s']:.4g} -> {cur['median_s']:.4g}")
+
+    for line in failures:
+        print(f"REGRESSÃO {line}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
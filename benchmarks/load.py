@@ -0,0 +1,117 @@
+"""
+Teste de carga do app.py: N sessões Streamlit simultâneas (streamlit.testing AppTest),
+cada uma com R reexecuções com mês/ano de referência e salários aleatórios, contra o
+servidor substituto (benchmarks.standin) — nenhum acesso ao IBGE.
+
+O AppTest usa um Runtime global do Streamlit, então cada sessão roda em um processo
+próprio; as sessões compartilham o servidor e o armazenamento em disco ($PAYEVOL_DATA_DIR),
+mas não o st.cache_data.
+
+    python -m benchmarks.load [--sessions 8] [--reruns 10] [--latency 0.1] [--error-rate 0.0]
+
+Relata p50/p95/p99 da latência por reexecução e a memória (RSS máximo) por sessão.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.standin import StandinOptions, serve, source_env
+
+APP_PATH = Path(__file__).resolve().parent.parent / "app.py"
+
+
+def _maxrss_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _session(reruns: int, seed: int, timeout: float) -> tuple[list[float], list[str], float]:
+    """
+    Uma sessão: primeira execução + `reruns` mudanças de entrada (ano/salários, depois mês).
+    Devolve (latências em s, exceções/erros exibidos, RSS máximo em MiB).
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+
+    times, problems = [], []
+
+    def run(step):
+        t0 = time.perf_counter()
+        step()
+        times.append(time.perf_counter() - t0)
+        problems.extend(str(e.value) for e in at.exception)
+        problems.extend(str(e.value) for e in at.error)
+
+    run(at.run)
+    for _ in range(reruns):
+        if not at.selectbox:  # app parou (fonte indisponível)
+            break
+        year_box = at.selectbox[0]
+        year_box.set_value(rng.choice([int(y) for y in year_box.options]))
+        at.number_input[0].set_value(round(rng.uniform(500, 30_000), 2))
+        at.number_input[1].set_value(rng.choice([0.0, round(rng.uniform(1_000, 40_000), 2)]))
+        run(at.run)
+
+        month_box = at.selectbox[1]
+        month_box.set_value(rng.choice([int(m) for m in month_box.options]))
+        run(at.run)
+    return times, problems, _maxrss_mib()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sessions", type=int, default=8)
+    ap.add_argument("--reruns", type=int, default=10)
+    ap.add_argument("--latency", type=float, default=0.1, help="latência (s) do servidor substituto")
+    ap.add_argument("--jitter", type=float, default=0.05)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--timeout", type=float, default=120.0)
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    server = serve(0, StandinOptions(args.latency, args.jitter, args.error_rate))
+    os.environ.update(source_env(server))
+    # disco limpo: a primeira sessão paga o download completo
+    os.environ["PAYEVOL_DATA_DIR"] = tempfile.mkdtemp(prefix="payevol-load-")
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.sessions, mp_context=get_context("spawn")) as pool:
+        futures = [
+            pool.submit(_session, args.reruns, args.seed + i, args.timeout) for i in range(args.sessions)
+        ]
+        results = [f.result() for f in futures]
+    wall = time.perf_counter() - t0
+    server.shutdown()
+
+    first = np.array([t[0] for t, _, _ in results if t])
+    reruns = np.array([x for t, _, _ in results for x in t[1:]])
+    problems = [p for _, ps, _ in results for p in ps]
+    rss = np.array([r for _, _, r in results])
+
+    def pct(a: np.ndarray) -> str:
+        if a.size == 0:
+            return "sem amostras"
+        p50, p95, p99 = np.percentile(a, [50, 95, 99]) * 1e3
+        return f"p50 {p50:8.1f} ms  p95 {p95:8.1f} ms  p99 {p99:8.1f} ms  (n={a.size})"
+
+    print(f"sessões: {args.sessions}  reexecuções/sessão: {2 * args.reruns}  tempo total: {wall:.1f}s")
+    print(f"1ª execução  : {pct(first)}")
+    print(f"reexecuções  : {pct(reruns)}")
+    print(f"RSS/sessão   : mediana {np.median(rss):.0f} MiB  máx {rss.max():.0f} MiB  soma {rss.sum():.0f} MiB")
+    if problems:
+        print(f"erros exibidos: {len(problems)} (ex.: {problems[0][:120]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Grava as respostas reais das fontes em benchmarks/recorded/ (gzip), para que
+benchmarks.run use dados de verdade no lugar dos sintéticos.
+
+    python -m benchmarks.record
+"""
+from __future__ import annotations
+
+import gzip
+
+from benchmarks._data import RECORDED_DIR, recorded_path
+from payevol.core.config import min_wage_url
+from payevol.services.inpc import INPC_1736_PATH
+from payevol.services.inpc_var_7063 import sidra_7063_path
+from payevol.services.ipca import IPCA_SIDRA_PATH
+from payevol.services.sidra import sidra_url
+
+SOURCES = {
+    "sidra-1737.json": lambda: sidra_url(IPCA_SIDRA_PATH),
+    "sidra-1736-v2289.json": lambda: sidra_url(INPC_1736_PATH),
+    "sidra-7063.json": lambda: sidra_url(sidra_7063_path()),
+    "sidra-7063-c7169-v44.json": lambda: sidra_url(sidra_7063_path("7169", "44")),
+    "previdenciarista.html": min_wage_url,
+}
+
+
+def main() -> None:
+    from payevol.services.http_client import USER_AGENT, session
+
+    RECORDED_DIR.mkdir(exist_ok=True)
+    for name, source in SOURCES.items():
+        url = source()
+        # sem o cache condicional do http_client: sempre o corpo completo
+        r = session().get(url, headers={"User-Agent": USER_AGENT}, timeout=120)
+        r.raise_for_status()
+        recorded_path(name).write_bytes(gzip.compress(r.content))
+        print(f"{name:<24} {len(r.content):>12,} bytes  <- {url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Benchmark de ponta a ponta, offline: tempo e pico de memória por etapa
+(download/parse das fontes, séries, gráfico e tabela) sobre as respostas gravadas
+ou sintéticas de benchmarks/_data.py. Nenhuma chamada de rede é feita.
+
+    python -m benchmarks.run [--repeat 5] [--only sidra,ui] [--json saida.json]
+    python -m benchmarks.run --compare base.json [--max-regression 0.2]
+
+Com --compare, termina com código 1 se alguma etapa ficar mais lenta (mediana) ou
+usar mais memória (pico) que a base além da tolerância.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+from typing import Callable
+
+from benchmarks import _data
+
+
+def _install_fixtures() -> None:
+    """
+    Troca o cliente HTTP por um que responde com as fixtures (por trecho da URL).
+    """
+    from payevol.services import http_client
+    from payevol.services.http_client import CHUNK_SIZE, HttpResult, HttpStream
+
+    payloads = {
+        "/t/1737/": _data.sidra_1737(),
+        "/t/1736/": _data.sidra_1736(("2289",)),
+        "/v/44/c315/7169": _data.sidra_7063(variables=("44",), item_codes=("7169",)),
+        "/t/7063/": _data.sidra_7063(),
+        "previdenciarista.com": _data.min_wage_page(),
+    }
+
+    def get(url: str, timeout: float | None = None) -> HttpResult:
+        for key, content in payloads.items():
+            if key in url:
+                return HttpResult(url, content, "utf-8", False)
+        raise RuntimeError(f"Sem fixture para {url}")
+
+    def get_stream(url: str, timeout: float | None = None) -> HttpStream:
+        content = get(url, timeout).content
+        chunks = (content[i : i + CHUNK_SIZE] for i in range(0, len(content), CHUNK_SIZE))
+        return HttpStream(url, chunks, "utf-8", False)
+
+    http_client.get = get
+    http_client.get_stream = get_stream
+
+
+def _stages() -> dict[str, Callable[[], object]]:
+    from payevol.services.batch import evolve_batch
+    from payevol.services.chain import chain_index
+    from payevol.services.inpc import _fetch_inpc_index_from_1736
+    from payevol.services.inpc_var_7063 import _download_inpc_monthly_variation_7063
+    from payevol.services.lookup import monthly_table, step_series
+    from payevol.services.matrix import _matrices, factor_matrix
+    from payevol.services.ipca import _download_ipca_number_index
+    from payevol.services.min_wage import _scrape_min_wage_changes
+    from payevol.services.series import (
+        build_equivalent_salary_series_sm,
+        build_inpc_adjusted_series,
+        build_ipca_adjusted_series,
+    )
+    from payevol.services.sidra import iter_json_batches, parse_value_batches, parse_values
+    from payevol.ui.chart import build_chart_spec, build_plot_frame
+    from payevol.ui.heatmap import _specs, build_heatmap_spec
+    from payevol.ui.table import build_monthly_table
+
+    sm, ipca, inpc = _data.sources()
+    ref, salary = date(1994, 7, 1), 1000.0
+    var_7063 = _download_inpc_monthly_variation_7063("Índice geral", "Variação mensal")
+    s_sm = build_equivalent_salary_series_sm(ref, salary, sm)
+    s_ipca = build_ipca_adjusted_series(ref, salary, ipca)
+    s_inpc = build_inpc_adjusted_series(ref, salary, inpc)
+    plot_df = build_plot_frame(s_sm, s_ipca, s_inpc, 5000.0)
+    refs, salaries = _data.random_pairs(10_000)
+
+    raw = {
+        "1737": _data.sidra_1737(),
+        "1736": _data.sidra_1736(),
+        "7063": _data.sidra_7063(),
+    }
+
+    def stream(content: bytes):
+        return parse_value_batches(iter_json_batches(content[i : i + 65536] for i in range(0, len(content), 65536)))
+
+    return {
+        "sidra.parse.1737": lambda: parse_values(json.loads(raw["1737"])),
+        "sidra.parse.1736": lambda: parse_values(json.loads(raw["1736"])),
+        "sidra.parse.7063": lambda: parse_values(json.loads(raw["7063"])),
+        "sidra.stream.1736": lambda: stream(raw["1736"]),
+        "sidra.stream.7063": lambda: stream(raw["7063"]),
+        "ipca.download": _download_ipca_number_index,
+        "inpc.1736": _fetch_inpc_index_from_1736,
+        "inpc.7063": lambda: _download_inpc_monthly_variation_7063("Índice geral", "Variação mensal"),
+        "inpc.7063.wide": lambda: _download_inpc_monthly_variation_7063(
+            "Índice geral", "Variação mensal", item_code="all", variable_code="all"
+        ),
+        "inpc.chain": lambda: chain_index(var_7063, "inpc_var_mensal_pct", "inpc_index"),
+        "min_wage.scrape": lambda: _scrape_min_wage_changes(skip_unchanged=False),
+        "lookup.table.sm": lambda: monthly_table(sm, "min_wage"),
+        "lookup.steps.sm": lambda: step_series(sm, "min_wage"),
+        "series.sm": lambda: build_equivalent_salary_series_sm(ref, salary, sm),
+        "series.ipca": lambda: build_ipca_adjusted_series(ref, salary, ipca),
+        "series.inpc": lambda: build_inpc_adjusted_series(ref, salary, inpc),
+        "batch.10k": lambda: evolve_batch(refs, salaries, sm, ipca, inpc),
+        # sem os caches por versão dos dados: custo da primeira montagem
+        "matrix.ipca": lambda: (_matrices.clear(), factor_matrix("ipca", ipca)),
+        "ui.heatmap": lambda: (_specs.clear(), build_heatmap_spec(factor_matrix("ipca", ipca), 12)),
+        "ui.plot_frame": lambda: build_plot_frame(s_sm, s_ipca, s_inpc, 5000.0),
+        "ui.chart_spec": lambda: build_chart_spec(plot_df),
+        "ui.table": lambda: build_monthly_table(s_sm, s_ipca, s_inpc),
+        "ui.table_text": lambda: build_monthly_table(s_sm, s_ipca, s_inpc, formatted=True),
+    }
+
+
+def _measure(fn: Callable[[], object], repeat: int) -> dict:
+    """
+    min/mediana do tempo em `repeat` execuções + pico de memória (tracemalloc) numa execução à parte.
+    Etapas que levantam exceção são registradas com o erro, sem interromper as demais.
+    """
+    try:
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+    return {"min_s": min(times), "median_s": statistics.median(times), "peak_bytes": peak}
+
+
+def _compare(results: dict, base: dict, max_regression: float) -> list[str]:
+    failures = []
+    for name, cur in results.items():
+        old = base.get(name)
+        if old is None or "error" in old:
+            continue
+        if "error" in cur:
+            failures.append(f"{name}: falhou ({cur['error']})")
+            continue
+        for key in ("median_s", "peak_bytes"):
+            if old[key] > 0 and cur[key] > old[key] * (1.0 + max_regression):
+                failures.append(f"{name}: {key} {old[key]:.6g} -> {cur[key]:.6g}")
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--only", default="", help="prefixos das etapas, separados por vírgula")
+    ap.add_argument("--json", dest="json_out", help="grava os resultados neste arquivo")
+    ap.add_argument("--compare", help="resultados anteriores (--json) para comparar")
+    ap.add_argument("--max-regression", type=float, default=0.2)
+    args = ap.parse_args(argv)
+
+    # isola marcadores/caches gravados pelas etapas
+    os.environ.setdefault("PAYEVOL_DATA_DIR", tempfile.mkdtemp(prefix="payevol-bench-"))
+    _install_fixtures()
+
+    prefixes = tuple(p for p in args.only.split(",") if p)
+    results = {}
+    for name, fn in _stages().items():
+        if prefixes and not name.startswith(prefixes):
+            continue
+        r = results[name] = _measure(fn, args.repeat)
+        if "error" in r:
+            print(f"{name:<18} ERRO {r['error']}")
+        else:
+            print(
+                f"{name:<18} min {r['min_s'] * 1e3:9.2f} ms  mediana {r['median_s'] * 1e3:9.2f} ms"
+                f"  pico {r['peak_bytes'] / 2**20:8.2f} MiB"
+            )
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            failures = _compare(results, json.load(f), args.max_regression)
+        for line in failures:
+            print(f"REGRESSÃO {line}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,182 @@
+"""
+Servidor local que faz o papel do SIDRA (/values/t/<tabela>/...) e da página do
+Previdenciarista, respondendo com as fixtures de benchmarks/_data.py (gravadas ou
+sintéticas). Permite injetar latência, erros e respostas 304.
+
+    python -m benchmarks.standin [--port 8765] [--latency 0.2] [--jitter 0.1] [--error-rate 0.05]
+
+Para apontar o payEvol para ele:
+
+    PAYEVOL_SIDRA_BASE=http://127.0.0.1:8765 \\
+    PAYEVOL_MIN_WAGE_URL=http://127.0.0.1:8765/tabela-historica-dos-salarios-minimos/ \\
+    streamlit run app.py
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+from benchmarks import _data
+
+MIN_WAGE_PATH = "/tabela-historica-dos-salarios-minimos/"
+
+_RX_TABLE = re.compile(r"^/values/t/(\d+)/")
+_RX_LAST = re.compile(r"/p/last(?:%20|\s)(\d+)")
+_RX_VARIABLES = re.compile(r"/v/(\d+(?:,\d+)*)")
+_RX_ITEMS = re.compile(r"/c315/(\d+(?:,\d+)*)")
+
+# tabela -> fixture(variables, items); None equivale a v/all ou c315/all
+_TABLES: dict[str, Callable[[tuple[str, ...] | None, tuple[str, ...] | None], bytes]] = {
+    "1737": lambda variables, items: _data.sidra_1737(),
+    "1736": lambda variables, items: _data.sidra_1736(variables),
+    "7063": lambda variables, items: _data.sidra_7063(variables=variables, item_codes=items),
+}
+
+
+@dataclass
+class StandinOptions:
+    """
+    latency/jitter: atraso (s) antes de cada resposta (latency + uniforme em [0, jitter])
+    error_rate: fração das requisições respondidas com error_status
+    etag: envia ETag e responde 304 a If-None-Match igual
+    """
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    etag: bool = True
+
+
+@lru_cache(maxsize=None)
+def _table(table: str, variables: tuple[str, ...] | None, items: tuple[str, ...] | None) -> bytes:
+    return _TABLES[table](variables, items)
+
+
+@lru_cache(maxsize=None)
+def _table_rows(table: str, variables: tuple[str, ...] | None, items: tuple[str, ...] | None) -> list:
+    return json.loads(_table(table, variables, items))
+
+
+@lru_cache(maxsize=64)
+def _payload(path: str) -> tuple[bytes, str] | None:
+    """
+    Corpo e content-type para o caminho pedido; v/<códigos> e c315/<códigos> filtram
+    variáveis e itens, e p/last N devolve só os N últimos períodos.
+    """
+    if path.rstrip("/") == MIN_WAGE_PATH.rstrip("/"):
+        return _data.min_wage_page(), "text/html; charset=utf-8"
+
+    m = _RX_TABLE.match(path)
+    if not m or m.group(1) not in _TABLES:
+        return None
+
+    v = _RX_VARIABLES.search(path)
+    variables = tuple(v.group(1).split(",")) if v else None
+    c = _RX_ITEMS.search(path)
+    items = tuple(c.group(1).split(",")) if c else None
+    last = _RX_LAST.search(path)
+    if last is None:
+        return _table(m.group(1), variables, items), "application/json; charset=utf-8"
+
+    header, *rows = _table_rows(m.group(1), variables, items)
+    period_key = next(k for k, v in header.items() if k.endswith("C") and str(v).startswith("Mês"))
+    keep = set(sorted({r[period_key] for r in rows})[-int(last.group(1)):])
+    body = [header, *(r for r in rows if r[period_key] in keep)]
+    return json.dumps(body, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    options = StandinOptions()
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        opts = self.options
+        delay = opts.latency + random.uniform(0.0, opts.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if opts.error_rate > 0 and random.random() < opts.error_rate:
+            self._send(opts.error_status, b"erro injetado", "text/plain; charset=utf-8")
+            return
+
+        found = _payload(self.path)
+        if found is None:
+            self._send(404, b"sem fixture", "text/plain; charset=utf-8")
+            return
+
+        body, content_type = found
+        headers = {}
+        if opts.etag:
+            tag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            headers["ETag"] = tag
+            if self.headers.get("If-None-Match") == tag:
+                self._send(304, b"", None, headers)
+                return
+        self._send(200, body, content_type, headers)
+
+    def _send(self, status: int, body: bytes, content_type: str | None, headers: dict | None = None):
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port: int = 0, options: StandinOptions | None = None) -> ThreadingHTTPServer:
+    """
+    Sobe o servidor numa thread (porta 0 = livre) e devolve o servidor;
+    a URL base é f"http://127.0.0.1:{server.server_port}". Pare com server.shutdown().
+    """
+    handler = type("Handler", (_Handler,), {"options": options or StandinOptions()})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def source_env(server: ThreadingHTTPServer) -> dict[str, str]:
+    """
+    Variáveis de ambiente que apontam as fontes do payEvol para o servidor.
+    """
+    base = f"http://127.0.0.1:{server.server_port}"
+    return {"PAYEVOL_SIDRA_BASE": base, "PAYEVOL_MIN_WAGE_URL": base + MIN_WAGE_PATH}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0)
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--error-status", type=int, default=503)
+    ap.add_argument("--no-etag", action="store_true", help="não envia ETag (nunca responde 304)")
+    args = ap.parse_args()
+
+    options = StandinOptions(args.latency, args.jitter, args.error_rate, args.error_status, not args.no_etag)
+    server = serve(args.port, options)
+    for k, v in source_env(server).items():
+        print(f"{k}={v}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
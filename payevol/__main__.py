@@ -0,0 +1,5 @@
+import sys
+
+from payevol.cli import main
+
+sys.exit(main())
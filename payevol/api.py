@@ -0,0 +1,361 @@
+"""
+API HTTP (JSON) do payEvol, assíncrona (tornado), sobre a mesma camada de
+busca/cache e as mesmas funções de payevol.services.series.
+
+    python -m payevol serve [--port 8000] [--address 127.0.0.1]
+
+Rotas:
+  GET  /health
+  GET  /series/<min_wage|ipca|inpc>
+  GET  /evolution?ref=2010-03&salary=5000[&last=1]
+  POST /evolution/batch   {"items": [{"ref": "2010-03", "salary": 5000}, ...]}
+  GET  /matrix?method=ipca[&step=12]   (sm, ipca, inpc ou sm/ipca)
+  GET  /metrics           (formato texto do Prometheus)
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import tornado.web
+from tornado.ioloop import IOLoop
+
+from payevol.core import metrics
+from payevol.core.cache import LruCache
+from payevol.core.dates import MIN_REF, parse_month
+from payevol.services.batch import evolve_batch, parse_batch_items
+from payevol.services.loader import SOURCE_LABELS, Sources, load_sources
+from payevol.services.lookup import MonthlyTable, StepSeries, month_at, monthly_table, step_series
+from payevol.services.matrix import METHOD_LABELS, method_matrix
+from payevol.services.refresher import start_refresher
+from payevol.services.series import (
+    build_equivalent_salary_series_sm,
+    build_inpc_adjusted_series,
+    build_ipca_adjusted_series,
+)
+
+# nome na URL -> (atributo em Sources, coluna de valores)
+SERIES = {
+    "min_wage": ("sm_changes", "min_wage"),
+    "ipca": ("ipca_index", "ipca_index"),
+    "inpc": ("inpc_index", "inpc_index"),
+}
+# intervalo (s) para rematerializar as séries a partir da camada de cache
+RELOAD_EVERY = 10 * 60
+MAX_BATCH_ITEMS = 100_000
+# nome na URL -> chave em payevol.services.matrix
+MATRIX_TABLES = {"min_wage": "sm", "ipca": "ipca", "inpc": "inpc"}
+
+# corpo JSON de /matrix por (método, versões dos dados, passo)
+_matrix_bodies = LruCache("api.matrix", 16)
+
+
+@dataclass(frozen=True)
+class WarmData:
+    """
+    Séries carregadas e já materializadas (somente leitura, compartilhadas): StepSeries para o
+    salário mínimo (um trecho por reajuste), MonthlyTable para os índices.
+    """
+    sources: Sources
+    tables: dict[str, MonthlyTable | StepSeries]
+    loaded_at: float
+
+
+def load_warm_data() -> WarmData:
+    sources = load_sources()
+    tables = {}
+    for name, (attr, col) in SERIES.items():
+        df = getattr(sources, attr)
+        if df is not None:
+            tables[name] = step_series(df, col) if name == "min_wage" else monthly_table(df, col)
+    return WarmData(sources, tables, time.time())
+
+
+class DataHolder:
+    """
+    Guarda os dados quentes. A primeira requisição espera a carga; depois, quando
+    passam de `reload_every` segundos, a recarga roda em segundo plano (numa thread)
+    e as requisições seguem com os dados anteriores.
+    """
+
+    def __init__(self, reload_every: float = RELOAD_EVERY) -> None:
+        self.reload_every = reload_every
+        self.warm: WarmData | None = None
+        self._task: asyncio.Future | None = None
+
+    def _reload(self) -> asyncio.Future:
+        if self._task is None or self._task.done():
+            loop = asyncio.get_running_loop()
+            self._task = asyncio.ensure_future(loop.run_in_executor(None, load_warm_data))
+            self._task.add_done_callback(self._store)
+        return self._task
+
+    def _store(self, task: asyncio.Future) -> None:
+        if not task.cancelled() and task.exception() is None:
+            self.warm = task.result()
+
+    async def get(self) -> WarmData:
+        if self.warm is None:
+            return await self._reload()
+        if time.time() - self.warm.loaded_at > self.reload_every:
+            self._reload()
+        return self.warm
+
+
+def _months(values) -> list[str]:
+    return pd.DatetimeIndex(values).strftime("%Y-%m").tolist()
+
+
+def _money(values) -> list:
+    # NaN -> null no JSON
+    arr = np.round(np.asarray(values, dtype="float64"), 2)
+    return [None if v != v else v for v in arr.tolist()]
+
+
+def _factors(values) -> list:
+    arr = np.round(np.asarray(values, dtype="float64"), 6)
+    return [None if v != v else v for v in arr.tolist()]
+
+
+def _batch_body(refs: list, salaries: list, tables: dict[str, MonthlyTable | StepSeries]) -> str:
+    """
+    Corpo JSON de POST /evolution/batch (roda no executor: lotes grandes).
+    """
+    out = evolve_batch(refs, salaries, tables["min_wage"], tables["ipca"], tables.get("inpc"))
+    cols = {
+        "ref": _months(out["ref_date"]),
+        "salary": out["salary_ref"].tolist(),
+        "target": _months(out["target_date"]),
+        "sm_ref": _money(out["sm_ref"]),
+        "equiv_sm": _money(out["equiv_brl"]),
+        "salary_ipca": _money(out["salary_ipca"]),
+        "salary_inpc": _money(out["salary_inpc"]),
+    }
+    keys = list(cols)
+    rows = [dict(zip(keys, row)) for row in zip(*cols.values())]
+    return json.dumps({"results": rows}, ensure_ascii=False, allow_nan=False)
+
+
+class ApiHandler(tornado.web.RequestHandler):
+    def set_default_headers(self) -> None:
+        self.set_header("Content-Type", "application/json; charset=utf-8")
+
+    @property
+    def data(self) -> DataHolder:
+        return self.settings["data"]
+
+    def fail(self, status: int, message: str):
+        raise tornado.web.HTTPError(status, log_message=message)
+
+    def write_json(self, payload) -> None:
+        self.finish(json.dumps(payload, ensure_ascii=False, allow_nan=False))
+
+    def write_error(self, status_code: int, **kwargs) -> None:
+        err = kwargs.get("exc_info", (None, None))[1]
+        message = getattr(err, "log_message", None) or self._reason
+        self.finish(json.dumps({"error": message}, ensure_ascii=False))
+
+    def on_finish(self) -> None:
+        route = type(self).__name__.removesuffix("Handler").lower()
+        metrics.observe(
+            "payevol_stage_seconds", self.request.request_time(), stage=f"api.{route}", ok=str(self.get_status() < 400).lower()
+        )
+
+    def ref_arg(self, value: str):
+        try:
+            ref = parse_month(value)
+        except ValueError as e:
+            self.fail(400, str(e))
+        if ref < MIN_REF:
+            self.fail(400, "a referência mínima é 07/1994")
+        return ref
+
+    async def warm(self) -> WarmData:
+        try:
+            warm = await self.data.get()
+        except Exception as e:
+            self.fail(503, f"fontes indisponíveis: {e}")
+        if "min_wage" not in warm.tables or "ipca" not in warm.tables:
+            errors = "; ".join(f"{SOURCE_LABELS[k]}: {v}" for k, v in warm.sources.errors.items())
+            self.fail(503, f"fontes indisponíveis: {errors}")
+        return warm
+
+
+class HealthHandler(ApiHandler):
+    async def get(self):
+        warm = self.data.warm
+        self.write_json(
+            {
+                "status": "ok" if warm is not None else "loading",
+                "loaded_at": warm.loaded_at if warm else None,
+                "series": {
+                    name: {
+                        "first": t.first_date.strftime("%Y-%m"),
+                        "last": month_at(t.end).strftime("%Y-%m"),
+                    }
+                    for name, t in (warm.tables.items() if warm else ())
+                },
+                "errors": {k: str(v) for k, v in warm.sources.errors.items()} if warm else {},
+            }
+        )
+
+
+class SeriesHandler(ApiHandler):
+    async def get(self, name: str):
+        if name not in SERIES:
+            self.fail(404, f"série desconhecida: {name} (use {', '.join(SERIES)})")
+        warm = await self.warm()
+        attr, col = SERIES[name]
+        df = getattr(warm.sources, attr)
+        if df is None:
+            self.fail(503, f"{SOURCE_LABELS[attr]} indisponível: {warm.sources.errors.get(attr)}")
+        out = {
+            "name": name,
+            "ref_date": _months(df["ref_date"]),
+            "value": df[col].astype("float64").tolist(),
+        }
+        if "source" in df.columns:
+            out["source"] = df["source"].astype(str).tolist()
+        self.write_json(out)
+
+
+class EvolutionHandler(ApiHandler):
+    async def get(self):
+        ref = self.ref_arg(self.get_query_argument("ref"))
+        try:
+            salary = float(self.get_query_argument("salary"))
+        except ValueError:
+            self.fail(400, "salary precisa ser um número")
+        if not (math.isfinite(salary) and salary >= 0):
+            self.fail(400, "salary precisa ser um número >= 0")
+        last = self.get_query_argument("last", "0").lower() in ("1", "true", "sim")
+
+        warm = await self.warm()
+        sm = build_equivalent_salary_series_sm(ref, salary, warm.tables["min_wage"])
+        try:
+            ipca = build_ipca_adjusted_series(ref, salary, warm.tables["ipca"])
+        except RuntimeError as e:
+            self.fail(422, str(e))
+        series = {
+            "ref_date": _months(sm["ref_date"]),
+            "min_wage": _money(sm["min_wage"]),
+            "equiv_sm": _money(sm["equiv_brl"]),
+            "salary_ipca": _money(ipca["salary_ipca"]),
+        }
+        warnings = []
+        if "inpc" in warm.tables:
+            try:
+                inpc = build_inpc_adjusted_series(ref, salary, warm.tables["inpc"])
+                series["salary_inpc"] = _money(inpc["salary_inpc"])
+            except RuntimeError as e:
+                warnings.append(str(e))
+
+        # registros (uma linha por mês); com last=1, só o último
+        keys = list(series)
+        rows = [dict(zip(keys, row)) for row in zip(*series.values())]
+        self.write_json(
+            {
+                "ref": ref.strftime("%Y-%m"),
+                "salary": salary,
+                "sm_ref": sm.attrs["sm_ref"],
+                "k_sm": sm.attrs["k_sm"],
+                "series": rows[-1:] if last else rows,
+                "warnings": warnings,
+            }
+        )
+
+
+class BatchHandler(ApiHandler):
+    async def post(self):
+        try:
+            body = json.loads(self.request.body or b"null")
+        except ValueError:
+            self.fail(400, "corpo precisa ser JSON")
+        items = body.get("items") if isinstance(body, dict) else body
+        if not isinstance(items, list) or not items:
+            self.fail(400, 'envie {"items": [{"ref": "AAAA-MM", "salary": 1234.5}, ...]}')
+        if len(items) > MAX_BATCH_ITEMS:
+            self.fail(413, f"no máximo {MAX_BATCH_ITEMS} itens por requisição")
+
+        # até MAX_BATCH_ITEMS itens: validação, cálculo e JSON rodam fora do event loop
+        loop = IOLoop.current()
+        try:
+            refs, salaries = await loop.run_in_executor(None, parse_batch_items, items)
+        except ValueError as e:
+            self.fail(400, str(e))
+
+        warm = await self.warm()
+        self.finish(await loop.run_in_executor(None, _batch_body, refs, salaries, warm.tables))
+
+
+class MatrixHandler(ApiHandler):
+    async def get(self):
+        method = self.get_query_argument("method", "ipca")
+        if method not in METHOD_LABELS:
+            self.fail(400, f"método desconhecido: {method} (use {', '.join(METHOD_LABELS)})")
+        try:
+            step = int(self.get_query_argument("step", "1"))
+        except ValueError:
+            step = 0
+        if step < 1:
+            self.fail(400, "step precisa ser um inteiro >= 1")
+
+        warm = await self.warm()
+        tables = {MATRIX_TABLES[k]: t for k, t in warm.tables.items()}
+        loop = IOLoop.current()
+        try:
+            # montar a matriz (centenas de meses ao quadrado) não pode travar o event loop
+            matrix = await loop.run_in_executor(None, method_matrix, method, tables)
+        except KeyError as e:
+            self.fail(503, f"série indisponível para {method}: {e}")
+
+        def body() -> str:
+            # linha i: fatores da referência months[i] para months[i:], sem o triângulo vazio
+            m = matrix.sample(step)
+            return json.dumps(
+                {
+                    "method": method,
+                    "months": _months(m.dates),
+                    "factors": [_factors(row[i:]) for i, row in enumerate(m.factors)],
+                },
+                allow_nan=False,
+            )
+
+        self.finish(
+            await loop.run_in_executor(None, _matrix_bodies.get_or_compute, (method, matrix.version, step), body)
+        )
+
+
+class MetricsHandler(tornado.web.RequestHandler):
+    def get(self):
+        self.set_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.finish(metrics.render_prometheus())
+
+
+def make_app(reload_every: float = RELOAD_EVERY) -> tornado.web.Application:
+    return tornado.web.Application(
+        [
+            (r"/health", HealthHandler),
+            (r"/series/([a-z_]+)", SeriesHandler),
+            (r"/evolution", EvolutionHandler),
+            (r"/evolution/batch", BatchHandler),
+            (r"/matrix", MatrixHandler),
+            (r"/metrics", MetricsHandler),
+        ],
+        data=DataHolder(reload_every),
+    )
+
+
+async def serve(port: int = 8000, address: str = "127.0.0.1", reload_every: float = RELOAD_EVERY) -> None:
+    start_refresher()
+    app = make_app(reload_every)
+    app.listen(port, address)
+    # aquece antes da primeira requisição
+    await app.settings["data"].get()
+    print(f"payEvol API em http://{address}:{port}")
+    await asyncio.Event().wait()
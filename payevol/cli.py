@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import date
+
+import pandas as pd
+
+from payevol.core.dates import MIN_REF, add_months, first_day_current_month
+from payevol.core.dates import parse_month as _parse_month
+
+FORMATS = ("table", "csv", "json")
+
+
+def parse_month(text: str) -> date:
+    """
+    'AAAA-MM' ou 'MM/AAAA' -> 1º dia do mês.
+    """
+    try:
+        d = _parse_month(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    if d < MIN_REF:
+        raise argparse.ArgumentTypeError("a referência mínima é 07/1994")
+    return d
+
+
+def _write(df: pd.DataFrame, fmt: str) -> None:
+    if fmt == "csv":
+        df.to_csv(sys.stdout, index=False, date_format="%Y-%m", float_format="%.2f")
+    elif fmt == "json":
+        sys.stdout.write(df.to_json(orient="records", date_format="iso", double_precision=2))
+        sys.stdout.write("\n")
+    else:
+        sys.stdout.write(df.to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+        sys.stdout.write("\n")
+
+
+def _load(force: bool = False):
+    from payevol.services.loader import SOURCE_LABELS, load_sources
+
+    sources = load_sources(force)
+    for name, err in sources.errors.items():
+        print(f"aviso: {SOURCE_LABELS[name]} indisponível: {err}", file=sys.stderr)
+    if sources.sm_changes is None or sources.ipca_index is None:
+        raise SystemExit(1)
+    return sources
+
+
+def cmd_evolve(args: argparse.Namespace) -> None:
+    from payevol.services.lookup import monthly_table, step_series
+    from payevol.services.series import (
+        build_equivalent_salary_series_sm,
+        build_inpc_adjusted_series,
+        build_ipca_adjusted_series,
+    )
+
+    sources = _load()
+    sm = build_equivalent_salary_series_sm(args.ref, args.salary, step_series(sources.sm_changes, "min_wage"))
+    ipca = build_ipca_adjusted_series(args.ref, args.salary, monthly_table(sources.ipca_index, "ipca_index"))
+
+    out = pd.DataFrame(
+        {
+            "ref_date": sm["ref_date"],
+            "min_wage": sm["min_wage"],
+            "equiv_sm": sm["equiv_brl"],
+            "salary_ipca": ipca["salary_ipca"].to_numpy(),
+        }
+    )
+    if sources.inpc_index is not None:
+        try:
+            inpc = build_inpc_adjusted_series(
+                args.ref, args.salary, monthly_table(sources.inpc_index, "inpc_index")
+            )
+            out["salary_inpc"] = inpc["salary_inpc"].to_numpy()
+        except RuntimeError as e:
+            print(f"aviso: {e}", file=sys.stderr)
+
+    if args.last:
+        out = out.tail(1)
+    _write(out, args.format)
+
+
+def cmd_batch(args: argparse.Namespace) -> None:
+    from payevol.services.batch import evolve_batch, parse_batch_items
+
+    pairs = pd.read_csv(args.input, dtype={"ref": str})
+    missing = {"ref", "salary"} - set(pairs.columns)
+    if missing:
+        raise SystemExit(f"erro: colunas ausentes no CSV: {', '.join(sorted(missing))}")
+    # mesmas regras do POST /evolution/batch (ValueError vira "erro: item i: ..." no main)
+    refs, salaries = parse_batch_items(pairs[["ref", "salary"]].to_dict("records"))
+
+    sources = _load()
+    out = evolve_batch(refs, salaries, sources.sm_changes, sources.ipca_index, sources.inpc_index)
+    _write(out, args.format)
+
+
+def cmd_refresh(args: argparse.Namespace) -> None:
+    sources = _load(force=args.force)
+    for name in ("sm_changes", "ipca_index", "inpc_index"):
+        df = getattr(sources, name)
+        if df is not None:
+            print(f"{name}: {len(df)} linhas, último mês {pd.Timestamp(df['ref_date'].max()):%m/%Y}")
+
+
+def cmd_serve(args: argparse.Namespace) -> None:
+    import asyncio
+
+    from payevol.api import serve
+
+    asyncio.run(serve(args.port, args.address, args.reload))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    default_ref = add_months(first_day_current_month(), -1)
+
+    ap = argparse.ArgumentParser(prog="payevol", description="payEvol - Evolução Salarial (linha de comando)")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("evolve", help="série mensal de um salário: k×SM, IPCA e INPC")
+    p.add_argument("--ref", type=parse_month, default=default_ref, help="mês de referência (AAAA-MM)")
+    p.add_argument("--salary", type=float, required=True, help="salário na referência (R$)")
+    p.add_argument("--last", action="store_true", help="só o último mês")
+    p.add_argument("--format", choices=FORMATS, default="table")
+    p.set_defaults(func=cmd_evolve)
+
+    p = sub.add_parser("batch", help="último mês para vários pares de um CSV com colunas ref,salary")
+    p.add_argument("--input", default="-", help="CSV de entrada (padrão: stdin)")
+    p.add_argument("--format", choices=FORMATS, default="csv")
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser("refresh", help="atualiza as séries salvas em disco (para cron)")
+    p.add_argument("--force", action="store_true", help="ignora a idade da cópia em disco")
+    p.set_defaults(func=cmd_refresh)
+
+    p = sub.add_parser("serve", help="API HTTP (JSON) com as séries e os cálculos")
+    p.add_argument("--port", type=int, default=8000)
+    p.add_argument("--address", default="127.0.0.1", help="endereço de escuta (0.0.0.0 para todas as interfaces)")
+    p.add_argument("--reload", type=float, default=600, help="segundos entre recargas das séries em segundo plano")
+    p.set_defaults(func=cmd_serve)
+
+    return ap
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if getattr(args, "input", None) == "-":
+        args.input = sys.stdin
+    try:
+        args.func(args)
+    except (RuntimeError, ValueError) as e:
+        print(f"erro: {e}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import functools
+import threading
+from contextlib import contextmanager
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterator, Protocol
+
+from payevol.core import metrics
+from payevol.core.frames import is_canonical
+from payevol.core.locks import single_flight
+
+
+class CacheBackend(Protocol):
+    def call(self, fn: Callable, ttl: float, args: tuple, kwargs: dict) -> Any: ...
+
+    def clear(self, fn: Callable | None = None) -> None: ...
+
+
+class MemoryCache:
+    """
+    Memoização por (função, argumentos) com expiração, dentro do processo.
+    """
+
+    def __init__(self) -> None:
+        self._data: dict[tuple, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def call(self, fn: Callable, ttl: float, args: tuple, kwargs: dict) -> Any:
+        key = (fn.__module__, fn.__qualname__, args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        with self._lock:
+            hit = self._data.get(key)
+        if hit is None or hit[0] <= now:
+            value = fn(*args, **kwargs)
+            with self._lock:
+                self._data[key] = (now + ttl, value)
+        else:
+            value = hit[1]
+        # como o st.cache_data, devolve uma cópia (DataFrames são mutáveis);
+        # séries canônicas são compartilhadas sem cópia (contrato: ninguém as modifica)
+        if is_canonical(value) or not hasattr(value, "copy"):
+            return value
+        return value.copy()
+
+    def clear(self, fn: Callable | None = None) -> None:
+        with self._lock:
+            if fn is None:
+                self._data.clear()
+                return
+            for key in [k for k in self._data if k[:2] == (fn.__module__, fn.__qualname__)]:
+                del self._data[key]
+
+
+class LruCache:
+    """
+    Memoização limitada a `maxsize` chaves (sai a usada há mais tempo), segura entre threads.
+    Misses simultâneos na mesma chave calculam uma vez só (locks.single_flight); quem
+    esperou conta como hit. `name` identifica o cache em payevol_cache_requests_total.
+    """
+
+    def __init__(self, name: str, maxsize: int) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Any, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                value = self._data[key]
+                metrics.inc("payevol_cache_requests_total", fn=self.name, result="hit")
+                return value
+
+        computed = False
+
+        def run() -> Any:
+            nonlocal computed
+            with self._lock:
+                # guardado por outra busca entre a consulta acima e esta
+                if key in self._data:
+                    return self._data[key]
+            value = compute()
+            computed = True
+            with self._lock:
+                self._data[key] = value
+                self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+            return value
+
+        value = single_flight(f"{self.name}:{key!r}", run, across_processes=False, label=self.name)
+        metrics.inc("payevol_cache_requests_total", fn=self.name, result="miss" if computed else "hit")
+        return value
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class StreamlitCache:
+    """
+    Encaminha para st.cache_data (importado só quando este backend é usado).
+    """
+
+    def __init__(self) -> None:
+        self._wrapped: dict[Callable, Callable] = {}
+        self._lock = threading.Lock()
+
+    def call(self, fn: Callable, ttl: float, args: tuple, kwargs: dict) -> Any:
+        with self._lock:
+            wrapped = self._wrapped.get(fn)
+            if wrapped is None:
+                import streamlit as st
+
+                wrapped = st.cache_data(ttl=ttl, show_spinner=False)(fn)
+                self._wrapped[fn] = wrapped
+        return wrapped(*args, **kwargs)
+
+    def clear(self, fn: Callable | None = None) -> None:
+        # chamado também pelas threads de atualização em segundo plano
+        with self._lock:
+            wrapped = list(self._wrapped.values()) if fn is None else [self._wrapped.get(fn)]
+        for w in wrapped:
+            if w is not None:
+                w.clear()
+
+
+_backend: CacheBackend = MemoryCache()
+# marca, por thread, se a função foi executada de fato (miss) dentro do backend
+_state = threading.local()
+
+
+def set_cache_backend(backend: CacheBackend) -> None:
+    global _backend
+    _backend = backend
+
+
+def get_cache_backend() -> CacheBackend:
+    return _backend
+
+
+@contextmanager
+def bypass() -> Iterator[None]:
+    """
+    Dentro do bloco (só nesta thread), as funções @cached executam direto, sem ler
+    nem gravar no backend (ex.: atualização em segundo plano das fontes).
+    """
+    outer = getattr(_state, "bypass", False)
+    _state.bypass = True
+    try:
+        yield
+    finally:
+        _state.bypass = outer
+
+
+def cached(ttl: float) -> Callable[[Callable], Callable]:
+    """
+    Decorator: resultado guardado por `ttl` segundos no backend ativo no momento da chamada.
+    Padrão: MemoryCache (CLI, jobs em lote, testes). O app.py troca para o
+    st.cache_data com set_cache_backend(StreamlitCache()).
+    Cada chamada conta em payevol_cache_requests_total{fn, result=hit|miss}.
+    `f.clear()` descarta só os resultados guardados de `f` (como no st.cache_data).
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def compute(*args, **kwargs):
+            _state.computed = True
+            return fn(*args, **kwargs)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if getattr(_state, "bypass", False):
+                return fn(*args, **kwargs)
+            outer = getattr(_state, "computed", False)
+            _state.computed = False
+            try:
+                value = _backend.call(compute, ttl, args, kwargs)
+                result = "miss" if _state.computed else "hit"
+            finally:
+                _state.computed = outer
+            metrics.inc("payevol_cache_requests_total", fn=fn.__qualname__, result=result)
+            return value
+
+        wrapper.clear = lambda: _backend.clear(compute)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,81 @@
+import os
+from pathlib import Path
+
+# Diretório onde ficam os dados persistidos (séries, caches etc.)
+DATA_DIR_ENV = "PAYEVOL_DATA_DIR"
+
+# Idade máxima (segundos) de uma série salva antes de buscar de novo na fonte
+SOURCE_MAX_AGE = 60 * 60 * 24
+SOURCE_MAX_AGE_ENV = "PAYEVOL_SOURCE_MAX_AGE"
+
+
+def data_dir() -> Path:
+    """
+    Diretório de dados do payEvol.
+    Usa $PAYEVOL_DATA_DIR se definido; senão ~/.cache/payevol.
+    """
+    raw = os.environ.get(DATA_DIR_ENV, "").strip()
+    path = Path(raw).expanduser() if raw else Path.home() / ".cache" / "payevol"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def source_max_age() -> float:
+    raw = os.environ.get(SOURCE_MAX_AGE_ENV, "").strip()
+    return float(raw) if raw else SOURCE_MAX_AGE
+
+
+# HTTP: timeout (segundos) e número de novas tentativas para as fontes externas
+HTTP_TIMEOUT_ENV = "PAYEVOL_HTTP_TIMEOUT"
+HTTP_RETRIES_ENV = "PAYEVOL_HTTP_RETRIES"
+
+
+def http_timeout() -> float:
+    return float(os.environ.get(HTTP_TIMEOUT_ENV, "") or 30)
+
+
+def http_retries() -> int:
+    return int(os.environ.get(HTTP_RETRIES_ENV, "") or 3)
+
+
+# Endereços das fontes (trocáveis, ex.: para o servidor substituto de benchmarks.standin)
+SIDRA_BASE = "https://apisidra.ibge.gov.br"
+SIDRA_BASE_ENV = "PAYEVOL_SIDRA_BASE"
+MIN_WAGE_URL = "https://previdenciarista.com/tabela-historica-dos-salarios-minimos/"
+MIN_WAGE_URL_ENV = "PAYEVOL_MIN_WAGE_URL"
+
+
+def sidra_base() -> str:
+    return (os.environ.get(SIDRA_BASE_ENV, "").strip() or SIDRA_BASE).rstrip("/")
+
+
+def min_wage_url() -> str:
+    return os.environ.get(MIN_WAGE_URL_ENV, "").strip() or MIN_WAGE_URL
+
+
+# Métricas: porta do endpoint /metrics (desligado se vazio) e logs JSON por etapa
+METRICS_PORT_ENV = "PAYEVOL_METRICS_PORT"
+METRICS_LOG_ENV = "PAYEVOL_METRICS_LOG"
+# interface do endpoint /metrics (padrão: só local; "0.0.0.0" expõe em todas)
+METRICS_ADDRESS_ENV = "PAYEVOL_METRICS_ADDRESS"
+
+
+def metrics_port() -> int | None:
+    raw = os.environ.get(METRICS_PORT_ENV, "").strip()
+    return int(raw) if raw else None
+
+
+def metrics_address() -> str:
+    return os.environ.get(METRICS_ADDRESS_ENV, "").strip() or "127.0.0.1"
+
+
+def metrics_log_enabled() -> bool:
+    return os.environ.get(METRICS_LOG_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+# Atualização das fontes em segundo plano no app e na API (ligada, exceto se "0"/"false")
+BACKGROUND_REFRESH_ENV = "PAYEVOL_BACKGROUND_REFRESH"
+
+
+def background_refresh_enabled() -> bool:
+    return os.environ.get(BACKGROUND_REFRESH_ENV, "").strip().lower() not in ("0", "false", "no", "off")
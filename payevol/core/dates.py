@@ -8,3 +8,23 @@ def add_months(d: date, months: int) -> date:
 def first_day_current_month() -> date:
     t = date.today()
     return date(t.year, t.month, 1)
+
+def months_between(start: date, end: date) -> int:
+    return (end.year - start.year) * 12 + (end.month - start.month)
+
+# Início do Plano Real: referência mínima aceita nos cálculos
+MIN_REF = date(1994, 7, 1)
+
+def parse_month(text: str) -> date:
+    """
+    'AAAA-MM' ou 'MM/AAAA' -> 1º dia do mês (ValueError se inválido).
+    """
+    s = str(text).strip()
+    try:
+        if "/" in s:
+            mm, yyyy = s.split("/")
+        else:
+            yyyy, mm = s.split("-")[:2]
+        return date(int(yyyy), int(mm), 1)
+    except ValueError:
+        raise ValueError(f"mês inválido: {text!r} (use AAAA-MM ou MM/AAAA)") from None
@@ -1,5 +1,35 @@
+import numpy as np
+import pandas as pd
+
+# a partir daqui (ou perto de um empate em meio centavo) o float não garante o mesmo
+# arredondamento do f"{:.2f}" de brl(); esses valores passam por brl() um a um
+_BRL_ARRAY_MAX = 1e15
+
+
 def brl(value: float) -> str:
     # Formatação pt-BR sem depender de locale do SO
     s = f"{value:,.2f}"
     s = s.replace(",", "X").replace(".", ",").replace("X", ".")
     return f"R$ {s}"
+
+
+def brl_array(values) -> np.ndarray:
+    """
+    brl() para um array inteiro: arredonda para centavos com NumPy e monta o texto com as
+    operações de string do pandas (pontos de milhar por regex). Não finitos, |v| >= 1e15 e
+    empates em meio centavo usam brl() direto. Devolve array (object) com o formato de `values`.
+    """
+    v = np.asarray(values, dtype="float64")
+    flat = v.ravel()
+    x = np.abs(flat) * 100
+    with np.errstate(invalid="ignore"):
+        tie = np.abs(x - np.floor(x) - 0.5) <= x * 2.0**-50 + 1e-9
+        slow = ~np.isfinite(flat) | (np.abs(flat) >= _BRL_ARRAY_MAX) | tie
+    cents = np.rint(np.where(slow, 0.0, x)).astype(np.int64)
+
+    units = pd.Series(cents // 100).astype(str).str.replace(r"\B(?=(\d{3})+(?!\d))", ".", regex=True)
+    frac = pd.Series(cents % 100).astype(str).str.zfill(2)
+    sign = pd.Series(np.where(np.signbit(flat), "R$ -", "R$ "))
+    out = (sign + units + "," + frac).to_numpy(dtype=object)
+    out[slow] = [brl(float(s)) for s in flat[slow]]
+    return out.reshape(v.shape)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# marcador em df.attrs: nome da coluna de valores de uma série já normalizada
+CANONICAL_ATTR = "payevol_canonical"
+# impressão digital (ref_date + valores) calculada uma vez, na normalização
+VERSION_ATTR = "payevol_version"
+
+
+def canonical_series(df: pd.DataFrame, value_col: str) -> pd.DataFrame:
+    """
+    Forma canônica de uma série mensal, feita uma vez na busca:
+      - ref_date em datetime64[ns] no 1º dia do mês, ordenado e sem repetição (vale a última linha);
+      - value_col em float64, sem NaN;
+      - demais colunas preservadas;
+      - df.attrs[CANONICAL_ATTR] = value_col e df.attrs[VERSION_ATTR] = impressão digital
+        do conteúdo (ver series_version).
+    Quem consome (lookup.monthly_table, builders) pode confiar nisso sem copiar nem reordenar.
+    O mesmo objeto é compartilhado (cache em memória, sessões): não modifique o dataframe
+    devolvido; para alterar, faça df.copy() antes.
+    """
+    if is_canonical(df, value_col):
+        return df
+
+    months = pd.to_datetime(pd.Index(df["ref_date"])).to_numpy(dtype="datetime64[M]")
+    out = df.assign(
+        ref_date=months.astype("datetime64[ns]"),
+        **{value_col: df[value_col].to_numpy(dtype="float64")},
+    )
+    out = out[~np.isnan(out[value_col].to_numpy())]
+    out = out.sort_values("ref_date", kind="stable").drop_duplicates("ref_date", keep="last")
+    out = out.reset_index(drop=True)
+
+    if out.empty:
+        raise ValueError(f"Série '{value_col}' vazia após normalização.")
+    # estritamente crescente (garantido acima; falha aqui indica bug, não dado ruim)
+    if not (np.diff(out["ref_date"].to_numpy()) > np.timedelta64(0)).all():
+        raise ValueError(f"Série '{value_col}': meses fora de ordem.")
+
+    h = hashlib.blake2b(out["ref_date"].to_numpy().tobytes(), digest_size=8, key=value_col.encode())
+    h.update(out[value_col].to_numpy().tobytes())
+    out.attrs[CANONICAL_ATTR] = value_col
+    out.attrs[VERSION_ATTR] = h.hexdigest()
+    return out
+
+
+def is_canonical(df, value_col: str | None = None) -> bool:
+    """
+    True se `df` saiu de canonical_series (para `value_col`, se informado).
+    """
+    col = getattr(df, "attrs", {}).get(CANONICAL_ATTR)
+    return col is not None and (value_col is None or col == value_col)
+
+
+def series_version(df, value_col: str) -> str | None:
+    """
+    Impressão digital de uma série canônica para `value_col` (None se não for canônica).
+    Sobrevive às cópias do st.cache_data (fica em df.attrs): serve de chave para o que é
+    derivado da série sem precisar reler os valores.
+    """
+    return df.attrs.get(VERSION_ATTR) if is_canonical(df, value_col) else None
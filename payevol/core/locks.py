@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import re
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from payevol.core import metrics
+from payevol.core.config import data_dir
+
+try:
+    import fcntl
+except ImportError:  # Windows: só a coordenação dentro do processo
+    fcntl = None
+
+LOCKS_DIRNAME = "locks"
+
+
+@contextmanager
+def file_lock(key: str) -> Iterator[None]:
+    """
+    Trava exclusiva entre processos (flock em <data_dir>/locks/<key>.lock), bloqueante.
+    O arquivo fica no disco; a trava some sozinha se o processo morrer.
+    """
+    if fcntl is None:
+        yield
+        return
+    path = data_dir() / LOCKS_DIRNAME
+    path.mkdir(exist_ok=True)
+    with open(path / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', key)}.lock", "a+b") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+class _Flight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+
+
+_flights: dict[str, _Flight] = {}
+_flights_lock = threading.Lock()
+
+
+def single_flight(key: str, fn: Callable[[], Any], across_processes: bool = True, label: str | None = None) -> Any:
+    """
+    Executa `fn` uma vez por `key` de cada vez: a primeira thread roda (segurando também
+    file_lock(key), para os outros processos esperarem), e as que chegam enquanto isso
+    esperam e recebem o mesmo resultado (ou a mesma exceção), sem chamar `fn` de novo.
+    across_processes=False: só entre threads, sem file_lock (ex.: caches em memória).
+    label: rótulo `key` da métrica no lugar da chave (chaves com muitos valores distintos).
+    Quem esperou conta em payevol_singleflight_total{key, result=shared}; quem rodou, result=leader.
+    Entre processos não há resultado em memória: quem espera o file_lock deve reler o que
+    o outro gravou (ex.: store.cached_series confere a data da coleta).
+    """
+    label = key if label is None else label
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        flight.done.wait()
+        metrics.inc("payevol_singleflight_total", key=label, result="shared")
+        if flight.error is not None:
+            raise flight.error
+        # como o MemoryCache: cada chamador recebe a sua cópia de objetos mutáveis
+        return flight.value.copy() if hasattr(flight.value, "copy") else flight.value
+
+    metrics.inc("payevol_singleflight_total", key=label, result="leader")
+    try:
+        if across_processes:
+            with file_lock(key):
+                flight.value = fn()
+        else:
+            flight.value = fn()
+        return flight.value
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
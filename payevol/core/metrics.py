@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import bisect
+import functools
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from payevol.core.config import metrics_address, metrics_log_enabled, metrics_port
+
+# Limites (segundos) dos histogramas de latência
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    "payevol_stage_seconds": "Duração de cada etapa (busca, parse, séries, gráfico, tabela).",
+    "payevol_http_request_seconds": "Latência das requisições às fontes externas.",
+    "payevol_http_requests_total": "Requisições às fontes externas por host e status.",
+    "payevol_cache_requests_total": "Chamadas a funções @cached por resultado (hit/miss).",
+    "payevol_store_requests_total": "Leituras de séries do disco por resultado.",
+    "payevol_singleflight_total": "Buscas coordenadas por chave: quem executou (leader) e quem recebeu o resultado (shared).",
+    "payevol_chain_drift_pct": "Diferença (%) entre o índice encadeado da 7063 e o oficial no último mês em comum, na última emenda.",
+}
+
+_log = logging.getLogger("payevol.metrics")
+_lock = threading.Lock()
+_counters: dict[tuple[str, tuple], float] = {}
+_histograms: dict[tuple[str, tuple], list] = {}  # [contagens por bucket..., soma, total]
+_gauges: dict[tuple[str, tuple], float] = {}
+_server = None
+_server_tried = False
+
+
+def _key(name: str, labels: dict) -> tuple[str, tuple]:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _emit(event: str, name: str, value: float, labels: dict) -> None:
+    if not metrics_log_enabled():
+        return
+    if not _log.handlers:
+        _log.addHandler(logging.StreamHandler(sys.stderr))
+        _log.setLevel(logging.INFO)
+        _log.propagate = False
+    _log.info(json.dumps({"ts": time.time(), "event": event, "metric": name, "value": value, **labels}))
+
+
+def inc(name: str, amount: float = 1.0, **labels) -> None:
+    """
+    Soma `amount` ao contador `name` com os rótulos dados.
+    """
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + amount
+    _emit("inc", name, amount, labels)
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """
+    Registra uma observação (em segundos) no histograma `name`.
+    """
+    key = _key(name, labels)
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0, 0]
+        h[bisect.bisect_left(BUCKETS, value)] += 1
+        h[-2] += value
+        h[-1] += 1
+    _emit("observe", name, value, labels)
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    """
+    Guarda o valor atual de `name` (substitui o anterior) com os rótulos dados.
+    """
+    key = _key(name, labels)
+    with _lock:
+        _gauges[key] = value
+    _emit("set", name, value, labels)
+
+
+@contextmanager
+def stage(name: str, **labels) -> Iterator[None]:
+    """
+    Mede o bloco como etapa `name` (payevol_stage_seconds{stage=name}).
+    Exceções também são medidas, com ok="false".
+    """
+    t0 = time.perf_counter()
+    ok = "true"
+    try:
+        yield
+    except BaseException:
+        ok = "false"
+        raise
+    finally:
+        observe("payevol_stage_seconds", time.perf_counter() - t0, stage=name, ok=ok, **labels)
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """
+    Decorator: cada chamada é medida como a etapa `name`.
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _gauges.clear()
+
+
+def snapshot() -> dict:
+    """
+    Estado atual em forma serializável (JSON):
+      counters: [{name, labels, value}], gauges: [{name, labels, value}],
+      histograms: [{name, labels, buckets, sum, count}]
+    """
+    with _lock:
+        counters = [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in sorted(_counters.items())
+        ]
+        gauges = [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in sorted(_gauges.items())
+        ]
+        histograms = [
+            {
+                "name": name,
+                "labels": dict(labels),
+                "buckets": dict(zip([*map(str, BUCKETS), "+Inf"], h[:-2])),
+                "sum": h[-2],
+                "count": h[-1],
+            }
+            for (name, labels), h in sorted(_histograms.items())
+        ]
+    return {"counters": counters, "gauges": gauges, "histograms": histograms}
+
+
+def _labels_text(labels: tuple, extra: tuple = ()) -> str:
+    items = [*labels, *extra]
+    if not items:
+        return ""
+    esc = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in items)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, esc)) + "}"
+
+
+def render_prometheus() -> str:
+    """
+    Métricas no formato texto do Prometheus (exposition format 0.0.4).
+    """
+    with _lock:
+        counters = sorted(_counters.items())
+        gauges = sorted(_gauges.items())
+        histograms = sorted((k, list(h)) for k, h in _histograms.items())
+
+    lines: list[str] = []
+    seen: set[str] = set()
+
+    def header(name: str, kind: str) -> None:
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# HELP {name} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), value in counters:
+        header(name, "counter")
+        lines.append(f"{name}{_labels_text(labels)} {value:g}")
+
+    for (name, labels), value in gauges:
+        header(name, "gauge")
+        lines.append(f"{name}{_labels_text(labels)} {value:g}")
+
+    for (name, labels), h in histograms:
+        header(name, "histogram")
+        cumulative = 0
+        for le, n in zip([*map(str, BUCKETS), "+Inf"], h[:-2]):
+            cumulative += n
+            lines.append(f"{name}_bucket{_labels_text(labels, (('le', le),))} {cumulative}")
+        lines.append(f"{name}_sum{_labels_text(labels)} {h[-2]:.6f}")
+        lines.append(f"{name}_count{_labels_text(labels)} {h[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+def start_metrics_server(port: int | None = None):
+    """
+    Sobe (uma vez por processo) um servidor HTTP com /metrics (Prometheus) e
+    /metrics.json em $PAYEVOL_METRICS_ADDRESS (padrão 127.0.0.1). Sem `port`, usa
+    $PAYEVOL_METRICS_PORT; sem nenhum dos dois, não faz nada.
+    Só a primeira chamada tenta: se a porta estiver ocupada (ex.: outro worker no mesmo
+    host), registra um aviso e segue sem servidor neste processo.
+    """
+    global _server, _server_tried
+    port = metrics_port() if port is None else port
+    if port is None:
+        return None
+
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/metrics.json"):
+                body = json.dumps(snapshot()).encode("utf-8")
+                content_type = "application/json"
+            elif self.path.startswith("/metrics"):
+                body = render_prometheus().encode("utf-8")
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    with _lock:
+        if _server_tried:
+            return _server
+        _server_tried = True
+        address = metrics_address()
+        try:
+            _server = ThreadingHTTPServer((address, port), Handler)
+        except OSError as e:
+            _log.warning("endpoint de métricas não iniciado em %s:%s: %s", address, port, e)
+            return None
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name="payevol-metrics", daemon=True).start()
+    return _server
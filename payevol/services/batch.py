@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import math
+from datetime import date
+from typing import Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+from payevol.core.dates import MIN_REF, add_months, first_day_current_month, parse_month
+from payevol.services.lookup import MonthlyTable, StepSeries, as_table, month_dates, month_index, month_indices
+
+
+def parse_batch_items(items: Iterable[Mapping]) -> tuple[list[date], list[float]]:
+    """
+    Valida os pares de entrada do lote (API e CLI): cada item com "ref" (AAAA-MM ou MM/AAAA,
+    a partir de 07/1994) e "salary" (número finito >= 0).
+    Devolve (refs, salaries); ValueError "item i: ..." no primeiro item inválido.
+    """
+    refs, salaries = [], []
+    for i, item in enumerate(items):
+        if not isinstance(item, Mapping):
+            raise ValueError(f'item {i}: use {{"ref": "AAAA-MM", "salary": 1234.5}}')
+        try:
+            ref = parse_month(item["ref"])
+            salary = float(item["salary"])
+        except KeyError as e:
+            raise ValueError(f"item {i}: falta o campo {e}") from None
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"item {i}: {e}") from None
+        if not (math.isfinite(salary) and salary >= 0):
+            raise ValueError(f"item {i}: salary precisa ser um número >= 0")
+        if ref < MIN_REF:
+            raise ValueError(f"item {i}: a referência mínima é {MIN_REF:%m/%Y}")
+        refs.append(ref)
+        salaries.append(salary)
+    return refs, salaries
+
+
+def evolve_batch(
+    refs,
+    salaries,
+    sm_changes_df: pd.DataFrame | MonthlyTable | StepSeries,
+    ipca_df: pd.DataFrame | MonthlyTable,
+    inpc_df: pd.DataFrame | MonthlyTable | None = None,
+    target: date | None = None,
+) -> pd.DataFrame:
+    """
+    Versão vetorizada (acesso direto às MonthlyTable) do último mês de build_equivalent_salary_series_sm e
+    build_*_adjusted_series para muitos pares (mês de referência, salário).
+
+    refs: meses de referência (date, datetime64 ou 'YYYY-MM')
+    salaries: salário em cada referência
+    target: mês final (padrão: mês atual - 1, ou a própria referência se for posterior)
+
+    Saída (uma linha por par):
+      ref_date, salary_ref, target_date, sm_ref, equiv_brl, salary_ipca, salary_inpc
+    Pares sem dado (ex.: referência anterior ao início de um índice) ficam NaN.
+    """
+    ref_idx = month_indices(refs)
+    salary = np.asarray(salaries, dtype=np.float64)
+    if salary.shape != ref_idx.shape:
+        raise ValueError("refs e salaries precisam ter o mesmo tamanho.")
+
+    end = target or add_months(first_day_current_month(), -1)
+    target_idx = np.maximum(ref_idx, month_index(end))
+
+    sm = as_table(sm_changes_df, "min_wage")
+    sm_ref = sm.take(ref_idx)
+    sm_ref[sm_ref <= 0] = np.nan
+    equiv = salary / sm_ref * sm.take(target_idx)
+
+    def adjusted(index_df: pd.DataFrame | MonthlyTable | None, col: str) -> np.ndarray:
+        if index_df is None:
+            return np.full(salary.shape, np.nan)
+        table = as_table(index_df, col)
+        i_prev = table.take(ref_idx - 1)
+        i_prev[i_prev <= 0] = np.nan
+        return salary * table.take(target_idx) / i_prev
+
+    return pd.DataFrame(
+        {
+            "ref_date": month_dates(ref_idx),
+            "salary_ref": salary,
+            "target_date": month_dates(target_idx),
+            "sm_ref": sm_ref,
+            "equiv_brl": equiv,
+            "salary_ipca": adjusted(ipca_df, "ipca_index"),
+            "salary_inpc": adjusted(inpc_df, "inpc_index"),
+        }
+    )
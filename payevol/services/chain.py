@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from payevol.core.dates import add_months
+
+
+def _sorted(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values("ref_date").drop_duplicates("ref_date", keep="last").reset_index(drop=True)
+
+
+def _log_growth(pct: pd.Series) -> np.ndarray:
+    # soma de log(1 + v/100): estável mesmo com centenas de meses encadeados
+    return np.cumsum(np.log1p(pct.to_numpy(dtype=np.float64) / 100.0))
+
+
+def chain_index(
+    var_df: pd.DataFrame,
+    pct_col: str,
+    index_col: str = "index",
+    base_value: float = 100.0,
+) -> pd.DataFrame:
+    """
+    Número-índice a partir de uma série de variação mensal (%).
+
+    Cria um ponto-base no mês anterior ao primeiro mês da série com `base_value`;
+    I(m) = base * exp(soma de log(1 + var/100)) até m.
+    Saída: ref_date, index_col
+    """
+    var_df = _sorted(var_df)
+    if var_df.empty:
+        raise RuntimeError("chain_index: sem dados de variação mensal.")
+
+    base_month = add_months(pd.Timestamp(var_df["ref_date"].iloc[0]).date(), -1)
+    values = base_value * np.exp(_log_growth(var_df[pct_col]))
+
+    return pd.DataFrame(
+        {
+            "ref_date": [base_month, *var_df["ref_date"]],
+            index_col: np.concatenate([[base_value], values]),
+        }
+    )
+
+
+def rebase(index_df: pd.DataFrame, index_col: str, base_month: date, base_value: float = 100.0) -> pd.DataFrame:
+    """
+    Reescala o índice para que I(base_month) = base_value (as razões entre meses não mudam).
+    """
+    out = _sorted(index_df)
+    hit = out.loc[pd.to_datetime(out["ref_date"]) == pd.Timestamp(base_month), index_col]
+    if hit.empty or not hit.iloc[0] > 0:
+        raise ValueError(f"rebase: {base_month:%m/%Y} fora da série ou com índice inválido.")
+    out[index_col] = out[index_col] * (base_value / float(hit.iloc[0]))
+    # exato no mês-base (a divisão acima pode errar no último bit)
+    out.loc[hit.index, index_col] = base_value
+    return out
+
+
+def splice(
+    official_df: pd.DataFrame,
+    index_col: str,
+    var_df: pd.DataFrame,
+    pct_col: str,
+) -> pd.DataFrame:
+    """
+    Emenda a cauda de variação mensal depois do último mês do índice oficial:
+      I(m) = I(último oficial) * exp(soma de log(1 + var/100)) para m > último oficial.
+    A parte oficial é mantida como está.
+    """
+    official = _sorted(official_df)[["ref_date", index_col]]
+    last = pd.Timestamp(official["ref_date"].iloc[-1])
+
+    var_df = _sorted(var_df)
+    tail = var_df[pd.to_datetime(var_df["ref_date"]) > last]
+    if tail.empty:
+        return official
+
+    first_tail = pd.Timestamp(tail["ref_date"].iloc[0])
+    if (first_tail.year - last.year) * 12 + first_tail.month - last.month != 1:
+        raise RuntimeError(
+            f"splice: a variação mensal recomeça em {first_tail:%m/%Y}, "
+            f"mas o índice oficial termina em {last:%m/%Y}."
+        )
+
+    values = float(official[index_col].iloc[-1]) * np.exp(_log_growth(tail[pct_col]))
+    extra = pd.DataFrame({"ref_date": tail["ref_date"].to_numpy(), index_col: values})
+    return pd.concat([official, extra], ignore_index=True)
+
+
+@dataclass(frozen=True)
+class ChainDrift:
+    """
+    Diferença entre um índice encadeado e o oficial no período em comum,
+    com os dois reescalados para o primeiro mês em comum.
+    drift_pct(m) = (encadeado(m) / oficial(m) - 1) * 100
+    """
+    first: date
+    last: date
+    months: int
+    last_pct: float
+    max_abs_pct: float
+    mean_abs_pct: float
+
+
+def drift(chained_df: pd.DataFrame, official_df: pd.DataFrame, index_col: str) -> ChainDrift:
+    # date ou datetime64 dos dois lados: compara por mês
+    chain_m = _sorted(chained_df)[["ref_date", index_col]].assign(ref_date=lambda d: pd.to_datetime(d["ref_date"]))
+    official_m = _sorted(official_df)[["ref_date", index_col]].assign(ref_date=lambda d: pd.to_datetime(d["ref_date"]))
+    both = chain_m.merge(official_m, on="ref_date", suffixes=("_chain", "_official"))
+    if both.empty:
+        raise ValueError("drift: as séries não têm meses em comum.")
+
+    chain = both[f"{index_col}_chain"].to_numpy(dtype=np.float64)
+    official = both[f"{index_col}_official"].to_numpy(dtype=np.float64)
+    pct = ((chain / chain[0]) / (official / official[0]) - 1.0) * 100.0
+
+    months = pd.to_datetime(both["ref_date"])
+    return ChainDrift(
+        first=months.iloc[0].date(),
+        last=months.iloc[-1].date(),
+        months=len(both),
+        last_pct=float(pct[-1]),
+        max_abs_pct=float(np.abs(pct).max()),
+        mean_abs_pct=float(np.abs(pct).mean()),
+    )
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
+from urllib.parse import urlsplit
+
+from payevol.core import metrics
+from payevol.core.config import data_dir, http_retries, http_timeout
+
+if TYPE_CHECKING:
+    import requests
+
+USER_AGENT = "Mozilla/5.0"
+# tamanho dos pedaços lidos em get_stream
+CHUNK_SIZE = 64 * 1024
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+class NotModified(Exception):
+    """
+    A fonte respondeu 304: o conteúdo é o mesmo da última resposta guardada.
+    """
+
+    def __init__(self, url: str):
+        super().__init__(url)
+        self.url = url
+
+
+@dataclass(frozen=True)
+class HttpResult:
+    url: str
+    content: bytes
+    encoding: str | None
+    not_modified: bool
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_if_not_modified(self) -> "HttpResult":
+        if self.not_modified:
+            raise NotModified(self.url)
+        return self
+
+
+def session() -> requests.Session:
+    """
+    Sessão compartilhada (keep-alive, gzip) com novas tentativas para erros transitórios.
+    O requests só é importado aqui, na primeira busca (leituras do disco não precisam dele).
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=http_retries(),
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET",),
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+            s = requests.Session()
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            s.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"})
+            _session = s
+        return _session
+
+
+def _cache_paths(url: str) -> tuple[Path, Path]:
+    base = data_dir() / "http"
+    base.mkdir(parents=True, exist_ok=True)
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return base / f"{key}.json", base / f"{key}.body"
+
+
+def _load_cached(url: str) -> tuple[dict, bytes] | None:
+    meta_path, body_path = _cache_paths(url)
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        return meta, body_path.read_bytes()
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_suffix(path.suffix + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _save_meta(url: str, resp: requests.Response, encoding: str | None) -> None:
+    meta_path, _ = _cache_paths(url)
+    meta = {
+        "url": url,
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+        "encoding": encoding,
+        "fetched_at": time.time(),
+    }
+    _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+
+
+def _has_validators(resp: requests.Response) -> bool:
+    return bool(resp.headers.get("ETag") or resp.headers.get("Last-Modified"))
+
+
+def _save_cached(url: str, resp: requests.Response) -> None:
+    if not _has_validators(resp):
+        return
+    _, body_path = _cache_paths(url)
+    _write_atomic(body_path, resp.content)
+    _save_meta(url, resp, resp.encoding)
+
+
+def invalidate(url: str) -> None:
+    for path in _cache_paths(url):
+        path.unlink(missing_ok=True)
+
+
+def _conditional_headers(cached: tuple[dict, bytes] | None) -> dict:
+    headers = {}
+    if cached is not None:
+        meta, _ = cached
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+def _send(url: str, headers: dict, timeout: float | None, stream: bool) -> requests.Response:
+    import requests
+
+    host = urlsplit(url).netloc
+    try:
+        resp = session().get(url, headers=headers, timeout=timeout or http_timeout(), stream=stream)
+    except requests.RequestException as e:
+        metrics.inc("payevol_http_requests_total", host=host, status=type(e).__name__)
+        raise
+    metrics.inc("payevol_http_requests_total", host=host, status=resp.status_code)
+    return resp
+
+
+def get(url: str, timeout: float | None = None) -> HttpResult:
+    """
+    GET condicional: reenvia ETag/Last-Modified da última resposta guardada.
+    Em 304 devolve o corpo guardado com not_modified=True.
+    """
+    cached = _load_cached(url)
+    t0 = time.perf_counter()
+    resp = _send(url, _conditional_headers(cached), timeout, stream=False)
+    # latência até os cabeçalhos + corpo (stream=False: o corpo já foi lido)
+    metrics.observe("payevol_http_request_seconds", time.perf_counter() - t0, host=urlsplit(url).netloc)
+
+    if resp.status_code == 304 and cached is not None:
+        meta, body = cached
+        return HttpResult(url, body, meta.get("encoding"), not_modified=True)
+
+    resp.raise_for_status()
+    if resp.encoding is None or resp.encoding.lower() == "iso-8859-1":
+        # requests assume latin-1 quando o servidor não informa charset em text/*
+        resp.encoding = resp.apparent_encoding
+    _save_cached(url, resp)
+    return HttpResult(url, resp.content, resp.encoding, not_modified=False)
+
+
+@dataclass(frozen=True)
+class HttpStream:
+    """
+    Resposta lida aos pedaços (get_stream): `chunks` só pode ser percorrido uma vez.
+    """
+    url: str
+    chunks: Iterator[bytes]
+    encoding: str
+    not_modified: bool
+
+    def raise_if_not_modified(self) -> "HttpStream":
+        if self.not_modified:
+            raise NotModified(self.url)
+        return self
+
+
+def _stream_body(url: str, resp: requests.Response, encoding: str, elapsed: float) -> Iterator[bytes]:
+    """
+    Repassa o corpo em pedaços de CHUNK_SIZE, gravando ao mesmo tempo a cópia para os
+    GETs condicionais (só substitui a anterior se o corpo chegou inteiro).
+    A latência observada é `elapsed` (até os cabeçalhos) mais o tempo esperando cada
+    pedaço da rede; o tempo de quem consome entre um pedaço e outro fica de fora.
+    """
+    _, body_path = _cache_paths(url)
+    tmp = body_path.with_suffix(body_path.suffix + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    out = tmp.open("wb") if _has_validators(resp) else None
+    complete = False
+    body = resp.iter_content(CHUNK_SIZE)
+    try:
+        while True:
+            t = time.perf_counter()
+            chunk = next(body, None)
+            elapsed += time.perf_counter() - t
+            if chunk is None:
+                break
+            if out is not None:
+                out.write(chunk)
+            yield chunk
+        complete = True
+    finally:
+        resp.close()
+        metrics.observe("payevol_http_request_seconds", elapsed, host=urlsplit(url).netloc)
+        if out is not None:
+            out.close()
+            if complete:
+                os.replace(tmp, body_path)
+                _save_meta(url, resp, encoding)
+            else:
+                tmp.unlink(missing_ok=True)
+
+
+def get_stream(url: str, timeout: float | None = None) -> HttpStream:
+    """
+    Como `get`, mas sem ler o corpo de uma vez: quem consome percorre `chunks`
+    (ex.: sidra.iter_json_batches). A latência conta só a espera pela rede (cabeçalhos e
+    pedaços), não o processamento de quem consome.
+    """
+    cached = _load_cached(url)
+    t0 = time.perf_counter()
+    resp = _send(url, _conditional_headers(cached), timeout, stream=True)
+
+    if resp.status_code == 304 and cached is not None:
+        resp.close()
+        metrics.observe("payevol_http_request_seconds", time.perf_counter() - t0, host=urlsplit(url).netloc)
+        meta, body = cached
+        return HttpStream(url, iter((body,)), meta.get("encoding") or "utf-8", not_modified=True)
+
+    import requests
+
+    try:
+        resp.raise_for_status()
+    except requests.HTTPError:
+        resp.close()
+        raise
+    # JSON sem charset declarado é UTF-8
+    encoding = resp.encoding if resp.encoding and resp.encoding.lower() != "iso-8859-1" else "utf-8"
+    return HttpStream(url, _stream_body(url, resp, encoding, time.perf_counter() - t0), encoding, not_modified=False)
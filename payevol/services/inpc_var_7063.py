@@ -1,125 +1,119 @@
 from __future__ import annotations
 
-from datetime import date
-import re
 import pandas as pd
-import requests
-import streamlit as st
+
+from payevol.core.cache import cached
+from payevol.services.sidra import (
+    any_dimension,
+    dimension_columns,
+    fetch_values,
+    match_dimension,
+    refresh_incremental,
+)
+from payevol.services.store import cached_series
 
 # Tabela 7063 (a partir de jan/2020): INPC - variações e peso mensal (índice geral e grupos etc.)
-# Usamos v/all e filtramos por nome de variável e item/subitem (ex.: "Índice geral").
-SIDRA_7063_ALL = "https://apisidra.ibge.gov.br/values/h/n/t/7063/p/all/n1/all/v/all"
+# Variável (v) e item da classificação 315 (c315) filtrados no servidor; nomes desconhecidos
+# caem na consulta larga (v/all, c315/all) com filtro por nome aqui.
+SIDRA_7063_PATH = "/values/t/7063/p/all/n1/all/v/{variable}/c315/{item}"
 
-_RX_DNC = re.compile(r"^D\d+N$")
-_RX_DCC = re.compile(r"^D\d+C$")
+# códigos SIDRA dos nomes usados (outros: passe item_code/variable_code)
+ITEM_CODES = {"índice geral": "7169"}
+VARIABLE_CODES = {"variação mensal": "44"}
 
 
-def _to_float_ptbr(s: str) -> float:
-    s = s.strip()
-    # "1,23" -> 1.23 ; "-0,60" -> -0.60 ; "1.234,56" -> 1234.56
-    if "," in s and "." in s:
-        s = s.replace(".", "").replace(",", ".")
-    elif "," in s:
-        s = s.replace(",", ".")
-    return float(s)
+def sidra_7063_path(item_code: str | None = None, variable_code: str | None = None) -> str:
+    return SIDRA_7063_PATH.format(variable=variable_code or "all", item=item_code or "all")
 
 
-def _find_period_yyyymm(item: dict) -> str | None:
+def _resolve_codes(
+    item_name: str, variable_contains: str, item_code: str | None, variable_code: str | None
+) -> tuple[str | None, str | None]:
     """
-    A dimensão de período no SIDRA geralmente vem como D?C no formato YYYYMM.
-    Ex.: "202001" (jan/2020).
+    Códigos que vão na consulta: os informados ou, na falta, os dos nomes conhecidos.
     """
-    for k, v in item.items():
-        if not _RX_DCC.match(str(k)):
-            continue
-        vv = str(v).strip()
-        if vv.isdigit() and len(vv) == 6:
-            return vv
-    return None
+    item_code = item_code or ITEM_CODES.get(item_name.strip().lower())
+    variable_code = variable_code or VARIABLE_CODES.get(variable_contains.strip().lower())
+    return item_code, variable_code
 
 
-def _pick_dimension_names(item: dict) -> list[str]:
-    """
-    Retorna todos os D?N (nomes de dimensões) da linha, para filtragem por texto.
-    """
-    out = []
-    for k, v in item.items():
-        if _RX_DNC.match(str(k)):
-            out.append(str(v).strip())
-    return out
+def _download_inpc_monthly_variation_7063(
+    item_name: str,
+    variable_contains: str,
+    periods: str = "all",
+    item_code: str | None = None,
+    variable_code: str | None = None,
+) -> pd.DataFrame:
+    item_name_norm = item_name.strip().lower()
+    var_contains_norm = variable_contains.strip().lower()
+    item_code, variable_code = _resolve_codes(item_name, variable_contains, item_code, variable_code)
+
+    df = fetch_values(sidra_7063_path(item_code, variable_code), periods)
+    # precisa conter "Variação mensal" em algum D?N e o item desejado (Índice geral) em outro
+    def has_var(s: pd.Series) -> pd.Series:
+        return s.str.contains(var_contains_norm, regex=False)
+
+    is_item = any_dimension(df, lambda s: s.str.strip() == item_name_norm)
+    df = df[any_dimension(df, has_var) & is_item]
+
+    # "nome de variável" amigável: primeiro D?N que contém o texto procurado (ou vazio)
+    var_name = pd.Series("", index=df.index)
+    for c in reversed(dimension_columns(df)):
+        var_name = var_name.mask(match_dimension(df[c], has_var), df[c].astype(str).str.strip())
+
+    df = pd.DataFrame(
+        {
+            "ref_date": df["ref_date"],
+            "inpc_var_mensal_pct": df["value"],
+            "variable_name": var_name,
+            "item_name": item_name,
+        }
+    )
+    df = df.drop_duplicates().sort_values("ref_date").reset_index(drop=True)
+
+    if df.empty:
+        raise RuntimeError(
+            "Não consegui filtrar a variação mensal do INPC na tabela 7063."
+        )
+    return df
 
 
-@st.cache_data(ttl=60 * 60 * 24, show_spinner=False)
+@cached(ttl=60 * 60 * 24)
 def fetch_inpc_monthly_variation_7063(
-    item_name: str = "Índice geral", variable_contains: str = "Variação mensal"
+    item_name: str = "Índice geral",
+    variable_contains: str = "Variação mensal",
+    item_code: str | None = None,
+    variable_code: str | None = None,
 ) -> pd.DataFrame:
     """
     Retorna INPC - Variação mensal (%) para:
       - Brasil (n1/all)
-      - item/grupo: "Índice geral" (por padrão)
-      - variável cujo nome contém "Variação mensal" (por padrão)
+      - item/grupo: "Índice geral" (por padrão; c315/7169)
+      - variável cujo nome contém "Variação mensal" (por padrão; v/44)
       - meses: todos (p/all) [a tabela 7063 começa em 2020-01]
+    Outros itens/variáveis: informe item_code (c315) e variable_code (v) para
+    manter a consulta estreita; sem código conhecido, baixa tudo e filtra pelo nome.
 
     Saída:
       ref_date (date no 1º dia do mês)
       inpc_var_mensal_pct (float, em %)
       variable_name (str)
       item_name (str)
-    """
-    headers = {"User-Agent": "Mozilla/5.0"}
-    r = requests.get(SIDRA_7063_ALL, headers=headers, timeout=30)
-    r.raise_for_status()
-    data = r.json()
 
-    if not isinstance(data, list) or len(data) < 2:
-        raise RuntimeError("Resposta inesperada do SIDRA (tabela 7063).")
-
-    rows = []
-    item_name_norm = item_name.strip().lower()
-    var_contains_norm = variable_contains.strip().lower()
+    Persistida em disco por (códigos da consulta, item, variável); atualizações baixam
+    só os meses novos.
+    """
+    item_code, variable_code = _resolve_codes(item_name, variable_contains, item_code, variable_code)
 
-    for item in data[1:]:
-        if not isinstance(item, dict):
-            continue
-
-        # nome da variável vem como algum D?N. Vamos filtrar:
-        dim_names = _pick_dimension_names(item)
-        dim_names_norm = [s.lower() for s in dim_names]
-
-        # precisa conter "Variação mensal" em algum D?N
-        if not any(var_contains_norm in s for s in dim_names_norm):
-            continue
-
-        # precisa conter o item desejado (Índice geral) em algum D?N
-        if not any(item_name_norm == s for s in dim_names_norm):
-            continue
-
-        period = _find_period_yyyymm(item)
-        val = str(item.get("V", "")).strip()
-        if not (period and val):
-            continue
-
-        try:
-            y = int(period[:4])
-            m = int(period[4:])
-            v = _to_float_ptbr(val)
-        except Exception:
-            continue
-
-        # tenta capturar um "nome de variável" mais amigável, se existir
-        # (se não achar, guarda vazio)
-        var_name = next(
-            (s for s in dim_names if variable_contains.lower() in s.lower()), ""
+    def download(periods: str = "all") -> pd.DataFrame:
+        return _download_inpc_monthly_variation_7063(
+            item_name, variable_contains, periods, item_code, variable_code
         )
-        rows.append((date(y, m, 1), v, var_name, item_name))
 
-    df = pd.DataFrame(
-        rows, columns=["ref_date", "inpc_var_mensal_pct", "variable_name", "item_name"]
+    return cached_series(
+        f"inpc-7063/v{variable_code or 'all'}/c315-{item_code or 'all'}/{item_name}/{variable_contains}",
+        download,
+        source="sidra-7063",
+        refresh=lambda stored: refresh_incremental(stored, download, "inpc_var_mensal_pct"),
+        invalidate=fetch_inpc_monthly_variation_7063.clear,
     )
-    df = df.drop_duplicates().sort_values("ref_date").reset_index(drop=True)
-
-    if df.empty:
-        raise RuntimeError(
-            "Não consegui filtrar a variação mensal do INPC na tabela 7063."
-        )
-    return df
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Callable
+
+import pandas as pd
+
+from payevol.core.metrics import stage
+from payevol.services.inpc import fetch_inpc_number_index
+from payevol.services.ipca import fetch_ipca_number_index
+from payevol.services.min_wage import fetch_min_wage_changes
+from payevol.services.store import forced_refresh
+
+SOURCE_LABELS = {
+    "sm_changes": "Salário mínimo (Previdenciarista)",
+    "ipca_index": "IPCA (IBGE/SIDRA)",
+    "inpc_index": "INPC (IBGE/SIDRA)",
+}
+
+
+@dataclass
+class Sources:
+    sm_changes: pd.DataFrame | None = None
+    ipca_index: pd.DataFrame | None = None
+    inpc_index: pd.DataFrame | None = None
+    errors: dict[str, Exception] = field(default_factory=dict)
+
+
+def _with_script_context(fn: Callable[[], pd.DataFrame]) -> Callable[[], pd.DataFrame]:
+    """
+    Repassa o contexto do Streamlit (se houver) para a thread, para o st.cache_data
+    funcionar igual à chamada direta no script.
+    """
+    if "streamlit" not in sys.modules:
+        # execução headless (CLI/jobs): nem importa o Streamlit
+        return fn
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return fn
+
+    def run() -> pd.DataFrame:
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn()
+
+    return run
+
+
+def load_sources(force: bool = False) -> Sources:
+    """
+    Busca salário mínimo, IPCA e INPC em paralelo.
+    Cada fonte falha isoladamente: o erro vai para `errors[<nome>]` e o frame fica None.
+    force=True: cada busca roda dentro de store.forced_refresh() (na própria thread),
+    ignorando a idade da cópia em disco.
+    """
+    fetchers = {
+        "sm_changes": fetch_min_wage_changes,
+        "ipca_index": fetch_ipca_number_index,
+        "inpc_index": fetch_inpc_number_index,
+    }
+    def measured(name: str, fn: Callable[[], pd.DataFrame]) -> Callable[[], pd.DataFrame]:
+        def run() -> pd.DataFrame:
+            with forced_refresh() if force else nullcontext(), stage("source", source=name):
+                return fn()
+
+        return run
+
+    out = Sources()
+    with ThreadPoolExecutor(max_workers=len(fetchers), thread_name_prefix="payevol-load") as pool:
+        futures = {
+            name: pool.submit(_with_script_context(measured(name, fn))) for name, fn in fetchers.items()
+        }
+        for name, fut in futures.items():
+            try:
+                setattr(out, name, fut.result())
+            except Exception as e:
+                out.errors[name] = e
+    return out
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import date
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from payevol.core.cache import LruCache
+from payevol.core.dates import add_months
+from payevol.core.frames import is_canonical, series_version
+
+# Mês 0 das tabelas: início do Plano Real (07/1994). Meses anteriores têm índice negativo.
+ORIGIN = date(1994, 7, 1)
+_ORIGIN_ORD = ORIGIN.year * 12 + ORIGIN.month - 1
+
+# tabelas prontas por (tipo, coluna, versão da série canônica): o app pede as mesmas a cada rerun
+_tables = LruCache("lookup.tables", 16)
+
+
+def month_index(d: date) -> int:
+    """
+    Meses desde 07/1994 (07/1994 -> 0, 06/1994 -> -1).
+    """
+    return d.year * 12 + d.month - 1 - _ORIGIN_ORD
+
+
+def month_indices(values) -> np.ndarray:
+    """
+    Versão vetorizada de month_index para date, datetime64 ou 'YYYY-MM'.
+    """
+    ts = pd.DatetimeIndex(pd.to_datetime(pd.Index(values)))
+    return ts.year.to_numpy(dtype=np.int64) * 12 + ts.month.to_numpy(dtype=np.int64) - 1 - _ORIGIN_ORD
+
+
+def month_dates(idx: np.ndarray) -> pd.DatetimeIndex:
+    """
+    Inverso vetorizado de month_indices: 1º dia de cada mês.
+    """
+    months = np.datetime64(ORIGIN.strftime("%Y-%m"), "M") + np.asarray(idx, dtype=np.int64)
+    return pd.DatetimeIndex(months.astype("datetime64[ns]"))
+
+
+def month_labels(dates) -> np.ndarray:
+    """
+    "mm/aaaa" de cada data (datetime64), sem strftime por valor.
+    """
+    m = np.asarray(dates).astype("datetime64[M]").astype(np.int64)
+    return np.char.add(np.char.mod("%02d/", m % 12 + 1), np.char.mod("%d", m // 12 + 1970))
+
+
+def month_at(idx: int) -> date:
+    return add_months(ORIGIN, int(idx))
+
+
+@dataclass(frozen=True)
+class MonthlyTable:
+    """
+    Série mensal densa: values[i] é o valor vigente no mês `start + i` (meses desde 07/1994),
+    com forward-fill entre as datas publicadas (degraus do salário mínimo).
+    Antes do primeiro mês: NaN. Depois do último: repete o último valor
+    (mesmo critério do merge_asof backward).
+    """
+    start: int
+    values: np.ndarray
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.values) - 1
+
+    @property
+    def first_date(self) -> date:
+        return month_at(self.start)
+
+    @cached_property
+    def version(self) -> str:
+        """
+        Impressão digital do conteúdo (início + valores): muda quando a série muda.
+        Calculada uma vez por tabela.
+        """
+        h = hashlib.blake2b(self.values.tobytes(), digest_size=8, key=str(self.start).encode())
+        return h.hexdigest()
+
+    def take(self, idx: np.ndarray) -> np.ndarray:
+        idx = np.asarray(idx, dtype=np.int64)
+        pos = np.minimum(idx - self.start, len(self.values) - 1)
+        out = np.full(idx.shape, np.nan)
+        ok = pos >= 0
+        out[ok] = self.values[pos[ok]]
+        return out
+
+    def at(self, d: date) -> float:
+        pos = min(month_index(d) - self.start, len(self.values) - 1)
+        return float(self.values[pos]) if pos >= 0 else float("nan")
+
+    def span(self, first: date, last: date) -> np.ndarray:
+        """
+        Valores de `first` até `last` (inclusive), mês a mês.
+        """
+        i0 = month_index(first)
+        return self.take(np.arange(i0, month_index(last) + 1))
+
+
+@dataclass(frozen=True)
+class StepSeries:
+    """
+    Série em degraus guardada por trechos (run-length): values[i] vale do mês starts[i]
+    (meses desde 07/1994) até o mês anterior a starts[i + 1]. Depois do último trecho repete
+    o último valor e, antes do primeiro, é NaN (mesmos critérios da MonthlyTable).
+    end: último mês publicado. Memória e consultas crescem com o número de mudanças, não de meses.
+    Mesma interface de leitura da MonthlyTable (take, at, span, version), com consulta O(log n).
+    """
+    starts: np.ndarray
+    values: np.ndarray
+    end: int
+
+    @property
+    def start(self) -> int:
+        return int(self.starts[0])
+
+    @property
+    def first_date(self) -> date:
+        return month_at(self.start)
+
+    @cached_property
+    def version(self) -> str:
+        h = hashlib.blake2b(self.values.tobytes(), digest_size=8, key=str(self.end).encode())
+        h.update(self.starts.tobytes())
+        return h.hexdigest()
+
+    def _pos(self, idx) -> np.ndarray:
+        # trecho vigente em cada mês (-1: antes do primeiro)
+        return np.searchsorted(self.starts, idx, side="right") - 1
+
+    def take(self, idx: np.ndarray) -> np.ndarray:
+        pos = self._pos(np.asarray(idx, dtype=np.int64))
+        return np.where(pos >= 0, self.values[np.maximum(pos, 0)], np.nan)
+
+    def at(self, d: date) -> float:
+        pos = int(self._pos(month_index(d)))
+        return float(self.values[pos]) if pos >= 0 else float("nan")
+
+    def span(self, first: date, last: date) -> np.ndarray:
+        """
+        Valores de `first` até `last` (inclusive), mês a mês (expande os trechos).
+        """
+        run_starts, run_ends, values = self.runs(first, last)
+        return np.repeat(values, run_ends - run_starts + 1)
+
+    def runs(self, first: date, last: date) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Trechos que cobrem `first`..`last`, recortados nesse intervalo:
+        (primeiro mês, último mês, valor) de cada um. Meses antes da série vêm num trecho NaN.
+        """
+        i0, i1 = month_index(first), month_index(last)
+        p0, p1 = int(self._pos(i0)), int(self._pos(i1))
+        seg = np.arange(max(p0, 0), p1 + 1) if i1 >= i0 else np.arange(0)
+        run_starts = np.maximum(self.starts[seg], i0)
+        run_ends = np.append(self.starts[seg[1:]] - 1, i1)[: len(seg)]
+        values = self.values[seg]
+        if p0 < 0 and i1 >= i0:
+            run_starts = np.append(i0, run_starts)
+            run_ends = np.append(min(i1, self.start - 1), run_ends)
+            values = np.append(np.nan, values)
+        return run_starts, run_ends, values
+
+    def scale(self, factor: float) -> "StepSeries":
+        """
+        factor × série, trecho a trecho (ex.: k×SM).
+        """
+        return StepSeries(self.starts, _readonly(self.values * factor), self.end)
+
+
+def _readonly(a: np.ndarray) -> np.ndarray:
+    a.setflags(write=False)
+    return a
+
+
+def step_series(src: pd.DataFrame | MonthlyTable, value_col: str) -> StepSeries:
+    """
+    StepSeries de (ref_date, value_col) ou de uma MonthlyTable: um trecho por mudança de valor.
+    Datas repetidas: vale a última linha; linhas sem valor são ignoradas (como no forward-fill).
+    Séries canônicas são materializadas uma vez por versão (frames.series_version).
+    """
+    version = None if isinstance(src, MonthlyTable) else series_version(src, value_col)
+    if version is not None:
+        return _tables.get_or_compute(("steps", value_col, version), lambda: _step_series(src, value_col))
+    return _step_series(src, value_col)
+
+
+def _step_series(src: pd.DataFrame | MonthlyTable, value_col: str) -> StepSeries:
+    if isinstance(src, MonthlyTable):
+        values = src.values
+        idx = src.start + np.arange(len(values))
+        end = src.end
+    else:
+        if src.empty:
+            raise ValueError(f"step_series: série vazia ({value_col}).")
+        values = src[value_col].to_numpy(dtype=np.float64)
+        idx = month_indices(src["ref_date"])
+        order = np.argsort(idx, kind="stable")
+        idx, values = idx[order], values[order]
+        # repetidas: a última de cada mês
+        keep = np.append(idx[1:] != idx[:-1], True)
+        idx, values = idx[keep], values[keep]
+        end = int(idx[-1])
+        ok = ~np.isnan(values)
+        idx, values = idx[ok], values[ok]
+        if not len(idx):
+            raise ValueError(f"step_series: série sem valores ({value_col}).")
+
+    change = np.append(True, values[1:] != values[:-1])
+    return StepSeries(_readonly(idx[change].astype(np.int64)), _readonly(values[change].astype(np.float64)), end)
+
+
+def monthly_table(df: pd.DataFrame, value_col: str) -> MonthlyTable:
+    """
+    Materializa (ref_date, value_col) em uma MonthlyTable.
+    Datas repetidas: vale a última linha.
+    Séries canônicas (core.frames.canonical_series) pulam a conversão de datas e a ordenação
+    e são materializadas uma vez por versão (frames.series_version).
+    """
+    version = series_version(df, value_col)
+    if version is not None:
+        return _tables.get_or_compute(("monthly", value_col, version), lambda: _monthly_table(df, value_col))
+    return _monthly_table(df, value_col)
+
+
+def _monthly_table(df: pd.DataFrame, value_col: str) -> MonthlyTable:
+    if df.empty:
+        raise ValueError(f"monthly_table: série vazia ({value_col}).")
+
+    vals = df[value_col].to_numpy(dtype=np.float64)
+    idx = None
+    if is_canonical(df, value_col):
+        # datetime64[M] conta meses desde 01/1970; confere a ordem (barato) antes de confiar
+        idx = df["ref_date"].to_numpy().astype("datetime64[M]").astype(np.int64) + 1970 * 12 - _ORIGIN_ORD
+        if not (np.diff(idx) > 0).all():
+            idx = None
+    if idx is None:
+        idx = month_indices(df["ref_date"])
+        order = np.argsort(idx, kind="stable")
+        idx, vals = idx[order], vals[order]
+
+    start = int(idx[0])
+    dense = np.full(int(idx[-1]) - start + 1, np.nan)
+    dense[idx - start] = vals
+
+    # forward-fill: para cada posição, o último mês publicado até ela
+    filled = np.where(np.isnan(dense), 0, np.arange(len(dense)))
+    np.maximum.accumulate(filled, out=filled)
+    dense = dense[filled]
+    dense.setflags(write=False)
+    return MonthlyTable(start, dense)
+
+
+def as_table(src: pd.DataFrame | MonthlyTable | StepSeries, value_col: str) -> MonthlyTable | StepSeries:
+    return src if isinstance(src, (MonthlyTable, StepSeries)) else monthly_table(src, value_col)
+
+
+def as_steps(src: pd.DataFrame | MonthlyTable | StepSeries, value_col: str) -> StepSeries:
+    return src if isinstance(src, StepSeries) else step_series(src, value_col)
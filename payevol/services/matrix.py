@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from payevol.core.cache import LruCache
+from payevol.core.dates import MIN_REF, add_months, first_day_current_month
+from payevol.core.metrics import timed
+from payevol.services.lookup import MonthlyTable, StepSeries, as_table, month_dates, month_index
+
+# método -> coluna de valores da série
+METHODS = {"sm": "min_wage", "ipca": "ipca_index", "inpc": "inpc_index"}
+METHOD_LABELS = {
+    "sm": "k×SM",
+    "ipca": "IPCA",
+    "inpc": "INPC",
+    "sm/ipca": "k×SM ÷ IPCA (ganho real do SM)",
+}
+
+# matrizes prontas por (método, versão dos dados, último mês)
+_matrices = LruCache("matrix", 16)
+
+
+@dataclass(frozen=True)
+class FactorMatrix:
+    """
+    Fatores de atualização para todos os pares (mês de referência, mês-alvo):
+      factors[i, j] = valor em months[j] de R$ 1 na referência months[i]
+    (mesma conta dos builders de payevol.services.series, para salário 1).
+    Triangular: j < i fica NaN, assim como pares sem dado.
+    months: meses desde 07/1994 (lookup.month_index); version: impressão digital dos dados.
+    """
+    method: str
+    version: str
+    months: np.ndarray
+    factors: np.ndarray
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        return month_dates(self.months)
+
+    def sample(self, step: int) -> "FactorMatrix":
+        """
+        Um mês a cada `step` (sempre com o último, para a coluna final ser o mês mais recente).
+        """
+        n = len(self.months)
+        if step <= 1:
+            return self
+        pos = np.unique(np.append(np.arange(0, n, step), n - 1))
+        return FactorMatrix(self.method, self.version, self.months[pos], _readonly(self.factors[np.ix_(pos, pos)]))
+
+
+def _readonly(a: np.ndarray) -> np.ndarray:
+    a.setflags(write=False)
+    return a
+
+
+def _triangular(f: np.ndarray) -> np.ndarray:
+    f[np.tril_indices(len(f), -1)] = np.nan
+    return _readonly(f)
+
+
+@timed("matrix.build")
+def factor_matrix(
+    method: str, table: pd.DataFrame | MonthlyTable | StepSeries, first: date = MIN_REF, last: date | None = None
+) -> FactorMatrix:
+    """
+    Matriz de fatores de `method` ("sm", "ipca" ou "inpc"), de `first` até `last`
+    (padrão: mês atual - 1), por produto externo dos vetores da série:
+      sm:          SM(m) / SM(ref)
+      ipca, inpc:  I(m) / I(mês anterior à ref)
+    Guardada por versão dos dados: a mesma série devolve a mesma matriz (somente leitura).
+    """
+    if method not in METHODS:
+        raise ValueError(f"método desconhecido: {method} (use {', '.join(METHODS)})")
+    table = as_table(table, METHODS[method])
+    last = last or add_months(first_day_current_month(), -1)
+
+    def compute() -> FactorMatrix:
+        idx = np.arange(month_index(first), month_index(last) + 1)
+        values = table.take(idx)
+        base = values if method == "sm" else table.take(idx - 1)
+        base = np.where(base > 0, base, np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            factors = values[None, :] / base[:, None]
+        return FactorMatrix(method, table.version, _readonly(idx), _triangular(factors))
+
+    return _matrices.get_or_compute((method, table.version, month_index(first), month_index(last)), compute)
+
+
+def relative_matrix(a: FactorMatrix, b: FactorMatrix) -> FactorMatrix:
+    """
+    a ÷ b par a par (ex.: sm/ipca > 1 = o salário mínimo ganhou da inflação nesse intervalo).
+    """
+    if not np.array_equal(a.months, b.months):
+        raise ValueError("matrizes com meses diferentes")
+
+    def compute() -> FactorMatrix:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            factors = a.factors / b.factors
+        return FactorMatrix(f"{a.method}/{b.method}", f"{a.version}:{b.version}", a.months, _readonly(factors))
+
+    return _matrices.get_or_compute(("relative", a.version, b.version, a.months[0], a.months[-1]), compute)
+
+
+def method_matrix(method: str, tables: dict[str, MonthlyTable | StepSeries], last: date | None = None) -> FactorMatrix:
+    """
+    Matriz de um método de METHOD_LABELS a partir das tabelas {"sm"|"ipca"|"inpc": MonthlyTable ou StepSeries}.
+    KeyError se faltar a série do método.
+    """
+    if "/" in method:
+        a, b = method.split("/", 1)
+        return relative_matrix(method_matrix(a, tables, last), method_matrix(b, tables, last))
+    return factor_matrix(method, tables[method], last=last)
@@ -1,99 +1,235 @@
+import hashlib
 import re
 from datetime import date
+from html.parser import HTMLParser
+from importlib import resources
 import pandas as pd
-import requests
-import streamlit as st
 
-SAL_MIN_URL = "https://previdenciarista.com/tabela-historica-dos-salarios-minimos/"
+from payevol.core.cache import cached
+from payevol.core.config import min_wage_url
+from payevol.core.frames import canonical_series
+from payevol.core.metrics import stage
+from payevol.services import http_client
+from payevol.services.lookup import MonthlyTable, StepSeries, as_table
+from payevol.services.store import cached_series, read_marker, write_marker
+
+# Série embarcada no pacote (payevol/data/min_wage.csv); a raspagem só procura meses mais novos
+BASELINE_CSV = "min_wage.csv"
+_PAGE_MARKER = "min_wage/page-sha256"
 
 PT_BR_MONTH_ABBR = {
     "jan": 1, "fev": 2, "mar": 3, "abr": 4, "mai": 5, "jun": 6,
     "jul": 7, "ago": 8, "set": 9, "out": 10, "nov": 11, "dez": 12
 }
 
-@st.cache_data(ttl=60 * 60 * 24, show_spinner=False)
-def fetch_min_wage_changes() -> pd.DataFrame:
+_RX_MMMYYYY = re.compile(r"\b(jan|fev|mar|abr|mai|jun|jul|ago|set|out|nov|dez)\s*/\s*(\d{4})\b", re.I)
+_RX_BRL = re.compile(r"R\$\s*([\d\.\,]+)")
+_RX_TABLE = re.compile(r"<table\b.*?</table>", re.I | re.S)
+_RX_TAG = re.compile(r"<[^>]+>")
+# fallback: mês/ano e o primeiro "R$" até 200 caracteres depois (janela limitada, sem retrocesso longo)
+_RX_LINE = re.compile(
+    r"\b(jan|fev|mar|abr|mai|jun|jul|ago|set|out|nov|dez)\s*/\s*(\d{4})\b.{0,200}?R\$\s*([\d\.\,]+)",
+    re.I | re.S,
+)
+
+def _baseline_lines() -> list[str]:
+    return resources.files("payevol.data").joinpath(BASELINE_CSV).read_text(encoding="utf-8").splitlines()
+
+def baseline_version() -> str:
     """
-    Mudanças do salário mínimo:
-      ref_date (1º dia do mês), min_wage (float)
-    Regra: só aceita valores que contenham 'R$' (evita pegar ano por engano).
+    Versão da série embarcada (linha '# versão: ...' do CSV).
     """
-    headers = {"User-Agent": "Mozilla/5.0"}
-    resp = requests.get(SAL_MIN_URL, headers=headers, timeout=30)
-    resp.raise_for_status()
-    html = resp.text
-
-    changes: list[tuple[date, float]] = []
+    for line in _baseline_lines():
+        if line.startswith("#") and "versão:" in line:
+            return line.split("versão:", 1)[1].strip()
+    return ""
 
-    rx_mmmyyyy = re.compile(r"\b(jan|fev|mar|abr|mai|jun|jul|ago|set|out|nov|dez)\s*/\s*(\d{4})\b", re.I)
-    rx_brl = re.compile(r"R\$\s*([\d\.\,]+)")
+def load_baseline() -> pd.DataFrame:
+    """
+    Mudanças do salário mínimo embarcadas no pacote: ref_date, min_wage, source="bundled".
+    """
+    rows = [line.split(",") for line in _baseline_lines() if line and not line.startswith("#")]
+    df = pd.DataFrame(rows[1:], columns=rows[0])
+    df["ref_date"] = pd.to_datetime(df["ref_date"]).dt.date
+    df["min_wage"] = df["min_wage"].astype(float)
+    df["source"] = "bundled"
+    return df
+
+class _TableRows(HTMLParser):
+    """
+    Extrai o texto das células (<td>/<th>) linha a linha de um trecho <table>.
+    """
 
-    # 1) Via tabelas HTML (preferido)
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.rows: list[list[str]] = []
+        self._row: list[str] | None = None
+        self._cell: list[str] | None = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tr":
+            self._row = []
+        elif tag in ("td", "th") and self._row is not None:
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self._cell is not None and self._row is not None:
+            self._row.append(" ".join("".join(self._cell).split()))
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            self.rows.append(self._row)
+            self._row = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+def _wage_table_html(html: str) -> str | None:
+    """
+    Só o <table> que interessa: o primeiro com valores em R$ e datas mmm/aaaa.
+    """
+    for m in _RX_TABLE.finditer(html):
+        t = m.group(0)
+        if "R$" in t and _RX_MMMYYYY.search(t):
+            return t
+    return None
+
+def _to_change(mref: re.Match, mval: re.Match) -> tuple[date, float]:
+    mm = PT_BR_MONTH_ABBR[mref.group(1).lower()]
+    v = mval.group(1).replace(".", "").replace(",", ".")
+    return date(int(mref.group(2)), mm, 1), float(v)
+
+def _parse_wage_table(table_html: str) -> list[tuple[date, float]]:
+    """
+    Regra: só aceita valores que contenham 'R$' (evita pegar ano por engano).
+    """
+    parser = _TableRows()
+    parser.feed(table_html)
+    parser.close()
+    if not parser.rows:
+        return []
+
+    header = [c.strip().lower() for c in parser.rows[0]]
+    value_idx = next((i for i, c in enumerate(header) if "valor" in c), None)
+    ref_idx = next((i for i, c in enumerate(header) if "desde" in c or "a partir" in c or "vig" in c), 0)
+
+    changes = []
+    for row in parser.rows[1:]:
+        if value_idx is not None and value_idx < len(row):
+            mval = _RX_BRL.search(row[value_idx])
+        else:
+            mval = next((m for m in map(_RX_BRL.search, row) if m), None)
+        mref = _RX_MMMYYYY.search(row[ref_idx]) if ref_idx < len(row) else None
+        if not mref:
+            mref = _RX_MMMYYYY.search(" ".join(row))
+        if mref and mval:
+            changes.append(_to_change(mref, mval))
+    return changes
+
+def _parse_page_fallback(html: str) -> list[tuple[date, float]]:
+    """
+    Página sem a tabela esperada: pandas.read_html em todas as tabelas e, por último,
+    regex com janela limitada sobre o texto sem tags.
+    """
+    changes: list[tuple[date, float]] = []
     try:
-        tables = pd.read_html(html)
-        for t in tables:
-            cols = [str(c).strip().lower() for c in t.columns]
+        from io import StringIO
 
+        for t in pd.read_html(StringIO(html)):
+            cols = [str(c).strip().lower() for c in t.columns]
             value_idx = next((i for i, c in enumerate(cols) if "valor" in c), None)
             if value_idx is None:
                 continue
-            value_col = t.columns[value_idx]
-
             ref_idx = next((i for i, c in enumerate(cols) if "desde" in c or "a partir" in c or "vig" in c), 0)
-            ref_col = t.columns[ref_idx]
-
-            for _, row in t.iterrows():
-                ref_txt = "" if pd.isna(row.get(ref_col)) else str(row.get(ref_col))
-                val_txt = "" if pd.isna(row.get(value_col)) else str(row.get(value_col))
-
-                mref = rx_mmmyyyy.search(ref_txt)
-                mval = rx_brl.search(val_txt)
-
-                if not mref:
-                    row_text = " ".join([str(x) for x in row.values if pd.notna(x)])
-                    mref = rx_mmmyyyy.search(row_text)
-
-                if not (mref and mval):
-                    continue
-
-                mm = PT_BR_MONTH_ABBR[mref.group(1).lower()]
-                yyyy = int(mref.group(2))
-                v = mval.group(1).replace(".", "").replace(",", ".")
-                changes.append((date(yyyy, mm, 1), float(v)))
-
+            for row in t.astype(str).itertuples(index=False):
+                mref = _RX_MMMYYYY.search(row[ref_idx]) or _RX_MMMYYYY.search(" ".join(row))
+                mval = _RX_BRL.search(row[value_idx])
+                if mref and mval:
+                    changes.append(_to_change(mref, mval))
         if changes:
-            df = pd.DataFrame(changes, columns=["ref_date", "min_wage"]).drop_duplicates()
-            return df.sort_values("ref_date").reset_index(drop=True)
+            return changes
     except Exception:
         pass
 
-    # 2) Fallback: regex no HTML inteiro (ancorado em "R$")
-    rx_line = re.compile(
-        r"\b(jan|fev|mar|abr|mai|jun|jul|ago|set|out|nov|dez)\s*/\s*(\d{4})\b.*?R\$\s*([\d\.\,]+)",
-        re.I
-    )
-    for mon, yyyy, val in rx_line.findall(html):
-        mm = PT_BR_MONTH_ABBR[mon.lower()]
-        v = val.replace(".", "").replace(",", ".")
-        changes.append((date(int(yyyy), mm, 1), float(v)))
+    text = _RX_TAG.sub(" ", html)
+    for m in _RX_LINE.finditer(text):
+        mm = PT_BR_MONTH_ABBR[m.group(1).lower()]
+        v = m.group(3).replace(".", "").replace(",", ".")
+        changes.append((date(int(m.group(2)), mm, 1), float(v)))
+    return changes
 
+def _scrape_min_wage_changes(skip_unchanged: bool = True) -> pd.DataFrame | None:
+    """
+    Raspagem da página do Previdenciarista (só a tabela de salários).
+    Devolve None se a tabela é idêntica (mesmo hash) à da última raspagem.
+    """
+    resp = http_client.get(min_wage_url())
+    if skip_unchanged and resp.not_modified:
+        return None
+
+    with stage("min_wage.parse"):
+        html = resp.text
+        table = _wage_table_html(html)
+        digest = hashlib.sha256((table or html).encode("utf-8")).hexdigest()
+        if skip_unchanged and digest == read_marker(_PAGE_MARKER):
+            return None
+
+        changes = _parse_wage_table(table) if table else []
+        if not changes:
+            changes = _parse_page_fallback(html)
     if not changes:
         raise RuntimeError("Não consegui extrair a tabela de salário mínimo do site-fonte.")
 
+    write_marker(_PAGE_MARKER, digest)
     df = pd.DataFrame(changes, columns=["ref_date", "min_wage"]).drop_duplicates()
     return df.sort_values("ref_date").reset_index(drop=True)
 
-def min_wage_at(ref: date, changes_df: pd.DataFrame) -> float:
+def _update_min_wage_changes(stored: pd.DataFrame | None = None) -> pd.DataFrame:
     """
-    Salário mínimo vigente na referência (ref = 1º dia do mês).
+    Série embarcada + meses mais novos (já guardados ou raspados agora).
+    Se a raspagem falhar, segue com o que já se sabe.
+    """
+    known = load_baseline()
+    if stored is not None:
+        newer = stored.loc[stored["ref_date"] > known["ref_date"].max(), ["ref_date", "min_wage"]]
+        known = pd.concat([known, newer.assign(source="previdenciarista")], ignore_index=True)
+
+    try:
+        scraped = _scrape_min_wage_changes(skip_unchanged=stored is not None)
+    except Exception:
+        scraped = None
+
+    if scraped is not None:
+        newer = scraped[scraped["ref_date"] > known["ref_date"].max()].copy()
+        newer["source"] = "previdenciarista"
+        known = pd.concat([known, newer], ignore_index=True)
+
+    return known.sort_values("ref_date").reset_index(drop=True)
+
+@cached(ttl=60 * 60 * 24)
+def fetch_min_wage_changes() -> pd.DataFrame:
     """
-    changes = changes_df.copy()
-    changes["ref_date"] = pd.to_datetime(changes["ref_date"])
-    changes = changes.sort_values("ref_date")
+    Mudanças do salário mínimo (com cópia persistida em disco), em forma canônica
+    (core.frames.canonical_series, compartilhada: não modificar):
+      ref_date (datetime64, 1º dia do mês, ordenado), min_wage (float64), source (bundled / previdenciarista)
+    Parte da série embarcada no pacote; o site-fonte só é consultado (1x/dia) para
+    procurar reajustes mais novos.
+    """
+    df = cached_series(
+        "min_wage",
+        _update_min_wage_changes,
+        source="bundled",
+        refresh=_update_min_wage_changes,
+        invalidate=fetch_min_wage_changes.clear,
+    )
+    return canonical_series(df, "min_wage")
 
-    q = pd.DataFrame({"ref_date": [pd.to_datetime(ref)]}).sort_values("ref_date")
-    out = pd.merge_asof(q, changes, on="ref_date", direction="backward")
-    v = float(out.loc[0, "min_wage"])
-    if v <= 0:
+def min_wage_at(ref: date, changes_df: pd.DataFrame | MonthlyTable | StepSeries) -> float:
+    """
+    Salário mínimo vigente na referência (ref = 1º dia do mês).
+    changes_df: mudanças do salário mínimo, a MonthlyTable ou a StepSeries já materializada.
+    """
+    v = as_table(changes_df, "min_wage").at(ref)
+    if not v > 0:
         raise RuntimeError("Salário mínimo inválido na referência.")
     return v
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import date
+from typing import Callable
+
+import pandas as pd
+
+from payevol.core.config import background_refresh_enabled, source_max_age
+from payevol.core.dates import add_months
+from payevol.core.metrics import stage
+from payevol.services.inpc import fetch_inpc_number_index
+from payevol.services.ipca import fetch_ipca_number_index
+from payevol.services.min_wage import fetch_min_wage_changes
+from payevol.services.store import SeriesMeta, forced_refresh, load_series, series_meta, set_background_refresh
+
+# série no disco -> (busca, publicada mensalmente pelo IBGE?)
+SERIES: dict[str, tuple[Callable[[], pd.DataFrame], bool]] = {
+    "min_wage": (fetch_min_wage_changes, False),
+    "ipca": (fetch_ipca_number_index, True),
+    "inpc": (fetch_inpc_number_index, True),
+}
+
+# intervalo (s) entre verificações
+CHECK_EVERY = 5 * 60
+# atualiza quando falta menos que isto (s) para a cópia vencer
+REFRESH_LEAD = 60 * 60
+# IPCA/INPC do mês M saem por volta do dia 10 de M+1; a partir deste dia, procura o mês novo
+IBGE_RELEASE_DAY = 8
+# intervalo mínimo (s) entre tentativas na mesma série (janela de divulgação ou falha)
+RETRY_EVERY = 30 * 60
+
+_last_attempt: dict[str, float] = {}
+_thread: threading.Thread | None = None
+_stop = threading.Event()
+
+
+def next_release(last_period: date) -> date:
+    """
+    Primeiro dia em que o mês seguinte a `last_period` pode estar publicado no SIDRA.
+    """
+    return add_months(last_period, 2).replace(day=IBGE_RELEASE_DAY)
+
+
+def due_reason(meta: SeriesMeta | None, ibge: bool, today: date, max_age: float) -> str | None:
+    """
+    Por que a série deve ser atualizada agora (ou None):
+      missing  - ainda não há cópia no disco
+      expiring - a cópia vence em menos de REFRESH_LEAD
+      release  - já passou a data de divulgação do mês seguinte ao último salvo
+    """
+    if meta is None:
+        return "missing"
+    if meta.age() > max_age - REFRESH_LEAD:
+        return "expiring"
+    if ibge and today >= next_release(meta.last_period):
+        return "release"
+    return None
+
+
+def refresh_due(today: date | None = None) -> dict[str, str]:
+    """
+    Atualiza (nesta thread) as séries que precisam, validando antes de gravar.
+    Só quando a série gravada mudou (não em 304 nem em falha com a cópia antiga) é que
+    o cache em memória daquela busca é limpo; até lá, as requisições seguem com os dados
+    anteriores. Devolve {série: motivo} das séries que mudaram.
+    """
+    today = today or date.today()
+    max_age = source_max_age()
+    now = time.time()
+    done = {}
+    for name, (fetch, ibge) in SERIES.items():
+        reason = due_reason(series_meta(name), ibge, today, max_age)
+        if reason is None or now - _last_attempt.get(name, 0.0) < RETRY_EVERY:
+            continue
+        _last_attempt[name] = now
+        before = load_series(name)
+        try:
+            with forced_refresh(), stage("refresh", series=name, reason=reason):
+                fetch()
+        except Exception:
+            continue  # sem cópia no disco e fonte fora: tenta de novo depois de RETRY_EVERY
+        after = load_series(name)
+        if after is None or (before is not None and after[0].equals(before[0])):
+            continue  # 304 ou fonte fora com a cópia antiga: nada a invalidar
+        fetch.clear()
+        done[name] = reason
+    return done
+
+
+def _loop() -> None:
+    while not _stop.is_set():
+        try:
+            refresh_due()
+        except Exception:
+            pass
+        _stop.wait(CHECK_EVERY)
+
+
+def start_refresher() -> threading.Thread | None:
+    """
+    Liga a revalidação em segundo plano do store e sobe (uma vez por processo) a thread
+    que atualiza as fontes antes de vencerem e nas datas de divulgação do IBGE.
+    Desligado com $PAYEVOL_BACKGROUND_REFRESH=0.
+    """
+    global _thread
+    if not background_refresh_enabled():
+        return None
+    set_background_refresh(True)
+    if _thread is None or not _thread.is_alive():
+        _stop.clear()
+        _thread = threading.Thread(target=_loop, name="payevol-refresher", daemon=True)
+        _thread.start()
+    return _thread
+
+
+def stop_refresher() -> None:
+    _stop.set()
@@ -1,85 +1,122 @@
 from datetime import date
+import numpy as np
 import pandas as pd
 
+from payevol.core.cache import LruCache
 from payevol.core.dates import add_months, first_day_current_month
+from payevol.core.metrics import timed
+from payevol.services.lookup import MonthlyTable, StepSeries, as_steps, as_table, month_dates, month_index
 from payevol.services.min_wage import min_wage_at
 
-def build_equivalent_salary_series_sm(ref: date, salary_ref: float, sm_changes_df: pd.DataFrame) -> pd.DataFrame:
+# Séries "por real de salário" (tudo o que não depende de salary_ref), por
+# (referência, último mês, versão dos dados). Trocar só o salário custa uma multiplicação.
+UNIT_CACHE_SIZE = 256
+_sm_units = LruCache("series.sm_unit", UNIT_CACHE_SIZE)
+_index_units = LruCache("series.index_unit", UNIT_CACHE_SIZE)
+
+def _last_month(ref: date) -> date:
+    """
+    Último mês das séries: mês atual - 1 (ou a própria referência, se posterior).
+    """
+    return max(ref, add_months(first_day_current_month(), -1))
+
+def _months_until_last(ref: date) -> pd.DatetimeIndex:
+    """
+    Meses ref -> (mês atual - 1); se a referência for posterior, só ela.
+    """
+    return month_dates(np.arange(month_index(ref), month_index(_last_month(ref)) + 1))
+
+def _readonly(a: np.ndarray) -> np.ndarray:
+    a.setflags(write=False)
+    return a
+
+def _sm_unit(ref: date, steps: StepSeries) -> tuple:
+    last = _last_month(ref)
+
+    def compute() -> tuple:
+        _, run_ends, values = steps.runs(ref, last)
+        lengths = np.diff(run_ends, prepend=month_index(ref) - 1)
+        min_wage = _readonly(np.repeat(values, lengths))
+        return _months_until_last(ref), lengths, values, min_wage, float(min_wage_at(ref, steps))
+
+    return _sm_units.get_or_compute((ref, last, steps.version), compute)
+
+def _index_unit(ref: date, table: MonthlyTable, out_col: str) -> tuple:
+    last = _last_month(ref)
+
+    def compute() -> tuple:
+        months = _months_until_last(ref)
+        I_m = _readonly(table.span(ref, last))
+
+        prev_ref = add_months(ref, -1)
+        I_prev = table.at(prev_ref)
+
+        if pd.isna(I_prev):
+            first_avail = table.first_date
+            raise RuntimeError(
+                f"{out_col}: não há índice disponível para {prev_ref.strftime('%m/%Y')} (mês anterior à referência). "
+                f"Série disponível a partir de {first_avail.strftime('%m/%Y')}. "
+                "Escolha uma referência igual ou posterior ao início da série."
+            )
+
+        if I_prev <= 0:
+            raise RuntimeError(
+                f"{out_col}: índice inválido para {prev_ref.strftime('%m/%Y')}. "
+                "Tente novamente mais tarde."
+            )
+        return months, I_m, I_prev, _readonly(I_m / I_prev)
+
+    return _index_units.get_or_compute((ref, last, table.version), compute)
+
+@timed("series.sm")
+def build_equivalent_salary_series_sm(
+    ref: date, salary_ref: float, sm_changes_df: pd.DataFrame | MonthlyTable | StepSeries
+) -> pd.DataFrame:
     """
     Série mensal ref -> (mês atual - 1) com:
       k = salary_ref / SM_ref
       equiv_brl(m) = k * SM(m)
+    sm_changes_df: mudanças do salário mínimo, a MonthlyTable ou a StepSeries (trechos) já materializada.
+    k×SM é calculado por trecho (uma conta por reajuste) e só então expandido mês a mês.
+    Constantes da referência em df.attrs: salary_ref, sm_ref, k_sm.
     """
-    end_ref = add_months(first_day_current_month(), -1)
-    if ref > end_ref:
-        end_ref = ref
-
-    months = pd.date_range(start=ref, end=end_ref, freq="MS")
-    base = pd.DataFrame({"ref_date": months}).sort_values("ref_date")
-
-    changes = sm_changes_df.copy()
-    changes["ref_date"] = pd.to_datetime(changes["ref_date"])
-    changes = changes.sort_values("ref_date")
-
-    out = pd.merge_asof(base, changes, on="ref_date", direction="backward")
-
-    sm_ref = min_wage_at(ref, sm_changes_df)
-    k = float(salary_ref) / float(sm_ref)
-
-    out["salary_ref"] = float(salary_ref)
-    out["sm_ref"] = float(sm_ref)
-    out["k_sm"] = float(k)
-    out["equiv_brl"] = out["k_sm"] * out["min_wage"]
-    out["mm_yyyy"] = out["ref_date"].dt.strftime("%m/%Y")
-    return out
-
-def build_index_adjusted_series(ref: date, salary_ref: float, index_df: pd.DataFrame, index_col: str, out_col: str) -> pd.DataFrame:
+    months, lengths, values, min_wage, sm_ref = _sm_unit(ref, as_steps(sm_changes_df, "min_wage"))
+    k = float(salary_ref) / sm_ref
+
+    df = pd.DataFrame(
+        {
+            "ref_date": months,
+            "min_wage": min_wage,
+            "equiv_brl": np.repeat(values * k, lengths),
+        }
+    )
+    df.attrs.update(salary_ref=float(salary_ref), sm_ref=sm_ref, k_sm=k)
+    return df
+
+@timed("series.index")
+def build_index_adjusted_series(ref: date, salary_ref: float, index_df: pd.DataFrame | MonthlyTable, index_col: str, out_col: str) -> pd.DataFrame:
     """
     Série mensal ref -> (mês atual - 1), usando número-índice:
       salary_adj(m) = salary_ref * I(m) / I(mês_anterior_ref)
+    index_df: dataframe com o número-índice (ou a MonthlyTable já materializada)
     index_col: nome da coluna com número-índice no dataframe (ex.: ipca_index / inpc_index)
     out_col: nome da coluna de saída (ex.: salary_ipca / salary_inpc)
+    Constantes da referência em df.attrs: salary_ref, I_prev_ref.
     """
-    end_ref = add_months(first_day_current_month(), -1)
-    if ref > end_ref:
-        end_ref = ref
-
-    months = pd.date_range(start=ref, end=end_ref, freq="MS")
-    base = pd.DataFrame({"ref_date": months}).sort_values("ref_date")
-
-    idx = index_df.copy()
-    idx["ref_date"] = pd.to_datetime(idx["ref_date"])
-    idx = idx.sort_values("ref_date")
-
-    out = pd.merge_asof(base, idx, on="ref_date", direction="backward")
-    out.rename(columns={index_col: "I_m"}, inplace=True)
-
-    prev_ref = add_months(ref, -1)
-    q = pd.DataFrame({"ref_date": [pd.to_datetime(prev_ref)]}).sort_values("ref_date")
-    prev = pd.merge_asof(q, idx, on="ref_date", direction="backward")
-
-    if prev.empty or pd.isna(prev.loc[0, index_col]):
-        first_avail = idx["ref_date"].min().date()
-        raise RuntimeError(
-            f"{out_col}: não há índice disponível para {prev_ref.strftime('%m/%Y')} (mês anterior à referência). "
-            f"Série disponível a partir de {first_avail.strftime('%m/%Y')}. "
-            "Escolha uma referência igual ou posterior ao início da série."
-        )
-
-    I_prev = float(prev.loc[0, index_col])
-    if I_prev <= 0:
-        raise RuntimeError(
-            f"{out_col}: índice inválido para {prev_ref.strftime('%m/%Y')}. "
-            "Tente novamente mais tarde."
-        )
-
-    out["salary_ref"] = float(salary_ref)
-    out["I_prev_ref"] = I_prev
-    out[out_col] = float(salary_ref) * (out["I_m"] / I_prev)
-    return out
-
-def build_ipca_adjusted_series(ref: date, salary_ref: float, ipca_df: pd.DataFrame) -> pd.DataFrame:
+    months, I_m, I_prev, ratio = _index_unit(ref, as_table(index_df, index_col), out_col)
+
+    df = pd.DataFrame(
+        {
+            "ref_date": months,
+            "I_m": I_m,
+            out_col: float(salary_ref) * ratio,
+        }
+    )
+    df.attrs.update(salary_ref=float(salary_ref), I_prev_ref=I_prev)
+    return df
+
+def build_ipca_adjusted_series(ref: date, salary_ref: float, ipca_df: pd.DataFrame | MonthlyTable) -> pd.DataFrame:
     return build_index_adjusted_series(ref, salary_ref, ipca_df, "ipca_index", "salary_ipca")
 
-def build_inpc_adjusted_series(ref: date, salary_ref: float, inpc_df: pd.DataFrame) -> pd.DataFrame:
+def build_inpc_adjusted_series(ref: date, salary_ref: float, inpc_df: pd.DataFrame | MonthlyTable) -> pd.DataFrame:
     return build_index_adjusted_series(ref, salary_ref, inpc_df, "inpc_index", "salary_inpc")
@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import codecs
+import json
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from payevol.core.config import sidra_base
+from payevol.core.dates import first_day_current_month, months_between
+from payevol.core import metrics
+from payevol.core.metrics import timed
+from payevol.services import http_client
+from payevol.services.http_client import NotModified
+
+_RX_PERIOD = re.compile(r"/p/[^/]+")
+_RX_DNC = re.compile(r"^D\d+N$")
+_RX_DCC = re.compile(r"^D\d+C$")
+
+
+@dataclass(frozen=True)
+class SidraLayout:
+    """
+    Colunas de uma resposta /values do SIDRA:
+      period: chave D?C do período (YYYYMM)
+      names: chaves D?N (nomes das dimensões: mês, variável, item etc.)
+    """
+    period: str
+    names: tuple[str, ...]
+
+
+def _is_header(item: dict) -> bool:
+    return str(item.get("V", "")).strip().lower() == "valor"
+
+
+def resolve_layout(data: list) -> SidraLayout:
+    """
+    Descobre o layout uma única vez: pelo cabeçalho (data[0], ex.: "D2C": "Mês (Código)")
+    ou, sem cabeçalho, pela primeira linha cujo D?C pareça YYYYMM.
+    """
+    header = data[0] if data and isinstance(data[0], dict) and _is_header(data[0]) else None
+    sample = next((x for x in data if isinstance(x, dict) and not _is_header(x)), None)
+    if sample is None:
+        raise RuntimeError("SIDRA: resposta sem linhas de dados.")
+
+    keys = [str(k) for k in (header or sample)]
+    names = tuple(k for k in keys if _RX_DNC.match(k))
+
+    period = None
+    if header is not None:
+        period = next(
+            (
+                k
+                for k in keys
+                if _RX_DCC.match(k) and str(header[k]).strip().lower().startswith(("mês", "mes"))
+            ),
+            None,
+        )
+    if period is None:
+        period = next(
+            (
+                k
+                for k in keys
+                if _RX_DCC.match(k) and str(sample.get(k, "")).strip().isdigit()
+                and len(str(sample.get(k, "")).strip()) == 6
+            ),
+            None,
+        )
+    if period is None:
+        raise RuntimeError("SIDRA: não encontrei a dimensão de período (YYYYMM).")
+    return SidraLayout(period, names)
+
+
+def to_float_ptbr(s: pd.Series) -> pd.Series:
+    """
+    Conversão vetorizada: "1,23" -> 1.23 ; "1.234,56" -> 1234.56 ; "7025.49" -> 7025.49.
+    Valores não numéricos do SIDRA ("...", "-", "X") viram NaN.
+    O caso comum (ponto decimal) sai direto do to_numeric; só o que falhar passa
+    pela troca de separadores.
+    """
+    out = pd.to_numeric(s, errors="coerce")
+    bad = out.isna() & s.notna()
+    if bad.any():
+        raw = s[bad].astype(str).str.strip()
+        ptbr = raw.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+        out[bad] = pd.to_numeric(raw.where(~raw.str.contains(",", regex=False), ptbr), errors="coerce")
+    return out.astype("float64")
+
+
+def _yyyymm_to_datetime(s: pd.Series) -> pd.Series:
+    # poucos períodos distintos: converte só as categorias
+    cat = s.astype("category")
+    periods = pd.to_datetime(
+        cat.cat.categories.astype(str).str.strip(), format="%Y%m", errors="coerce"
+    )
+    return pd.Series(periods.take(cat.cat.codes).where(cat.cat.codes >= 0), index=s.index)
+
+
+def iter_json_batches(chunks: Iterable[bytes], encoding: str = "utf-8") -> Iterator[list]:
+    """
+    Lê um array JSON de objetos (formato do /values) à medida que os bytes chegam.
+    A cada pedaço, os objetos já completos saem como um lote (lista de dicts).
+    Assim, nem o corpo inteiro nem a lista inteira ficam na memória.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    buf = ""
+    started = False
+    for chunk in chunks:
+        buf += decoder.decode(chunk)
+        if not started:
+            head = buf.lstrip()
+            if not head:
+                continue
+            if head[0] != "[":
+                raise RuntimeError("SIDRA: resposta inesperada (JSON não é uma lista).")
+            buf, started = head[1:], True
+
+        end = buf.rfind("}")
+        if end < 0:
+            continue
+        try:
+            batch = json.loads("[" + buf[: end + 1].strip().lstrip(",") + "]")
+        except ValueError:
+            continue  # "}" dentro de um texto ou objeto aninhado: espera mais dados
+        buf = buf[end + 1 :]
+        yield batch
+
+    buf = (buf + decoder.decode(b"", final=True)).strip()
+    if not started or not buf.endswith("]"):
+        raise RuntimeError("SIDRA: resposta JSON incompleta.")
+    rest = buf[:-1].strip().lstrip(",")
+    if rest:
+        yield json.loads("[" + rest + "]")
+
+
+@timed("sidra.parse")
+def parse_value_batches(batches: Iterable[list]) -> pd.DataFrame:
+    """
+    Converte a resposta JSON do /values do SIDRA, lote a lote (ver iter_json_batches).
+    De cada linha guarda só período, valor e os D?N. Cada nome repetido é guardado uma vez só.
+    Saída:
+      ref_date (date no 1º dia do mês), value (float) e as colunas D?N originais (categóricas).
+    Linhas sem período ou valor numérico são descartadas.
+    """
+    return _parse_value_batches(batches)
+
+
+def _parse_value_batches(batches: Iterable[list]) -> pd.DataFrame:
+    header = None
+    layout = None
+    seen = False
+    periods, values = [], []
+    names: dict[str, list] = {}
+    pool: dict = {}
+    for batch in batches:
+        if not seen and batch:
+            seen = True
+            if isinstance(batch[0], dict) and _is_header(batch[0]):
+                header, batch = batch[0], batch[1:]
+        rows = [x for x in batch if isinstance(x, dict)]
+        if not rows:
+            continue
+        if layout is None:
+            layout = resolve_layout(([header] if header else []) + rows[:1])
+            names = {k: [] for k in layout.names}
+        periods.extend([x.get(layout.period) for x in rows])
+        values.extend([x.get("V") for x in rows])
+        for k, col in names.items():
+            col.extend([pool.setdefault(v, v) for v in [x.get(k) for x in rows]])
+
+    if not seen:
+        raise RuntimeError("SIDRA: resposta inesperada (JSON não é uma lista com dados).")
+    if layout is None:
+        raise RuntimeError("SIDRA: resposta sem linhas de dados.")
+
+    out = pd.DataFrame(
+        {
+            "ref_date": _yyyymm_to_datetime(pd.Series(periods, dtype=object)),
+            "value": to_float_ptbr(pd.Series(values, dtype=object)),
+        }
+    )
+    for k, col in names.items():
+        out[k] = pd.Categorical(col)
+
+    out = out.dropna(subset=["ref_date", "value"]).reset_index(drop=True)
+    out["ref_date"] = out["ref_date"].dt.date
+    return out
+
+
+def parse_values(data: list) -> pd.DataFrame:
+    """
+    parse_value_batches para uma resposta já decodificada (lista inteira).
+    """
+    if not isinstance(data, list) or not data:
+        raise RuntimeError("SIDRA: resposta inesperada (JSON não é uma lista com dados).")
+    return parse_value_batches([data])
+
+
+def fetch_values(path: str, periods: str = "all") -> pd.DataFrame:
+    """
+    GET condicional de /values (caminho a partir de sidra_base) lido em streaming e
+    convertido por parse_value_batches. NotModified se a fonte responder 304.
+    """
+    r = http_client.get_stream(period_url(sidra_url(path), periods)).raise_if_not_modified()
+    # "sidra.parse" mede só a conversão: a espera pelos pedaços da rede é descontada
+    waited = [0.0]
+    t0 = time.perf_counter()
+    ok = "true"
+    try:
+        return _parse_value_batches(iter_json_batches(_waiting(r.chunks, waited), r.encoding))
+    except BaseException:
+        ok = "false"
+        raise
+    finally:
+        metrics.observe("payevol_stage_seconds", time.perf_counter() - t0 - waited[0], stage="sidra.parse", ok=ok)
+
+
+def _waiting(chunks: Iterable[bytes], waited: list) -> Iterator[bytes]:
+    """
+    Repassa `chunks` somando em waited[0] o tempo gasto esperando cada pedaço.
+    """
+    it = iter(chunks)
+    while True:
+        t = time.perf_counter()
+        chunk = next(it, None)
+        waited[0] += time.perf_counter() - t
+        if chunk is None:
+            return
+        yield chunk
+
+
+def dimension_columns(df: pd.DataFrame) -> list[str]:
+    return [c for c in df.columns if _RX_DNC.match(str(c))]
+
+
+def match_dimension(col: pd.Series, test: Callable[[pd.Series], pd.Series]) -> pd.Series:
+    """
+    Aplica `test` uma vez por valor distinto (em minúsculas) de uma coluna D?N
+    e expande o resultado para as linhas.
+    """
+    cat = col.astype("category")
+    labels = pd.Series(cat.cat.categories.astype(str)).str.lower()
+    hits = np.append(np.asarray(test(labels).fillna(False), dtype=bool), False)
+    # código -1 (ausente) aponta para o False extra no fim
+    return pd.Series(hits[cat.cat.codes.to_numpy()], index=col.index)
+
+
+def any_dimension(df: pd.DataFrame, test: Callable[[pd.Series], pd.Series]) -> pd.Series:
+    """
+    Máscara: linha em que algum D?N (minúsculo) satisfaz `test`.
+    """
+    mask = pd.Series(False, index=df.index)
+    for c in dimension_columns(df):
+        mask |= match_dimension(df[c], test)
+    return mask
+
+
+def sidra_url(path: str) -> str:
+    """
+    URL completa de um caminho /values/... no host do SIDRA ($PAYEVOL_SIDRA_BASE ou apisidra).
+    """
+    return f"{sidra_base()}{path}"
+
+
+def period_url(url: str, periods: str) -> str:
+    """
+    Troca o trecho /p/... de uma URL do SIDRA (ex.: p/all -> p/last%206).
+    """
+    return _RX_PERIOD.sub(f"/p/{periods}", url, count=1)
+
+
+def last_periods(n: int) -> str:
+    return f"last%20{max(int(n), 1)}"
+
+
+def merge_incremental(stored: pd.DataFrame, delta: pd.DataFrame, value_col: str) -> pd.DataFrame | None:
+    """
+    Junta o trecho novo (delta) à série guardada.
+
+    O delta precisa começar em um mês que já existe na série (sobreposição) e ter
+    meses consecutivos. Se faltar sobreposição (buraco), os meses não forem
+    consecutivos ou algum valor da sobreposição mudou (revisão do IBGE),
+    devolve None: o chamador deve fazer a carga completa.
+    """
+    if delta is None or delta.empty:
+        return None
+
+    delta = delta.sort_values("ref_date").reset_index(drop=True)
+    first = delta["ref_date"].iloc[0]
+    if first > stored["ref_date"].max():
+        return None
+
+    stamps = pd.to_datetime(delta["ref_date"])
+    ordinals = stamps.dt.year * 12 + stamps.dt.month
+    if not (np.diff(ordinals.to_numpy()) == 1).all():
+        return None
+
+    overlap = stored.loc[stored["ref_date"] >= first, ["ref_date", value_col]]
+    check = overlap.merge(delta[["ref_date", value_col]], on="ref_date", how="left", suffixes=("", "_new"))
+    if check[f"{value_col}_new"].isna().any():
+        return None
+    if not np.allclose(check[value_col], check[f"{value_col}_new"], rtol=1e-9, atol=0.0):
+        return None
+
+    older = stored.loc[stored["ref_date"] < first, list(delta.columns)]
+    return pd.concat([older, delta], ignore_index=True)
+
+
+def refresh_incremental(
+    stored: pd.DataFrame,
+    download: Callable[[str], pd.DataFrame],
+    value_col: str,
+) -> pd.DataFrame:
+    """
+    Atualiza a série baixando só os períodos desde o último mês guardado
+    (p/last N, incluindo esse mês para detectar revisões).
+    Cai para a carga completa (p/all) em caso de buraco, revisão ou erro.
+    """
+    last = stored["ref_date"].max()
+    n = months_between(last, first_day_current_month()) + 1
+
+    try:
+        delta = download(last_periods(max(n, 2)))
+    except NotModified:
+        raise
+    except Exception:
+        delta = None
+
+    merged = merge_incremental(stored, delta, value_col)
+    if merged is not None:
+        return merged
+    return download("all")
@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Callable, Iterator
+
+import pandas as pd
+
+from payevol.core import metrics
+from payevol.core.cache import bypass
+from payevol.core.config import data_dir, source_max_age
+from payevol.core.locks import single_flight
+from payevol.services import http_client
+from payevol.services.http_client import NotModified
+
+STORE_FILENAME = "series.sqlite3"
+
+_META_DDL = """
+CREATE TABLE IF NOT EXISTS series_meta (
+    name TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    last_period TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    n_rows INTEGER NOT NULL
+)
+"""
+
+_MARKERS_DDL = """
+CREATE TABLE IF NOT EXISTS markers (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+)
+"""
+
+
+@dataclass(frozen=True)
+class SeriesMeta:
+    name: str
+    source: str
+    last_period: date
+    fetched_at: float
+    n_rows: int
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+# arquivos cujas tabelas fixas já foram criadas neste processo
+_schema_ready: set[Path] = set()
+_schema_lock = threading.Lock()
+
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    """
+    Conexão curta com o store: uma transação (commit ou rollback) e fechada na saída.
+    As tabelas fixas (series_meta, markers) são criadas uma vez por processo.
+    """
+    path = data_dir() / STORE_FILENAME
+    with closing(sqlite3.connect(path, timeout=30)) as conn:
+        if path not in _schema_ready:
+            with _schema_lock, conn:
+                conn.execute(_META_DDL)
+                conn.execute(_MARKERS_DDL)
+                _schema_ready.add(path)
+        with conn:
+            yield conn
+
+
+def _table(name: str) -> str:
+    return f"series:{name}"
+
+
+def _row_to_meta(row: tuple) -> SeriesMeta:
+    name, source, last_period, fetched_at, n_rows = row
+    return SeriesMeta(name, source, date.fromisoformat(last_period), float(fetched_at), int(n_rows))
+
+
+def series_meta(name: str) -> SeriesMeta | None:
+    """
+    Metadados da série salva (ou None se ainda não existe no disco).
+    """
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT name, source, last_period, fetched_at, n_rows FROM series_meta WHERE name = ?",
+            (name,),
+        ).fetchone()
+    return _row_to_meta(row) if row else None
+
+
+def load_series(name: str) -> tuple[pd.DataFrame, SeriesMeta] | None:
+    """
+    Lê a série salva: (dataframe com ref_date em date, metadados).
+    """
+    meta = series_meta(name)
+    if meta is None:
+        return None
+
+    with _connect() as conn:
+        try:
+            df = pd.read_sql(f'SELECT * FROM "{_table(name)}"', conn)
+        except Exception:
+            return None
+
+    df["ref_date"] = pd.to_datetime(df["ref_date"]).dt.date
+    return df, meta
+
+
+def save_series(name: str, df: pd.DataFrame, source: str) -> SeriesMeta:
+    """
+    Grava (substitui) a série e atualiza os metadados.
+    Se o dataframe tiver coluna 'source', ela prevalece sobre o parâmetro.
+    """
+    if df.empty:
+        raise ValueError(f"Série '{name}' vazia; nada a gravar.")
+
+    if "source" in df.columns:
+        source = str(df["source"].iloc[-1])
+
+    out = df.copy()
+    out["ref_date"] = pd.to_datetime(out["ref_date"]).dt.strftime("%Y-%m-%d")
+    last_period = date.fromisoformat(out["ref_date"].max())
+
+    meta = SeriesMeta(name, source, last_period, time.time(), len(out))
+    with _connect() as conn:
+        out.to_sql(_table(name), conn, if_exists="replace", index=False)
+        conn.execute(
+            "INSERT OR REPLACE INTO series_meta VALUES (?, ?, ?, ?, ?)",
+            (meta.name, meta.source, meta.last_period.isoformat(), meta.fetched_at, meta.n_rows),
+        )
+    return meta
+
+
+def read_marker(name: str) -> str | None:
+    """
+    Marcador livre (ex.: hash da última página raspada).
+    """
+    with _connect() as conn:
+        row = conn.execute("SELECT value FROM markers WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def write_marker(name: str, value: str) -> None:
+    with _connect() as conn:
+        conn.execute("INSERT OR REPLACE INTO markers VALUES (?, ?)", (name, value))
+
+
+def touch_series(name: str) -> None:
+    """
+    Marca a série como conferida agora (a fonte respondeu que nada mudou).
+    """
+    with _connect() as conn:
+        conn.execute("UPDATE series_meta SET fetched_at = ? WHERE name = ?", (time.time(), name))
+
+
+# Revalidação em segundo plano (stale-while-revalidate): desligada por padrão (CLI/jobs
+# esperam a fonte); o app e a API ligam com set_background_refresh(True).
+_background = False
+_revalidating: set[str] = set()
+_revalidating_lock = threading.Lock()
+_state = threading.local()
+
+
+def set_background_refresh(enabled: bool) -> None:
+    global _background
+    _background = enabled
+
+
+@contextmanager
+def forced_refresh() -> Iterator[None]:
+    """
+    Dentro do bloco (só nesta thread), cached_series ignora a idade da cópia em disco e
+    busca na fonte na hora, e as funções @cached não usam a memória.
+    """
+    outer = getattr(_state, "forced", False)
+    _state.forced = True
+    try:
+        with bypass():
+            yield
+    finally:
+        _state.forced = outer
+
+
+def _validate(name: str, df: pd.DataFrame, stored: pd.DataFrame | None) -> None:
+    """
+    Recusa uma atualização que pioraria a cópia do disco: vazia, sem ref_date,
+    terminando antes da cópia atual ou com menos linhas que ela.
+    """
+    if df is None or df.empty or "ref_date" not in df.columns:
+        raise ValueError(f"Série '{name}': atualização vazia ou sem ref_date.")
+    if stored is None:
+        return
+    new_last = pd.Timestamp(pd.to_datetime(df["ref_date"]).max())
+    old_last = pd.Timestamp(pd.to_datetime(stored["ref_date"]).max())
+    if new_last < old_last:
+        raise ValueError(f"Série '{name}': atualização termina em {new_last:%m/%Y}, antes da cópia salva ({old_last:%m/%Y}).")
+    if len(df) < len(stored):
+        raise ValueError(f"Série '{name}': atualização com {len(df)} linhas, menos que a cópia salva ({len(stored)}).")
+
+
+def _update(
+    name: str,
+    fetch: Callable[[], pd.DataFrame],
+    source: str,
+    refresh: Callable[[pd.DataFrame], pd.DataFrame] | None,
+    stored: tuple[pd.DataFrame, SeriesMeta] | None,
+) -> pd.DataFrame:
+    try:
+        try:
+            if stored is not None and refresh is not None:
+                df = refresh(stored[0])
+            else:
+                df = fetch()
+        except NotModified as e:
+            if stored is not None:
+                touch_series(name)
+                metrics.inc("payevol_store_requests_total", series=name, result="not_modified")
+                return stored[0]
+            # sem cópia no disco, o 304 não serve: pede de novo sem validadores
+            http_client.invalidate(e.url)
+            df = fetch()
+        _validate(name, df, stored[0] if stored is not None else None)
+    except Exception:
+        if stored is not None:
+            metrics.inc("payevol_store_requests_total", series=name, result="stale")
+            return stored[0]
+        raise
+
+    save_series(name, df, source)
+    metrics.inc("payevol_store_requests_total", series=name, result="refreshed" if stored else "fetched")
+    return df
+
+
+def _update_once(
+    name: str,
+    fetch: Callable[[], pd.DataFrame],
+    source: str,
+    refresh: Callable[[pd.DataFrame], pd.DataFrame] | None,
+    max_age: float,
+) -> pd.DataFrame:
+    """
+    _update em voo único (core.locks.single_flight): uma busca por série de cada vez,
+    entre threads e processos. As threads que chegam durante a busca recebem o resultado dela.
+    Outro processo, ao conseguir a trava, relê o disco: se a série foi gravada ou conferida
+    depois que ele começou a esperar (ou já está dentro de `max_age`), usa essa cópia sem ir à fonte.
+    """
+    started = time.time()
+
+    def run() -> pd.DataFrame:
+        stored = load_series(name)
+        if stored is not None and (stored[1].fetched_at >= started or stored[1].age() < max_age):
+            metrics.inc("payevol_store_requests_total", series=name, result="shared")
+            return stored[0]
+        return _update(name, fetch, source, refresh, stored)
+
+    return single_flight(f"series-{name}", run)
+
+
+def _revalidate_later(
+    name: str,
+    fetch: Callable[[], pd.DataFrame],
+    source: str,
+    refresh: Callable[[pd.DataFrame], pd.DataFrame] | None,
+    invalidate: Callable[[], None] | None,
+) -> None:
+    """
+    Atualiza a série numa thread (uma por série). Só depois de gravar a versão nova
+    e validada é que `invalidate` limpa o cache em memória de quem a lê; até lá, todos
+    leem a cópia anterior.
+    """
+    with _revalidating_lock:
+        if name in _revalidating:
+            return
+        _revalidating.add(name)
+
+    def run() -> None:
+        try:
+            with forced_refresh(), metrics.stage("revalidate", series=name):
+                stored = load_series(name)
+                df = _update_once(name, fetch, source, refresh, max_age=0)
+            # versão nova, gravada aqui ou em outro processo (não a cópia antiga devolvida por 304 ou falha)
+            if invalidate is not None and (stored is None or not df.equals(stored[0])):
+                invalidate()
+        except Exception:
+            pass  # já contado em payevol_stage_seconds{ok="false"}; a cópia antiga segue valendo
+        finally:
+            with _revalidating_lock:
+                _revalidating.discard(name)
+
+    threading.Thread(target=run, name=f"payevol-revalidate-{name}", daemon=True).start()
+
+
+def cached_series(
+    name: str,
+    fetch: Callable[[], pd.DataFrame],
+    source: str,
+    max_age: float | None = None,
+    refresh: Callable[[pd.DataFrame], pd.DataFrame] | None = None,
+    invalidate: Callable[[], None] | None = None,
+) -> pd.DataFrame:
+    """
+    Lê primeiro do disco; só chama `fetch` se a série não existe ou passou de `max_age`
+    (padrão: $PAYEVOL_SOURCE_MAX_AGE ou 24h).
+    Se houver cópia antiga e `refresh` for informado, ele recebe essa cópia e devolve
+    a série atualizada (ex.: baixando só os meses novos).
+    Se a fonte responder 304 (NotModified), a cópia do disco é reaproveitada sem
+    baixar nem reprocessar nada.
+    O resultado é validado (_validate) e gravado (write-through). Se a fonte falhar, ou a
+    atualização for recusada, e houver uma cópia antiga no disco, ela é devolvida no lugar do erro.
+    Com set_background_refresh(True), uma cópia vencida é devolvida na hora e a
+    atualização roda numa thread (stale-while-revalidate); se a série mudar, a thread chama
+    `invalidate` (ex.: o .clear() da função @cached que a lê) e só esse cache é limpo.
+    Só uma busca por série roda de cada vez, entre threads e processos (_update_once);
+    quem chega durante ela recebe o mesmo resultado.
+    Cada leitura conta em payevol_store_requests_total{series, result}: fresh, revalidating,
+    shared (gravada por outra busca enquanto esperava), not_modified, stale (fonte falhou),
+    refreshed ou fetched.
+    """
+    forced = getattr(_state, "forced", False)
+    if max_age is None:
+        max_age = source_max_age()
+    if forced:
+        max_age = 0
+
+    stored = load_series(name)
+    if stored is not None and stored[1].age() < max_age:
+        metrics.inc("payevol_store_requests_total", series=name, result="fresh")
+        return stored[0]
+
+    if stored is not None and _background and not forced:
+        _revalidate_later(name, fetch, source, refresh, invalidate)
+        metrics.inc("payevol_store_requests_total", series=name, result="revalidating")
+        return stored[0]
+
+    return _update_once(name, fetch, source, refresh, max_age)
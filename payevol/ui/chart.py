@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import copy
+import functools
+
+import numpy as np
+import pandas as pd
+
+from payevol.core.dates import add_months
+from payevol.ui.downsample import lttb_indices
+
+# nome do dataset no spec (os dados são injetados a cada chamada)
+DATASET = "payevol"
+# pontos por série enviados ao navegador; acima disso a série é reduzida (LTTB)
+MAX_POINTS = 240
+# acima de tantos meses por série, desenha só a linha (sem marcadores)
+POINTS_MAX = 120
+
+PT_BR_TIME_LOCALE = {
+    "dateTime": "%A, %e de %B de %Y %X",
+    "date": "%d/%m/%Y",
+    "time": "%H:%M:%S",
+    "periods": ["AM", "PM"],
+    "days": ["domingo", "segunda", "terça", "quarta", "quinta", "sexta", "sábado"],
+    "shortDays": ["dom", "seg", "ter", "qua", "qui", "sex", "sáb"],
+    "months": [
+        "janeiro",
+        "fevereiro",
+        "março",
+        "abril",
+        "maio",
+        "junho",
+        "julho",
+        "agosto",
+        "setembro",
+        "outubro",
+        "novembro",
+        "dezembro",
+    ],
+    "shortMonths": [
+        "jan",
+        "fev",
+        "mar",
+        "abr",
+        "mai",
+        "jun",
+        "jul",
+        "ago",
+        "set",
+        "out",
+        "nov",
+        "dez",
+    ],
+}
+
+
+def build_plot_frame(
+    series_sm: pd.DataFrame,
+    series_ipca: pd.DataFrame,
+    series_inpc: pd.DataFrame | None,
+    salary_current: float,
+) -> pd.DataFrame:
+    """
+    Junta as séries para o gráfico: índice = mês, uma coluna por série exibida.
+    """
+    plot_df = pd.DataFrame(index=series_sm["ref_date"])
+    plot_df["Equivalente (k×SM) R$"] = series_sm["equiv_brl"].values
+    plot_df["Atualizado pelo IPCA (R$)"] = (
+        series_ipca.set_index("ref_date")["salary_ipca"].reindex(plot_df.index).values
+    )
+    if series_inpc is not None:
+        plot_df["Atualizado pelo INPC (R$)"] = (
+            series_inpc.set_index("ref_date")["salary_inpc"].reindex(plot_df.index).values
+        )
+
+    if float(salary_current) > 0:
+        plot_df["Salário atual (R$)"] = float(salary_current)
+    return plot_df
+
+
+def _long_frame(plot_df: pd.DataFrame, max_points: int) -> pd.DataFrame:
+    """
+    Formato "longo" (ref_date, Série, Valor) sem NaN, com cada série reduzida a no
+    máximo `max_points` pontos por LTTB (a forma da curva é preservada).
+    """
+    x_all = plot_df.index.to_numpy(dtype="datetime64[ns]")
+    parts = []
+    for name in plot_df.columns:
+        y = plot_df[name].to_numpy(dtype="float64")
+        ok = ~np.isnan(y)
+        x, y = x_all[ok], y[ok]
+        idx = lttb_indices(x.astype("int64"), y, max_points)
+        parts.append(pd.DataFrame({"ref_date": x[idx], "Série": name, "Valor": y[idx]}))
+    return pd.concat(parts, ignore_index=True)
+
+
+@functools.lru_cache(maxsize=2)
+def _spec_template(points: bool) -> dict:
+    """
+    Spec Vega-Lite sem dados nem domínios, gerado (e validado pelo Altair) uma vez
+    por processo; cada chamada só copia e injeta os dados.
+    O Altair só é importado aqui, quando o gráfico é montado pela primeira vez.
+    """
+    import altair as alt
+
+    mark = {"point": alt.OverlayMarkDef(filled=True, size=55)} if points else {}
+    chart = (
+        alt.Chart(alt.NamedData(name=DATASET))
+        .mark_line(**mark)
+        .encode(
+            x=alt.X(
+                "ref_date:T",
+                title="Mês",
+                scale=alt.Scale(domain=[0, 1]),
+                # FORÇA o texto do label (não depende do locale do browser)
+                axis=alt.Axis(labelExpr="timeFormat(datum.value, '%b/%Y')"),
+            ),
+            y=alt.Y("Valor:Q", title="R$", scale=alt.Scale(domain=[0, 1])),
+            color=alt.Color("Série:N", title="Séries", legend=alt.Legend(orient="bottom")),
+            tooltip=[
+                alt.Tooltip("ref_date:T", title="Mês", format="%B/%Y"),
+                alt.Tooltip("Série:N"),
+                alt.Tooltip("Valor:Q", format=",.2f", title="Valor (R$)"),
+            ],
+        )
+        .properties(height=420, padding={"left": 8, "right": 22, "top": 6, "bottom": 6})
+        .interactive(name="zoom")
+    )
+
+    spec = chart.to_dict()
+
+    # 1) locale no config do Vega-Lite
+    spec.setdefault("config", {})
+    spec["config"]["timeFormatLocale"] = PT_BR_TIME_LOCALE
+
+    # 2) locale também no embedOptions (Streamlit às vezes só respeita aqui)
+    spec.setdefault("usermeta", {})
+    spec["usermeta"].setdefault("embedOptions", {})
+    spec["usermeta"]["embedOptions"]["timeFormatLocale"] = PT_BR_TIME_LOCALE
+
+    # (opcional) evita sizing estranho em alguns layouts
+    spec.setdefault("autosize", {"type": "fit", "contains": "padding"})
+    return spec
+
+
+def build_chart_spec(plot_df: pd.DataFrame, max_points: int = MAX_POINTS) -> dict:
+    """
+    Spec Vega-Lite (dict) do gráfico de evolução, com locale pt-BR.
+    Séries com mais de `max_points` meses são reduzidas por LTTB. O zoom no navegador
+    (interactive) só amplia os pontos enviados, sem resolução nova; para ver todos os
+    meses de um trecho, filtre `plot_df` para esse período (ex.: seletor de período no app).
+    Os dados vão em spec["datasets"]["payevol"] como DataFrame (o st.vega_lite_chart
+    converte para Arrow).
+    """
+    # --- Ajuste automático de eixo Y (min/max entre as séries exibidas) ---
+    # (remove colunas totalmente NaN, por exemplo INPC se não disponível)
+    plot_df2 = plot_df.dropna(axis=1, how="all")
+
+    y_min = float(plot_df2.min(numeric_only=True).min())
+    y_max = float(plot_df2.max(numeric_only=True).max())
+
+    pad = (y_max - y_min) * 0.03 if y_max > y_min else (y_max * 0.03 if y_max else 1.0)
+    y_domain = [y_min - pad, y_max + pad]
+
+    # --- calcula domínio X com folga (1 mês a mais) para o último ponto não sumir ---
+    x_min = plot_df2.index.min()
+    x_max = plot_df2.index.max()
+    x_max_plus = pd.Timestamp(add_months(x_max.date(), 1))  # +1 mês à direita
+
+    long_df = _long_frame(plot_df2, max_points)
+    # marcadores só quando cabem (poucos meses por série)
+    points = len(long_df) <= POINTS_MAX * max(len(plot_df2.columns), 1)
+
+    spec = copy.deepcopy(_spec_template(points))
+    spec["encoding"]["x"]["scale"]["domain"] = [x_min.isoformat(), x_max_plus.isoformat()]
+    spec["encoding"]["y"]["scale"]["domain"] = y_domain
+    spec["datasets"] = {DATASET: long_df}
+    return spec
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: índices de até `n_out` pontos que preservam o
+    formato da curva (picos, vales e mudanças de inclinação). Sempre mantém o
+    primeiro e o último ponto. `x` crescente; sem NaN.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    every = (n - 2) / (n_out - 2)
+
+    # limites dos baldes internos e média do balde seguinte de cada um (vértice "c"),
+    # calculadas de uma vez por soma acumulada
+    edges = (np.arange(n_out - 1) * every).astype("int64") + 1
+    nxt_lo = edges[1:]
+    nxt_hi = np.minimum(np.append(edges[2:], n), n)
+    csx = np.concatenate(([0.0], np.cumsum(x)))
+    csy = np.concatenate(([0.0], np.cumsum(y)))
+    width = nxt_hi - nxt_lo
+    cx = (csx[nxt_hi] - csx[nxt_lo]) / width
+    cy = (csy[nxt_hi] - csy[nxt_lo]) / width
+
+    out = np.empty(n_out, dtype="int64")
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - cx[i]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (cy[i] - ay))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
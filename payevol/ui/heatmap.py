@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import copy
+import functools
+
+import numpy as np
+import pandas as pd
+
+from payevol.core.cache import LruCache
+from payevol.services.matrix import FactorMatrix
+
+DATASET = "payevol_matrix"
+# passo (meses) entre linhas/colunas do mapa: anual, semestral, trimestral
+STEPS = {"Anual": 12, "Semestral": 6, "Trimestral": 3}
+
+# specs prontos por (método, versão dos dados, meses, passo)
+_specs = LruCache("ui.heatmap", 16)
+
+
+def heatmap_frame(matrix: FactorMatrix) -> pd.DataFrame:
+    """
+    Formato longo (Referência, Mês, Fator) só com os pares preenchidos (j >= i).
+    """
+    labels = matrix.dates.strftime("%m/%Y").to_numpy()
+    i, j = np.nonzero(~np.isnan(matrix.factors))
+    return pd.DataFrame({"Referência": labels[i], "Mês": labels[j], "Fator": matrix.factors[i, j]})
+
+
+@functools.lru_cache(maxsize=1)
+def _spec_template() -> dict:
+    """
+    Spec Vega-Lite do mapa de calor, gerado (e validado pelo Altair) uma vez por processo.
+    """
+    import altair as alt
+
+    chart = (
+        alt.Chart(alt.NamedData(name=DATASET))
+        .mark_rect()
+        .encode(
+            x=alt.X("Mês:O", sort=None, title="Mês", axis=alt.Axis(labelAngle=-60)),
+            y=alt.Y("Referência:O", sort=None, title="Referência (coorte)"),
+            color=alt.Color(
+                "Fator:Q",
+                title="Fator",
+                scale=alt.Scale(type="log", scheme="viridis"),
+                legend=alt.Legend(orient="right"),
+            ),
+            tooltip=[
+                alt.Tooltip("Referência:O"),
+                alt.Tooltip("Mês:O"),
+                alt.Tooltip("Fator:Q", format=",.3f"),
+            ],
+        )
+        .properties(height=520)
+    )
+    spec = chart.to_dict()
+    spec.setdefault("autosize", {"type": "fit", "contains": "padding"})
+    return spec
+
+
+def build_heatmap_spec(matrix: FactorMatrix, step: int = 12) -> dict:
+    """
+    Spec Vega-Lite (dict) do mapa referência × mês para `matrix`, com um mês a cada `step`.
+    Guardado por versão dos dados: trocar só o método ou o passo reaproveita o que já foi montado.
+    """
+
+    def compute() -> dict:
+        spec = copy.deepcopy(_spec_template())
+        spec["datasets"] = {DATASET: heatmap_frame(matrix.sample(step))}
+        return spec
+
+    key = (matrix.method, matrix.version, int(matrix.months[0]), int(matrix.months[-1]), step)
+    return _specs.get_or_compute(key, compute)
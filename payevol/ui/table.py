@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from payevol.core.formatting import brl_array
+from payevol.services.lookup import month_labels
+
+MONTH_COL = "Mês/Ano"
+MONEY_COLS = (
+    "Salário mínimo (R$)",
+    "Equivalente (k×SM) (R$)",
+    "Atualizado pelo IPCA (R$)",
+    "Atualizado pelo INPC (R$)",
+)
+# altura fixa: a grade do st.dataframe só desenha as linhas visíveis (rolagem virtualizada)
+TABLE_HEIGHT = 420
+
+
+def build_monthly_table(
+    series_sm: pd.DataFrame,
+    series_ipca: pd.DataFrame,
+    series_inpc: pd.DataFrame | None,
+    formatted: bool = False,
+) -> pd.DataFrame:
+    """
+    Tabela mensal ("Ver tabela mensal"): mês (datetime) e valores em float64, formatados
+    no navegador por monthly_column_config (ordenação numérica continua valendo).
+    formatted=True devolve texto pronto ("mm/aaaa", "R$ 1.234,56"), para exportar.
+    """
+    months = series_sm["ref_date"]
+    tbl_dict = {
+        MONTH_COL: months.to_numpy(),
+        MONEY_COLS[0]: series_sm["min_wage"].to_numpy(dtype="float64"),
+        MONEY_COLS[1]: series_sm["equiv_brl"].to_numpy(dtype="float64"),
+        MONEY_COLS[2]: series_ipca.set_index("ref_date")["salary_ipca"].reindex(months).to_numpy(dtype="float64"),
+    }
+    if series_inpc is not None:
+        tbl_dict[MONEY_COLS[3]] = (
+            series_inpc.set_index("ref_date")["salary_inpc"].reindex(months).to_numpy(dtype="float64")
+        )
+    if formatted:
+        cols = list(tbl_dict)[1:]
+        text = brl_array(np.column_stack([tbl_dict[col] for col in cols]))
+        tbl_dict = {MONTH_COL: month_labels(months.to_numpy()), **{col: text[:, i] for i, col in enumerate(cols)}}
+    return pd.DataFrame(tbl_dict)
+
+
+def monthly_column_config() -> dict:
+    """
+    column_config do st.dataframe para a tabela mensal: mês como mm/aaaa e valores com
+    2 casas no formato do navegador (pt-BR: 1.234,56).
+    """
+    import streamlit as st
+
+    config = {MONTH_COL: st.column_config.DateColumn(MONTH_COL, format="MM/YYYY")}
+    for col in MONEY_COLS:
+        config[col] = st.column_config.NumberColumn(col, format="localized", step=0.01)
+    return config
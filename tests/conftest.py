@@ -0,0 +1,29 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from payevol.core.dates import add_months, first_day_current_month
+from payevol.services.min_wage import load_baseline
+
+
+@pytest.fixture
+def min_wage() -> pd.DataFrame:
+    """
+    Mudanças do salário mínimo embarcadas no pacote (ref_date em date, fora de ordem de propósito).
+    """
+    return load_baseline()[["ref_date", "min_wage"]].iloc[::-1].reset_index(drop=True)
+
+
+@pytest.fixture
+def ipca() -> pd.DataFrame:
+    """
+    Número-índice sintético de 12/1993 até o mês atual - 1 (como o IPCA da 1737).
+    """
+    last = add_months(first_day_current_month(), -1)
+    months = [date(1993, 12, 1)]
+    while months[-1] < last:
+        months.append(add_months(months[-1], 1))
+    growth = 1 + np.random.default_rng(7).normal(0.005, 0.004, len(months))
+    return pd.DataFrame({"ref_date": months, "ipca_index": 100.0 * np.cumprod(growth)})
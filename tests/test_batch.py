@@ -0,0 +1,74 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from payevol.core.dates import add_months, first_day_current_month
+from payevol.services.batch import evolve_batch, parse_batch_items
+from payevol.services.lookup import monthly_table, step_series
+from payevol.services.series import (
+    build_equivalent_salary_series_sm,
+    build_inpc_adjusted_series,
+    build_ipca_adjusted_series,
+)
+
+
+def _refs() -> list[date]:
+    current = first_day_current_month()
+    return [
+        date(1994, 7, 1), date(1995, 5, 1), date(2000, 4, 1), date(2010, 3, 1), date(2019, 12, 1),
+        add_months(current, -1), add_months(current, 3),
+    ]
+
+
+@pytest.mark.parametrize("materialized", [False, True])
+def test_evolve_batch_matches_builders(min_wage, ipca, materialized):
+    inpc = ipca.rename(columns={"ipca_index": "inpc_index"}).assign(inpc_index=lambda d: d["inpc_index"] ** 0.97)
+    sm_src, ipca_src, inpc_src = min_wage, ipca, inpc
+    if materialized:
+        sm_src = step_series(min_wage, "min_wage")
+        ipca_src, inpc_src = monthly_table(ipca, "ipca_index"), monthly_table(inpc, "inpc_index")
+
+    refs = _refs()
+    salaries = np.linspace(100.0, 25_000.0, len(refs))
+    out = evolve_batch(refs, salaries, sm_src, ipca_src, inpc_src)
+    assert len(out) == len(refs)
+
+    for row, ref, salary in zip(out.itertuples(), refs, salaries):
+        sm = build_equivalent_salary_series_sm(ref, salary, min_wage)
+        ipca_s = build_ipca_adjusted_series(ref, salary, ipca)
+        inpc_s = build_inpc_adjusted_series(ref, salary, inpc)
+        assert row.target_date == sm["ref_date"].iloc[-1] == ipca_s["ref_date"].iloc[-1]
+        assert row.sm_ref == sm.attrs["sm_ref"]
+        assert row.equiv_brl == pytest.approx(sm["equiv_brl"].iloc[-1], rel=1e-12)
+        assert row.salary_ipca == pytest.approx(ipca_s["salary_ipca"].iloc[-1], rel=1e-12)
+        assert row.salary_inpc == pytest.approx(inpc_s["salary_inpc"].iloc[-1], rel=1e-12)
+
+
+def test_evolve_batch_missing_data(min_wage, ipca):
+    # antes do Plano Real e antes do início do índice: NaN em vez de erro
+    out = evolve_batch(["1990-01", "1993-12"], [1000.0, 1000.0], min_wage, ipca)
+    assert np.isnan(out["sm_ref"].iloc[0]) and np.isnan(out["equiv_brl"].iloc[0])
+    assert np.isnan(out["salary_ipca"]).all()
+    assert np.isnan(out["salary_inpc"]).all()
+
+    with pytest.raises(ValueError):
+        evolve_batch(["2000-01"], [1.0, 2.0], min_wage, ipca)
+
+
+def test_parse_batch_items():
+    refs, salaries = parse_batch_items([{"ref": "2010-03", "salary": "5000"}, {"ref": "07/1994", "salary": 0}])
+    assert refs == [date(2010, 3, 1), date(1994, 7, 1)] and salaries == [5000.0, 0.0]
+
+    bad = [
+        ({"ref": "2010-03", "salary": float("nan")}, "salary"),
+        ({"ref": "2010-03", "salary": "inf"}, "salary"),
+        ({"ref": "2010-03", "salary": -1}, "salary"),
+        ({"ref": "1994-06", "salary": 1}, "07/1994"),
+        ({"ref": "2010-13", "salary": 1}, "mês inválido"),
+        ({"salary": 1}, "ref"),
+        ("2010-03", "ref"),
+    ]
+    for item, message in bad:
+        with pytest.raises(ValueError, match=f"item 1: .*{message}"):
+            parse_batch_items([{"ref": "2010-03", "salary": 1}, item])
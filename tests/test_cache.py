@@ -0,0 +1,42 @@
+import threading
+import time
+
+from payevol.core import metrics
+from payevol.core.cache import LruCache
+
+
+def test_lru_concurrent_misses_compute_once():
+    metrics.reset()
+    cache = LruCache("test.lru", 4)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return ("valor", len(calls))
+
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(cache.get_or_compute(("k", 1), compute))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1 and out == [("valor", 1)] * 8
+    counts = {
+        c["labels"]["result"]: c["value"]
+        for c in metrics.snapshot()["counters"]
+        if c["name"] == "payevol_cache_requests_total" and c["labels"]["fn"] == "test.lru"
+    }
+    assert counts == {"miss": 1.0, "hit": 7.0}
+
+
+def test_lru_evicts_least_recent():
+    cache = LruCache("test.lru.evict", 2)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    cache.get_or_compute("a", lambda: 0)  # "a" passa a ser a mais recente
+    cache.get_or_compute("c", lambda: 3)
+    assert len(cache) == 2
+    assert cache.get_or_compute("a", lambda: -1) == 1
+    assert cache.get_or_compute("b", lambda: -2) == -2
@@ -0,0 +1,93 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from payevol.core.dates import add_months
+from payevol.services.chain import chain_index, drift, rebase, splice
+
+
+def _months(start: date, n: int) -> list[date]:
+    return [add_months(start, i) for i in range(n)]
+
+
+def _variation(start: date = date(2020, 1, 1), n: int = 400, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"ref_date": _months(start, n), "pct": rng.normal(0.4, 0.6, n).round(2)})
+
+
+def _chain_loop(var_df: pd.DataFrame, base_value: float = 100.0) -> pd.DataFrame:
+    # o encadeamento original (iterrows), multiplicando mês a mês
+    rows = [(add_months(var_df["ref_date"].iloc[0], -1), base_value)]
+    current = base_value
+    for _, row in var_df.iterrows():
+        current = current * (1.0 + float(row["pct"]) / 100.0)
+        rows.append((row["ref_date"], current))
+    return pd.DataFrame(rows, columns=["ref_date", "index"])
+
+
+def test_chain_index_matches_loop():
+    var = _variation()
+    got = chain_index(var.sample(frac=1, random_state=1), "pct")
+    want = _chain_loop(var)
+    assert list(got["ref_date"]) == list(want["ref_date"])
+    np.testing.assert_allclose(got["index"], want["index"], rtol=1e-12)
+
+
+def test_rebase_to_month():
+    idx = chain_index(_variation(n=60), "pct")
+    base_month = date(2022, 7, 1)
+    out = rebase(idx, "index", base_month, base_value=100.0)
+
+    assert out.loc[out["ref_date"] == base_month, "index"].item() == 100.0
+    ratios = out["index"].to_numpy()[1:] / out["index"].to_numpy()[:-1]
+    np.testing.assert_allclose(ratios, idx["index"].to_numpy()[1:] / idx["index"].to_numpy()[:-1], rtol=1e-13)
+
+    with pytest.raises(ValueError):
+        rebase(idx, "index", date(1999, 1, 1))
+
+
+def test_splice_seam():
+    official = pd.DataFrame({"ref_date": _months(date(2019, 1, 1), 24), "index": np.linspace(500.0, 530.0, 24)})
+    var = _variation(start=date(2020, 6, 1), n=12)  # sobrepõe o oficial e segue depois dele
+
+    out = splice(official, "index", var, "pct")
+    last = official["ref_date"].iloc[-1]
+    assert len(out) == 24 + 5
+    pd.testing.assert_frame_equal(out.iloc[:24].reset_index(drop=True), official)
+
+    tail = var[var["ref_date"] > last]
+    first = tail.iloc[0]
+    assert out["ref_date"].iloc[24] == add_months(last, 1)
+    assert out["index"].iloc[24] == pytest.approx(530.0 * (1 + first["pct"] / 100), rel=1e-13)
+    np.testing.assert_allclose(
+        out["index"].to_numpy()[25:] / out["index"].to_numpy()[24:-1], 1 + tail["pct"].to_numpy()[1:] / 100, rtol=1e-13
+    )
+
+
+def test_splice_gap_raises():
+    official = pd.DataFrame({"ref_date": _months(date(2019, 1, 1), 12), "index": np.linspace(500.0, 510.0, 12)})
+    with pytest.raises(RuntimeError):
+        splice(official, "index", _variation(start=date(2020, 3, 1), n=4), "pct")
+
+
+def test_drift():
+    var = _variation(n=36)
+    official = chain_index(var, "pct").assign(index=lambda d: d["index"] * 7.3)  # outra base, mesmas razões
+    same = drift(chain_index(var, "pct"), official, "index")
+    assert same.months == 37 and same.max_abs_pct == pytest.approx(0.0, abs=1e-10)
+
+    # 0,01 p.p. a mais por mês no encadeado: desvio acumulado conhecido no último mês
+    chained = chain_index(var.assign(pct=var["pct"] + 0.01), "pct")
+    d = drift(chained, official, "index")
+    want = (np.prod((1 + (var["pct"] + 0.01) / 100) / (1 + var["pct"] / 100)) - 1) * 100
+    assert d.last == var["ref_date"].iloc[-1]
+    assert d.last_pct == pytest.approx(want, rel=1e-9)
+    assert d.max_abs_pct == pytest.approx(abs(want), rel=1e-9)
+
+    # datetime64 de um lado e date do outro
+    assert drift(chained.assign(ref_date=pd.to_datetime(chained["ref_date"])), official, "index") == d
+
+    with pytest.raises(ValueError):
+        drift(chained, official.assign(ref_date=_months(date(1990, 1, 1), 37)), "index")
@@ -0,0 +1,32 @@
+import math
+
+import numpy as np
+import pytest
+
+from payevol.core.formatting import brl, brl_array
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        # empates em meio centavo (o valor binário exato decide o lado, como no f"{:.2f}")
+        [0.005, 0.015, 0.125, 0.375, 1.005, 2.675, 337.725, 1900.435, 999.995],
+        # grandes: perto e além de int64 em centavos
+        [9.2e13, 1e15, 999999999999999.9, 9.2e16, 1e17, 9.3e18, 1e20, -1e20],
+        # sinais, zero negativo e não finitos
+        [0.0, -0.0, -0.001, -1234.5, math.nan, math.inf, -math.inf],
+        [1000, 1_000_000, 12345678.9, 0.01, 0.1],
+    ],
+)
+def test_brl_array_matches_brl(values):
+    assert list(brl_array(values)) == [brl(v) for v in values]
+
+
+def test_brl_array_random_and_shape():
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.uniform(-1e7, 1e7, 5000), rng.uniform(0, 2000, 5000).round(3)])
+    assert list(brl_array(values)) == [brl(v) for v in values]
+
+    grid = brl_array([[1, 2], [3, -4000.5]])
+    assert grid.shape == (2, 2) and grid[1, 1] == "R$ -4.000,50"
+    assert brl_array([]).shape == (0,)
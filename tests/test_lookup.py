@@ -0,0 +1,99 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from payevol.core.dates import add_months
+from payevol.core.frames import canonical_series
+from payevol.services.lookup import month_index, monthly_table, step_series
+
+FIRST = date(1990, 1, 1)
+LAST = date(2040, 12, 1)
+
+
+def _months(first: date = FIRST, last: date = LAST) -> list[date]:
+    out = [first]
+    while out[-1] < last:
+        out.append(add_months(out[-1], 1))
+    return out
+
+
+def _asof(df: pd.DataFrame, value_col: str, months: list[date]) -> np.ndarray:
+    # referência: o valor publicado mais recente até cada mês (merge_asof backward)
+    right = df.dropna(subset=[value_col]).assign(ref_date=lambda d: pd.to_datetime(d["ref_date"]))
+    right = right.sort_values("ref_date", kind="stable")[["ref_date", value_col]]
+    left = pd.DataFrame({"ref_date": pd.to_datetime(months)})
+    return pd.merge_asof(left, right, on="ref_date", direction="backward")[value_col].to_numpy()
+
+
+def _with_gaps(min_wage: pd.DataFrame) -> pd.DataFrame:
+    # data repetida (vale a última linha) e mês sem valor (mantém o anterior)
+    extra = pd.DataFrame(
+        {"ref_date": [date(2000, 4, 1), date(2000, 4, 1), date(2003, 1, 1)], "min_wage": [1.0, 151.5, np.nan]}
+    )
+    return pd.concat([min_wage, extra], ignore_index=True)
+
+
+@pytest.mark.parametrize("canonical", [False, True])
+def test_monthly_table_matches_asof(min_wage, ipca, canonical):
+    months = _months()
+    for df, col in ((_with_gaps(min_wage), "min_wage"), (ipca, "ipca_index")):
+        src = canonical_series(df, col) if canonical else df
+        table = monthly_table(src, col)
+        want = _asof(df, col, months)
+        np.testing.assert_array_equal(table.take(np.array([month_index(m) for m in months])), want)
+        np.testing.assert_array_equal(table.span(FIRST, LAST), want)
+        assert [table.at(m) for m in months[::37]] == pytest.approx(list(want[::37]), nan_ok=True)
+
+
+def test_monthly_table_version(ipca):
+    a = monthly_table(ipca, "ipca_index")
+    assert a.version == monthly_table(ipca.copy(), "ipca_index").version
+    changed = ipca.copy()
+    changed.loc[changed.index[-1], "ipca_index"] *= 1.001
+    assert monthly_table(changed, "ipca_index").version != a.version
+    assert not a.values.flags.writeable
+
+
+@pytest.mark.parametrize("from_table", [False, True])
+def test_step_series_matches_monthly_table(min_wage, from_table):
+    df = _with_gaps(min_wage)
+    table = monthly_table(df, "min_wage")
+    steps = step_series(table if from_table else df, "min_wage")
+
+    months = _months()
+    idx = np.array([month_index(m) for m in months])
+    np.testing.assert_array_equal(steps.take(idx), table.take(idx))
+    assert [steps.at(m) for m in months] == pytest.approx([table.at(m) for m in months], nan_ok=True)
+    for first, last in ((FIRST, LAST), (date(1994, 7, 1), date(1994, 7, 1)), (date(2001, 3, 1), date(2025, 2, 1))):
+        np.testing.assert_array_equal(steps.span(first, last), table.span(first, last))
+    assert steps.end == table.end
+    assert len(steps.starts) < len(table.values) // 4  # um trecho por reajuste, não por mês
+
+
+def test_step_series_runs_and_scale(min_wage):
+    steps = step_series(min_wage, "min_wage")
+    run_starts, run_ends, values = steps.runs(date(1993, 1, 1), date(1996, 12, 1))
+    assert (run_starts[1:] == run_ends[:-1] + 1).all()
+    assert run_starts[0] == month_index(date(1993, 1, 1)) and run_ends[-1] == month_index(date(1996, 12, 1))
+    assert np.isnan(values[0]) and not np.isnan(values[1:]).any()
+
+    doubled = steps.scale(2.0)
+    np.testing.assert_array_equal(doubled.span(FIRST, LAST), 2.0 * steps.span(FIRST, LAST))
+    assert doubled.version != steps.version
+
+
+def test_tables_reused_per_version(ipca, min_wage):
+    import pickle
+
+    src = canonical_series(ipca, "ipca_index")
+    table = monthly_table(src, "ipca_index")
+    # cópia como a do st.cache_data: mesma versão, mesma tabela
+    assert monthly_table(pickle.loads(pickle.dumps(src)), "ipca_index") is table
+    steps = canonical_series(min_wage, "min_wage")
+    assert step_series(steps, "min_wage") is step_series(steps.copy(), "min_wage")
+
+    changed = ipca.copy()
+    changed.loc[changed.index[-1], "ipca_index"] *= 1.001
+    assert monthly_table(canonical_series(changed, "ipca_index"), "ipca_index") is not table
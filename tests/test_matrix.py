@@ -0,0 +1,49 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from payevol.services.lookup import month_dates, monthly_table, step_series
+from payevol.services.matrix import factor_matrix, method_matrix
+from payevol.services.series import build_equivalent_salary_series_sm, build_ipca_adjusted_series
+
+LAST = date(2024, 6, 1)
+
+
+def _cells(m):
+    dates = [d.date() for d in month_dates(m.months)]
+    rng = np.random.default_rng(3)
+    for i in sorted(rng.choice(len(dates), 12, replace=False)):
+        j = rng.integers(i, len(dates))
+        yield dates[i], dates[j], m.factors[i, j]
+
+
+def test_factor_matrix_sm_matches_builder(min_wage):
+    m = factor_matrix("sm", step_series(min_wage, "min_wage"), last=LAST)
+    for ref, target, factor in _cells(m):
+        s = build_equivalent_salary_series_sm(ref, 1.0, min_wage).set_index("ref_date")
+        # k×SM para R$ 1: SM(alvo) / SM(ref)
+        assert factor == pytest.approx(s.loc[str(target), "equiv_brl"], rel=1e-12)
+
+
+def test_factor_matrix_ipca_matches_builder(ipca):
+    m = factor_matrix("ipca", monthly_table(ipca, "ipca_index"), last=LAST)
+    for ref, target, factor in _cells(m):
+        s = build_ipca_adjusted_series(ref, 1.0, ipca).set_index("ref_date")
+        assert factor == pytest.approx(s.loc[str(target), "salary_ipca"], rel=1e-12)
+
+
+def test_factor_matrix_shape_and_cache(min_wage, ipca):
+    tables = {"sm": step_series(min_wage, "min_wage"), "ipca": monthly_table(ipca, "ipca_index")}
+    m = method_matrix("ipca", tables, last=LAST)
+    assert m is method_matrix("ipca", tables, last=LAST)
+    assert not m.factors.flags.writeable
+    assert np.isnan(m.factors[np.tril_indices(len(m.months), -1)]).all()
+
+    rel = method_matrix("sm/ipca", tables, last=LAST)
+    sm = method_matrix("sm", tables, last=LAST)
+    np.testing.assert_allclose(rel.factors, sm.factors / m.factors, equal_nan=True)
+    assert rel.sample(12).months[-1] == rel.months[-1]
+
+    with pytest.raises(ValueError):
+        factor_matrix("igpm", tables["ipca"])
@@ -0,0 +1,142 @@
+import json
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from payevol.core.dates import add_months, first_day_current_month
+from payevol.services.http_client import NotModified
+from payevol.services.sidra import (
+    iter_json_batches,
+    merge_incremental,
+    parse_value_batches,
+    parse_values,
+    refresh_incremental,
+    to_float_ptbr,
+)
+
+
+def _series(n: int = 48) -> pd.DataFrame:
+    last = add_months(first_day_current_month(), -1)
+    months = [add_months(last, i - n + 1) for i in range(n)]
+    values = 100.0 * np.cumprod(1 + np.random.default_rng(0).normal(0.004, 0.003, n))
+    return pd.DataFrame({"ref_date": months, "v": values})
+
+
+def _downloader(full: pd.DataFrame, calls: list):
+    # imita o /values: "last%20N" devolve os N últimos meses, "all" a série inteira
+    def download(periods: str) -> pd.DataFrame:
+        calls.append(periods)
+        if periods == "all":
+            return full.copy()
+        return full.tail(int(periods.split("%20")[1])).reset_index(drop=True)
+
+    return download
+
+
+def test_merge_incremental_appends_new_months():
+    full = _series()
+    merged = merge_incremental(full.iloc[:-3], full.iloc[-6:], "v")
+    pd.testing.assert_frame_equal(merged, full)
+
+
+def test_merge_incremental_detects_revision():
+    full = _series()
+    delta = full.iloc[-6:].copy()
+    delta.loc[delta.index[0], "v"] *= 1.001  # IBGE revisou um mês já guardado
+    assert merge_incremental(full.iloc[:-3], delta, "v") is None
+
+
+def test_merge_incremental_detects_gaps():
+    full = _series()
+    stored = full.iloc[:-6]
+    # sem sobreposição: o delta começa depois do último mês guardado
+    assert merge_incremental(stored, full.iloc[-4:], "v") is None
+    # meses não consecutivos no delta
+    assert merge_incremental(stored, full.iloc[-8:].drop(full.index[-3]), "v") is None
+    # meses guardados que o delta não traz (termina antes da série guardada)
+    assert merge_incremental(full, full.iloc[-8:-2], "v") is None
+    assert merge_incremental(stored, full.iloc[:0], "v") is None
+    assert merge_incremental(stored, None, "v") is None
+
+
+def test_refresh_incremental_equals_full_load():
+    full = _series()
+    calls = []
+    out = refresh_incremental(full.iloc[:-2], _downloader(full, calls), "v")
+    pd.testing.assert_frame_equal(out, full)
+    assert calls == ["last%204"]  # do último mês guardado até o mês corrente
+
+
+def test_refresh_incremental_falls_back_to_full_load():
+    full = _series()
+    revised = full.assign(v=full["v"] * 1.01)
+    calls = []
+    out = refresh_incremental(full.iloc[:-2], _downloader(revised, calls), "v")
+    pd.testing.assert_frame_equal(out, revised)
+    assert calls == ["last%204", "all"]
+
+    def failing(periods: str) -> pd.DataFrame:
+        if periods != "all":
+            raise RuntimeError("fora do ar")
+        return full.copy()
+
+    pd.testing.assert_frame_equal(refresh_incremental(full.iloc[:-2], failing, "v"), full)
+
+
+def test_refresh_incremental_propagates_not_modified():
+    def not_modified(periods: str) -> pd.DataFrame:
+        raise NotModified("url")
+
+    with pytest.raises(NotModified):
+        refresh_incremental(_series(), not_modified, "v")
+
+
+def _values_json() -> bytes:
+    header = {"NC": "Nível Territorial (Código)", "V": "Valor", "D1C": "Brasil (Código)", "D2C": "Mês (Código)",
+              "D2N": "Mês", "D3N": "Variável"}
+    rows = [
+        {"NC": "1", "V": "1.234,5", "D1C": "1", "D2C": "202001", "D2N": "janeiro 2020", "D3N": 'Índice "geral" {a}'},
+        {"NC": "1", "V": "7025.49", "D1C": "1", "D2C": "202002", "D2N": "fevereiro 2020", "D3N": "x}]},{"},
+        {"NC": "1", "V": "0,19", "D1C": "1", "D2C": "202003", "D2N": "março 2020", "D3N": "ação \\\\ \\\""},
+        {"NC": "1", "V": "...", "D1C": "1", "D2C": "202004", "D2N": "abril 2020", "D3N": "y"},
+        {"NC": "1", "V": "-", "D1C": "1", "D2C": "202005", "D2N": "maio 2020", "D3N": "y"},
+        {"NC": "1", "V": "X", "D1C": "1", "D2C": "202006", "D2N": "junho 2020", "D3N": "y"},
+    ]
+    return json.dumps([header, *rows], ensure_ascii=False, indent=1).encode("utf-8")
+
+
+def test_to_float_ptbr():
+    s = pd.Series(["1,23", "1.234,5", "1.234.567,89", "7025.49", " 12 ", "...", "-", "X", None], dtype=object)
+    out = to_float_ptbr(s)
+    assert out.dtype == np.float64
+    assert out.iloc[:5].tolist() == [1.23, 1234.5, 1234567.89, 7025.49, 12.0]
+    assert out.iloc[5:].isna().all()
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 10_000])
+def test_iter_json_batches_any_chunking(size):
+    body = _values_json()
+    chunks = [body[i : i + size] for i in range(0, len(body), size)]
+    rows = [row for batch in iter_json_batches(chunks) for row in batch]
+    assert rows == json.loads(body)
+
+
+def test_iter_json_batches_rejects_bad_bodies():
+    with pytest.raises(RuntimeError):
+        list(iter_json_batches([b'{"V": "1"}']))
+    with pytest.raises(RuntimeError):
+        list(iter_json_batches([b'[{"V": "1"}, {"V": "2"']))
+
+
+def test_parse_value_batches():
+    body = _values_json()
+    one = parse_values(json.loads(body))
+    chunked = parse_value_batches(iter_json_batches(body[i : i + 5] for i in range(0, len(body), 5)))
+    pd.testing.assert_frame_equal(one, chunked)
+
+    # "...", "-" e "X" não são números: as linhas saem
+    assert one["ref_date"].tolist() == [date(2020, 1, 1), date(2020, 2, 1), date(2020, 3, 1)]
+    assert one["value"].tolist() == [1234.5, 7025.49, 0.19]
+    assert one["D3N"].astype(str).tolist() == ['Índice "geral" {a}', "x}]},{", 'ação \\\\ \\"']